@@ -0,0 +1 @@
+"""Benchmarks de rendimiento. Ejecutar desde la raíz con `python -m benchmarks.<nombre>`."""
@@ -0,0 +1,65 @@
+"""Compara los backends de `json_codec` y la decodificación parcial de partidas.
+
+Uso:
+    python -m benchmarks.bench_json_codec [--matches 500]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Callable, Sequence
+
+from src import json_codec
+from src.parsed_match import parse_match
+from tests.payloads import build_match
+
+
+def _rate(label: str, payloads: Sequence, total_bytes: int, func: Callable) -> float:
+    started = time.perf_counter()
+    for payload in payloads:
+        func(payload)
+    elapsed = time.perf_counter() - started
+    print(
+        f"{label:<34} {len(payloads) / elapsed:>10,.0f} partidas/s"
+        f"  {total_bytes / elapsed / 1024 / 1024:>7.1f} MB/s"
+    )
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--matches", type=int, default=500)
+    args = parser.parse_args()
+
+    matches = [build_match(f"LA1_{i}", seed=i) for i in range(args.matches)]
+    texts = [json_codec.get_serializer("json").dumps(match) for match in matches]
+    total_bytes = sum(len(text.encode("utf-8")) for text in texts)
+    print(f"{len(texts)} partidas, {total_bytes / len(texts) / 1024:.1f} KB de media\n")
+
+    print("== dumps / loads")
+    for name in json_codec.available_serializers():
+        serializer = json_codec.get_serializer(name)
+        _rate(f"{name} dumps", matches, total_bytes, serializer.dumps)
+        _rate(f"{name} loads", texts, total_bytes, serializer.loads)
+
+    print("\n== participantes indexados (loads + parse_match)")
+    baseline = _rate(
+        "json completo",
+        texts,
+        total_bytes,
+        lambda text: parse_match(json_codec.get_serializer("json").loads(text)),
+    )
+    fastest = json_codec.get_serializer()
+    _rate(f"{fastest.name} completo", texts, total_bytes, lambda text: parse_match(fastest.loads(text)))
+    partial = _rate(
+        "decode_match_summary",
+        texts,
+        total_bytes,
+        lambda text: parse_match(json_codec.decode_match_summary(text)),
+    )
+    print(f"\nDecodificación parcial: {baseline / partial:.1f}x más rápida que json completo.")
+
+
+if __name__ == "__main__":
+    main()
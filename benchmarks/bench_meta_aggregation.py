@@ -0,0 +1,49 @@
+"""Mide partidas/segundo de `meta_aggregation.aggregate_meta` según el número de procesos.
+
+Uso:
+    python -m benchmarks.bench_meta_aggregation [--matches 5000] [--workers 1 2 4]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+from pathlib import Path
+import tempfile
+import time
+
+from src import meta_aggregation
+from src.database import connect_repository
+from tests.payloads import build_match
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--matches", type=int, default=5000)
+    parser.add_argument("--workers", type=int, nargs="+", default=None)
+    args = parser.parse_args()
+    cpus = os.cpu_count() or 1
+    worker_counts = args.workers or sorted({1, 2, cpus})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.db"
+        with connect_repository(db_path, compression=None) as repo:
+            repo.register_player("bench-puuid")
+            matches = [build_match(f"LA1_{i}", seed=i, patch=f"14.{i % 4 + 1}") for i in range(args.matches)]
+            repo.store_matches("bench-puuid", matches)
+        print(f"{args.matches} partidas, {cpus} núcleos\n")
+
+        baseline = None
+        for workers in worker_counts:
+            started = time.perf_counter()
+            frame = meta_aggregation.aggregate_meta(db_path, workers=workers)
+            elapsed = time.perf_counter() - started
+            baseline = baseline or elapsed
+            print(
+                f"{workers:>3} procesos {args.matches / elapsed:>10,.0f} partidas/s"
+                f"  x{baseline / elapsed:>4.1f}  ({len(frame)} filas)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Compara el tamaño y la velocidad de decodificación de los formatos de almacenamiento.
+
+Uso:
+    python -m benchmarks.bench_storage_compression [--matches 200]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+
+from src import storage_codec
+from tests.payloads import build_match, build_timeline
+
+
+def _measure(label: str, texts, codec, dictionary) -> None:
+    encoded = [
+        storage_codec.compress_text(text, codec, dictionary=dictionary, dictionary_id=1) if codec else text
+        for text in texts
+    ]
+    raw_bytes = sum(len(text.encode("utf-8")) for text in texts)
+    stored_bytes = sum(len(value) if isinstance(value, bytes) else len(value.encode("utf-8")) for value in encoded)
+
+    dictionaries = {1: dictionary} if dictionary else {}
+    started = time.perf_counter()
+    for value in encoded:
+        json.loads(storage_codec.decode_text(value, dictionaries))
+    elapsed = time.perf_counter() - started
+
+    print(
+        f"{label:<22} {stored_bytes / 1024:>10.1f} KB  ratio {raw_bytes / stored_bytes:>5.2f}x"
+        f"  decode+parse {raw_bytes / elapsed / 1024 / 1024:>7.1f} MB/s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--matches", type=int, default=200)
+    args = parser.parse_args()
+
+    datasets = {
+        "matches": [json.dumps(build_match(f"LA1_{i}", seed=i), ensure_ascii=False) for i in range(args.matches)],
+        "timelines": [json.dumps(build_timeline(f"LA1_{i}", seed=i), ensure_ascii=False) for i in range(args.matches // 4)],
+    }
+
+    for name, texts in datasets.items():
+        samples = [text.encode("utf-8") for text in texts[: max(1, len(texts) // 4)]]
+        print(f"\n== {name} ({len(texts)} payloads)")
+        _measure("json (sin comprimir)", texts, None, None)
+        for codec in storage_codec.available_codecs():
+            _measure(codec, texts, codec, None)
+            dictionary = storage_codec.train_dictionary(samples, codec)
+            _measure(f"{codec} + diccionario", texts, codec, dictionary)
+
+
+if __name__ == "__main__":
+    main()
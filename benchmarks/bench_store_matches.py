@@ -0,0 +1,99 @@
+"""Mide filas/segundo de `MatchRepository.store_matches` frente al insert fila a fila anterior.
+
+Uso:
+    python -m benchmarks.bench_store_matches [--matches 5000]
+"""
+
+from __future__ import annotations
+
+import argparse
+from datetime import datetime, timezone
+from pathlib import Path
+import tempfile
+import time
+from typing import List
+
+from src.database import MatchRepository, _parse_match_records, connect_repository
+from tests.payloads import build_match
+
+
+def _legacy_store_matches(repo: MatchRepository, puuid: str, matches) -> List[str]:
+    """Réplica de la implementación previa: SELECT ... IN por lotes y un INSERT por partida."""
+
+    records = _parse_match_records(matches, None, datetime.now(timezone.utc).year)
+    match_ids = [record.match_id for record in records]
+    inserted = []
+    with repo._write() as conn:
+        existing_ids = set()
+        for i in range(0, len(match_ids), 500):
+            batch = match_ids[i : i + 500]
+            placeholders = ",".join("?" * len(batch))
+            cursor = conn.execute(f"SELECT match_id FROM matches WHERE match_id IN ({placeholders});", batch)
+            existing_ids.update(row[0] for row in cursor.fetchall())
+
+        for record in records:
+            if record.match_id in existing_ids:
+                continue
+            conn.execute(
+                "INSERT OR IGNORE INTO matches (match_id, puuid, game_year, game_timestamp, raw_json) VALUES (?, ?, ?, ?, ?);",
+                (record.match_id, puuid, record.game_year, record.game_timestamp, record.raw_json),
+            )
+            repo._insert_participants(conn, record.participants)
+            inserted.append(record.match_id)
+    return inserted
+
+
+def _run(label: str, store, matches, db_path: Path) -> None:
+    with connect_repository(db_path, compression=None) as repo:
+        repo.register_player("bench-puuid")
+        started = time.perf_counter()
+        inserted = store(repo, "bench-puuid", matches)
+        elapsed = time.perf_counter() - started
+
+        # Segunda pasada: todas las partidas ya existen.
+        started = time.perf_counter()
+        store(repo, "bench-puuid", matches)
+        elapsed_existing = time.perf_counter() - started
+
+    print(
+        f"{label:<10} {len(inserted) / elapsed:>10,.0f} partidas/s nuevas"
+        f"   {len(matches) / elapsed_existing:>10,.0f} partidas/s ya existentes"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--matches", type=int, default=5000)
+    parser.add_argument(
+        "--payload",
+        choices=["full", "minimal"],
+        default="full",
+        help="'minimal' usa partidas pequeñas para aislar el coste de SQLite del de serializar JSON.",
+    )
+    args = parser.parse_args()
+
+    template = build_match("template", seed=1)
+    if args.payload == "minimal":
+        template = {
+            "metadata": template["metadata"],
+            "info": {
+                "gameStartTimestamp": template["info"]["gameStartTimestamp"],
+                "participants": [
+                    {"puuid": p["puuid"], "championId": p["championId"], "win": p["win"]}
+                    for p in template["info"]["participants"]
+                ],
+            },
+        }
+    matches = []
+    for i in range(args.matches):
+        match = dict(template)
+        match["metadata"] = {**template["metadata"], "matchId": f"LA1_{i}"}
+        matches.append(match)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        _run("anterior", _legacy_store_matches, matches, Path(tmp_dir) / "legacy.db")
+        _run("bulk", lambda repo, puuid, batch: repo.store_matches(puuid, batch), matches, Path(tmp_dir) / "bulk.db")
+
+
+if __name__ == "__main__":
+    main()
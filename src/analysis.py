@@ -1,7 +1,23 @@
 """Cálculo de métricas: pick rate, win rate y agregaciones por parche y liga."""
 from __future__ import annotations
+from statistics import NormalDist
+from typing import Iterable, Mapping, Sequence
+
+import numpy as np
 import pandas as pd
 
+try:
+    from .parsed_match import ParsedMatch, parse_match
+except ImportError:  # Ejecución directa con `streamlit run src/dashboard.py`
+    from parsed_match import ParsedMatch, parse_match
+
+
+# Columnas de resultado de `calcular_metricas_meta` además de las de agrupación.
+META_METRIC_COLUMNS = [
+    'games', 'wins', 'win_rate', 'win_rate_low', 'win_rate_high',
+    'pick_rate', 'bans', 'ban_rate', 'presence', 'total_matches',
+]
+
 
 def calcular_winrate(df: pd.DataFrame) -> pd.DataFrame:
     """
@@ -13,10 +29,300 @@ def calcular_winrate(df: pd.DataFrame) -> pd.DataFrame:
     Returns:
         pd.DataFrame: Tabla con columnas ['champion', 'patch', 'win_rate', 'games_played'].
     """
-    grouped = df.groupby(["champion", "patch"])['result'].agg(['sum', 'count']).reset_index()
+    grouped = df.groupby(["champion", "patch"], observed=True)['result'].agg(['sum', 'count']).reset_index()
     grouped = grouped.rename(columns={'sum': 'wins', 'count': 'games_played'})
     grouped['win_rate'] = grouped['wins'] / grouped['games_played']
     return grouped[['champion', 'patch', 'win_rate', 'games_played']]
 
 
-# TODO: funciones para pick rate y comparaciones entre ligas
+class WinrateAccumulator:
+    """
+    Acumula victorias y partidas por grupo a partir de bloques de un dataset.
+
+    Cada bloque se reduce con un groupby y sólo se conservan los totales por
+    grupo, así que la memoria depende del número de grupos y no de las filas.
+
+    Args:
+        group_cols (Sequence[str]): Columnas de agrupación (por defecto campeón y parche).
+
+    Example:
+        >>> acc = WinrateAccumulator()
+        >>> for chunk in iter_match_csv('partidas.csv'):
+        ...     acc.update(chunk)
+        >>> acc.result()
+    """
+
+    def __init__(self, group_cols: Sequence[str] = ('champion', 'patch')) -> None:
+        self.group_cols = list(group_cols)
+        self._totals: pd.DataFrame | None = None
+
+    def update(self, df: pd.DataFrame) -> None:
+        """Suma las victorias y partidas de un bloque a los totales."""
+        partial = df.groupby(self.group_cols, observed=True)['result'].agg(['sum', 'count'])
+        if self._totals is None:
+            self._totals = partial
+        else:
+            # Las categorías cambian entre bloques: se combinan por valor.
+            self._totals = pd.concat([self._totals, partial]).groupby(level=self.group_cols).sum()
+
+    def result(self) -> pd.DataFrame:
+        """
+        Devuelve el winrate acumulado con el mismo formato que `calcular_winrate`.
+
+        Returns:
+            pd.DataFrame: Columnas [*group_cols, 'win_rate', 'games_played'].
+        """
+        if self._totals is None:
+            return pd.DataFrame(columns=[*self.group_cols, 'win_rate', 'games_played'])
+        grouped = self._totals.reset_index().rename(columns={'sum': 'wins', 'count': 'games_played'})
+        grouped['win_rate'] = grouped['wins'] / grouped['games_played']
+        return grouped[[*self.group_cols, 'win_rate', 'games_played']]
+
+
+def wilson_interval(wins: np.ndarray, games: np.ndarray, confidence: float = 0.95) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Calcula el intervalo de confianza de Wilson para una proporción de forma vectorizada.
+
+    Args:
+        wins (np.ndarray): Número de éxitos por grupo.
+        games (np.ndarray): Número de intentos por grupo.
+        confidence (float): Nivel de confianza (0.95 por defecto).
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Límites inferior y superior (NaN donde games es 0).
+
+    Notes:
+        A diferencia del intervalo normal, Wilson se comporta bien con pocas partidas,
+        que es lo habitual para campeones poco jugados en un parche.
+    """
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    wins = np.asarray(wins, dtype=np.float64)
+    games = np.asarray(games, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        proportion = wins / games
+        denominator = 1 + z ** 2 / games
+        center = (proportion + z ** 2 / (2 * games)) / denominator
+        margin = z * np.sqrt(proportion * (1 - proportion) / games + z ** 2 / (4 * games ** 2)) / denominator
+    return center - margin, center + margin
+
+
+def _as_categorical(df: pd.DataFrame, columns: Sequence[str]) -> pd.DataFrame:
+    """Devuelve un DataFrame con las columnas indicadas convertidas a categóricas."""
+    converted = {
+        col: df[col].astype('category')
+        for col in columns
+        if not isinstance(df[col].dtype, pd.CategoricalDtype)
+    }
+    return df.assign(**converted) if converted else df
+
+
+def _attach_match_totals(
+    metrics: pd.DataFrame, participants_df: pd.DataFrame, group_cols: Sequence[str], name: str
+) -> pd.DataFrame:
+    """Añade a `metrics` el número de partidas distintas de cada grupo."""
+    group_cols = list(group_cols)
+    if not group_cols:
+        return metrics.assign(**{name: participants_df['match_id'].nunique()})
+
+    totals = (
+        participants_df[[*group_cols, 'match_id']]
+        .drop_duplicates()
+        .groupby(group_cols, observed=True, sort=False)
+        .size()
+        .rename(name)
+        .reset_index()
+    )
+    return metrics.merge(totals, on=group_cols, how='left')
+
+
+def calcular_metricas_meta(
+    participants_df: pd.DataFrame,
+    bans_df: pd.DataFrame | None = None,
+    group_cols: Sequence[str] = ('patch',),
+    confidence: float = 0.95,
+) -> pd.DataFrame:
+    """
+    Calcula win rate, pick rate, ban rate, presencia y partidas por campeón y grupo.
+
+    Args:
+        participants_df (pd.DataFrame): Una fila por participante con columnas
+            ['match_id', 'champion', 'result'] más las de `group_cols`.
+        bans_df (pd.DataFrame | None): Una fila por baneo con columnas ['match_id', 'champion']
+            y, opcionalmente, las de `group_cols` que apliquen a la partida (parche, tier...).
+        group_cols (Sequence[str]): Columnas de agrupación además del campeón,
+            por ejemplo ('patch',), ('patch', 'player_tier') o ('patch', 'role').
+        confidence (float): Nivel de confianza del intervalo de Wilson del win rate.
+
+    Returns:
+        pd.DataFrame: Columnas ['champion', *group_cols] + META_METRIC_COLUMNS.
+
+    Notes:
+        Las filas se agrupan en una sola pasada sobre categóricas (sin bucles de
+        Python); el resto de operaciones trabajan sobre la tabla ya agregada. El
+        denominador de pick/ban rate son las partidas distintas de cada grupo. Si
+        `bans_df` no tiene alguna columna de `group_cols` (por ejemplo 'role'), el
+        ban rate se calcula a nivel de las columnas que sí tiene. Los campeones sólo
+        baneados aparecen con 0 partidas.
+    """
+    group_cols = list(group_cols)
+    keys = ['champion', *group_cols]
+    participants_df = _as_categorical(participants_df, keys)
+
+    grouped = participants_df.groupby(keys, observed=True, sort=False)['result']
+    metrics = pd.DataFrame({'games': grouped.size(), 'wins': grouped.sum()}).reset_index()
+
+    ban_group_cols = group_cols
+    if bans_df is not None and not bans_df.empty:
+        ban_group_cols = [col for col in group_cols if col in bans_df.columns]
+        ban_keys = ['champion', *ban_group_cols]
+        ban_counts = (
+            _as_categorical(bans_df, ban_keys)
+            .groupby(ban_keys, observed=True, sort=False)
+            .size()
+            .rename('bans')
+            .reset_index()
+        )
+        how = 'outer' if ban_group_cols == group_cols else 'left'
+        metrics = metrics.merge(ban_counts, on=ban_keys, how=how)
+        metrics[['games', 'wins', 'bans']] = metrics[['games', 'wins', 'bans']].fillna(0).astype(np.int64)
+    else:
+        metrics['bans'] = 0
+
+    metrics = _attach_match_totals(metrics, participants_df, group_cols, 'total_matches')
+    if ban_group_cols != group_cols:
+        metrics = _attach_match_totals(metrics, participants_df, ban_group_cols, 'ban_matches')
+    else:
+        metrics['ban_matches'] = metrics['total_matches']
+
+    games = metrics['games'].to_numpy(dtype=np.float64)
+    wins = metrics['wins'].to_numpy(dtype=np.float64)
+    total_matches = metrics['total_matches'].to_numpy(dtype=np.float64)
+    ban_matches = metrics.pop('ban_matches').to_numpy(dtype=np.float64)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        metrics['win_rate'] = wins / games
+        metrics['pick_rate'] = games / total_matches
+        metrics['ban_rate'] = metrics['bans'].to_numpy() / ban_matches
+    metrics['win_rate_low'], metrics['win_rate_high'] = wilson_interval(wins, games, confidence)
+    metrics['presence'] = metrics['pick_rate'] + metrics['ban_rate']
+
+    return metrics[[*keys, *META_METRIC_COLUMNS]]
+
+
+def summarize_player_matches(
+    puuid: str, matches: Iterable[dict | ParsedMatch], champion_names: Mapping[int, str]
+) -> tuple[dict, dict, dict]:
+    """
+    Resume las partidas de un jugador en estadísticas generales, por rol y por campeón.
+
+    Args:
+        puuid (str): PUUID del jugador
+        matches (Iterable[dict | ParsedMatch]): Partidas en formato Match-V5 (de la API o
+            de la base) o ya indexadas con `parse_match`
+        champion_names (Mapping[int, str]): Traducción de IDs de campeón a nombres
+
+    Returns:
+        tuple: (overall_stats, stats_by_role, stats_by_champion)
+
+    Notes:
+        No hace llamadas de red: el origen de las partidas lo decide quien llama.
+        Las partidas sin 'info' o en las que no aparece el jugador se ignoran.
+    """
+    stats_by_role: dict = {}
+    stats_by_champion: dict = {}
+    overall_stats = {
+        'total_games': 0,
+        'wins': 0,
+        'champions_played': [],
+        'bans': [],
+        'total_kills': 0,
+        'total_deaths': 0,
+        'total_assists': 0,
+        'total_gold': 0,
+        'total_game_duration': 0
+    }
+
+    for match_data in matches:
+        match = match_data if isinstance(match_data, ParsedMatch) else parse_match(match_data)
+        player = match.player(puuid) if match is not None else None
+        if player is None:
+            continue
+
+        # Datos básicos
+        role = player.team_position or 'UNKNOWN'
+        champion_name = champion_names.get(player.champion_id, f"ID:{player.champion_id}")
+        won = player.win
+        kills, deaths, assists = player.kills, player.deaths, player.assists
+        total_gold = player.gold
+        game_duration_minutes = match.duration_minutes
+
+        # Oro a los 15 min
+        gold_at_15 = ((player.raw.get('challenges') or {}).get('goldPerMinute') or 0) * 15
+        if gold_at_15 == 0:
+            gold_at_15 = player.gold_per_min * min(15, game_duration_minutes)
+
+        # Primer ban del equipo (-1 = turno sin baneo)
+        team_bans = match.bans.get(player.team_id, ())
+        player_ban = None
+        if team_bans and team_bans[0] != -1:
+            player_ban = champion_names.get(team_bans[0], f"ID:{team_bans[0]}")
+
+        # Estadísticas por rol
+        if role not in stats_by_role:
+            stats_by_role[role] = {
+                'games': 0,
+                'wins': 0,
+                'total_gold_15min': 0,
+                'champions': [],
+                'total_kills': 0,
+                'total_deaths': 0,
+                'total_assists': 0,
+                'total_gold': 0,
+                'total_duration': 0
+            }
+
+        stats_by_role[role]['games'] += 1
+        stats_by_role[role]['wins'] += 1 if won else 0
+        stats_by_role[role]['total_gold_15min'] += gold_at_15
+        stats_by_role[role]['champions'].append(champion_name)
+        stats_by_role[role]['total_kills'] += kills
+        stats_by_role[role]['total_deaths'] += deaths
+        stats_by_role[role]['total_assists'] += assists
+        stats_by_role[role]['total_gold'] += total_gold
+        stats_by_role[role]['total_duration'] += game_duration_minutes
+
+        # Estadísticas por campeón
+        if champion_name not in stats_by_champion:
+            stats_by_champion[champion_name] = {
+                'picks': 0,
+                'wins': 0,
+                'total_kills': 0,
+                'total_deaths': 0,
+                'total_assists': 0,
+                'total_gold': 0,
+                'total_duration': 0,
+                'roles': []
+            }
+
+        stats_by_champion[champion_name]['picks'] += 1
+        stats_by_champion[champion_name]['wins'] += 1 if won else 0
+        stats_by_champion[champion_name]['total_kills'] += kills
+        stats_by_champion[champion_name]['total_deaths'] += deaths
+        stats_by_champion[champion_name]['total_assists'] += assists
+        stats_by_champion[champion_name]['total_gold'] += total_gold
+        stats_by_champion[champion_name]['total_duration'] += game_duration_minutes
+        stats_by_champion[champion_name]['roles'].append(role)
+
+        # Estadísticas generales
+        overall_stats['total_games'] += 1
+        overall_stats['wins'] += 1 if won else 0
+        overall_stats['champions_played'].append(champion_name)
+        overall_stats['total_kills'] += kills
+        overall_stats['total_deaths'] += deaths
+        overall_stats['total_assists'] += assists
+        overall_stats['total_gold'] += total_gold
+        overall_stats['total_game_duration'] += game_duration_minutes
+        if player_ban:
+            overall_stats['bans'].append(player_ban)
+
+    return overall_stats, stats_by_role, stats_by_champion
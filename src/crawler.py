@@ -0,0 +1,310 @@
+"""Crawler en anchura para reunir una muestra de partidas a nivel de meta.
+
+Parte de unos jugadores semilla y, por cada jugador de la frontera, lista sus
+partidas recientes de la cola indicada, descarga las que aún no están en la
+base y añade a la frontera a los participantes de esas partidas con
+profundidad + 1. La frontera vive en la tabla ``crawl_frontier``, que además
+sirve para no visitar dos veces al mismo jugador y para reanudar el recorrido.
+
+Los historiales de un lote de jugadores se listan en paralelo y los detalles de
+todas sus partidas se descargan con un único pool acotado
+(`data_collection.get_match_details_many`), de modo que el `RiotClient`
+compartido trabaja siempre al límite de su rate limiter. Limitar
+las partidas por jugador evita que unos pocos jugadores muy activos dominen la
+muestra de cada parche.
+
+Uso::
+
+    python -m src.crawler "Jugador#LAN" --max-players 500 --patch-target 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+try:
+    from . import data_collection
+    from .database import DEFAULT_DB_PATH, MatchRepository, connect_repository
+    from .ingest import read_players, resolve_player
+except ImportError:  # Ejecución directa como script
+    import data_collection
+    from database import DEFAULT_DB_PATH, MatchRepository, connect_repository
+    from ingest import read_players, resolve_player
+
+
+# Cola de clasificatorias Solo/Duo, la referencia habitual para el meta.
+RANKED_SOLO_QUEUE = 420
+
+DEFAULT_MATCHES_PER_PLAYER = 20
+DEFAULT_BATCH_SIZE = 10
+DEFAULT_MAX_DEPTH = 3
+
+
+@dataclass
+class CrawlSummary:
+    """Totales de una ejecución del crawler.
+
+    Attributes:
+        players: Jugadores de la frontera procesados.
+        failed_players: PUUIDs cuyo historial no se pudo listar o descargar.
+        listed: IDs de partida recibidos de la API.
+        fetched: Partidas descargadas.
+        stored: Partidas nuevas guardadas.
+        discovered: Jugadores nuevos añadidos a la frontera.
+        errors: Descargas de partidas fallidas.
+        patch_sizes: Partidas guardadas por parche al terminar.
+    """
+
+    players: int = 0
+    failed_players: List[str] = field(default_factory=list)
+    listed: int = 0
+    fetched: int = 0
+    stored: int = 0
+    discovered: int = 0
+    errors: int = 0
+    patch_sizes: Dict[str, int] = field(default_factory=dict)
+
+
+def _patch_key(patch: str) -> Tuple[int, ...]:
+    return tuple(int(part) if part.isdigit() else -1 for part in patch.split("."))
+
+
+def latest_patch_size(patch_sizes: Dict[str, int]) -> Tuple[Optional[str], int]:
+    """Devuelve el parche más reciente de la muestra y cuántas partidas tiene."""
+
+    if not patch_sizes:
+        return None, 0
+    patch = max(patch_sizes, key=_patch_key)
+    return patch, patch_sizes[patch]
+
+
+def _list_player_matches(
+    puuid: str, *, queue: Optional[int], matches_per_player: int, start_time: int
+) -> List[str] | str:
+    try:
+        return list(data_collection.iter_match_ids(
+            puuid, start_time=start_time, queue=queue, max_ids=matches_per_player
+        ))
+    except data_collection.RiotAPIError as exc:
+        return str(exc)
+
+
+def crawl_batch(
+    repo: MatchRepository,
+    players: Sequence[Tuple[str, int]],
+    summary: CrawlSummary,
+    *,
+    queue: Optional[int] = RANKED_SOLO_QUEUE,
+    matches_per_player: int = DEFAULT_MATCHES_PER_PLAYER,
+    concurrency: int = data_collection.DEFAULT_MAX_CONCURRENCY,
+) -> None:
+    """
+    Procesa un lote de jugadores reclamados de la frontera.
+
+    Args:
+        repo (MatchRepository): Repositorio de destino.
+        players (Sequence[Tuple[str, int]]): Pares ``(puuid, depth)``.
+        summary (CrawlSummary): Totales que se actualizan durante el recorrido.
+        queue (int | None): Cola de las partidas a listar (``None`` = todas).
+        matches_per_player (int): Máximo de partidas recientes por jugador.
+        concurrency (int): Peticiones en paralelo, tanto al listar historiales
+            como al descargar detalles.
+    """
+    start_time = data_collection.year_start_timestamp()
+    owner_of: Dict[str, str] = {}
+    depth_of: Dict[str, int] = {}
+    failed: Dict[str, str] = {}
+
+    # `map` conserva el orden del lote: una partida compartida se asigna siempre
+    # al primer jugador que la listó, como en un recorrido secuencial.
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(players)))) as executor:
+        listings = list(executor.map(
+            lambda puuid: _list_player_matches(
+                puuid, queue=queue, matches_per_player=matches_per_player, start_time=start_time
+            ),
+            [puuid for puuid, _ in players],
+        ))
+
+    for (puuid, depth), listed in zip(players, listings):
+        if isinstance(listed, str):
+            failed[puuid] = listed
+            continue
+        summary.listed += len(listed)
+        depth_of[puuid] = depth
+        for match_id in listed:
+            owner_of.setdefault(match_id, puuid)
+
+    known = repo.get_known_match_ids(owner_of)
+    by_owner: Dict[str, List[dict]] = {}
+    for match_id, details in data_collection.get_match_details_many(
+        [match_id for match_id in owner_of if match_id not in known], max_concurrency=concurrency
+    ):
+        if isinstance(details, dict) and "info" in details:
+            by_owner.setdefault(owner_of[match_id], []).append(details)
+            summary.fetched += 1
+        else:
+            summary.errors += 1
+            failed.setdefault(owner_of[match_id], str(details))
+
+    for puuid, matches in by_owner.items():
+        repo.register_player(puuid)
+        stored = repo.store_matches(puuid, matches, enqueue_timelines=False)
+        summary.stored += len(stored)
+        summary.discovered += repo.expand_crawl_frontier(stored, depth=depth_of[puuid] + 1)
+
+    for puuid, _ in players:
+        # Un jugador con descargas fallidas vuelve a la frontera: sus partidas ya
+        # guardadas se reconocerán en el siguiente intento.
+        repo.finish_crawl_player(puuid, error=failed.get(puuid))
+    summary.players += len(players)
+    summary.failed_players.extend(failed)
+
+
+def crawl(
+    repo: MatchRepository,
+    seeds: Sequence[str] = (),
+    *,
+    max_players: Optional[int] = None,
+    max_depth: Optional[int] = DEFAULT_MAX_DEPTH,
+    queue: Optional[int] = RANKED_SOLO_QUEUE,
+    matches_per_player: int = DEFAULT_MATCHES_PER_PLAYER,
+    patch_target: Optional[int] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    concurrency: int = data_collection.DEFAULT_MAX_CONCURRENCY,
+    log: Callable[[str], None] = print,
+) -> CrawlSummary:
+    """
+    Recorre en anchura la red de jugadores a partir de las semillas.
+
+    Args:
+        repo (MatchRepository): Repositorio de destino (y de la frontera).
+        seeds (Sequence[str]): PUUIDs semilla; se suman a la frontera existente.
+        max_players (int | None): Máximo de jugadores a procesar en esta ejecución.
+        max_depth (int | None): Profundidad máxima desde las semillas.
+        queue (int | None): Cola de las partidas a listar (``None`` = todas).
+        matches_per_player (int): Máximo de partidas recientes por jugador.
+        patch_target (int | None): Detenerse cuando el parche más reciente de la
+            muestra alcance este número de partidas.
+        batch_size (int): Jugadores reclamados por vuelta.
+        concurrency (int): Peticiones en paralelo por lote de jugadores.
+        log (Callable[[str], None]): Función para mensajes de progreso.
+
+    Returns:
+        CrawlSummary: Totales de la ejecución.
+
+    Notes:
+        El recorrido termina al vaciarse la frontera (hasta ``max_depth``), al
+        alcanzar ``max_players`` o ``patch_target``. Una ejecución interrumpida
+        continúa desde la frontera guardada; los jugadores que un proceso dejó
+        'in_progress' se recuperan pasado ``database.JOB_LEASE_SECONDS``.
+    """
+    summary = CrawlSummary()
+    repo.add_crawl_seeds(seeds)
+    repo.reset_stale_crawl_players()
+
+    while max_players is None or summary.players < max_players:
+        if patch_target is not None:
+            patch, size = latest_patch_size(repo.get_patch_sample_sizes())
+            if size >= patch_target:
+                log(f"Muestra completa: {size} partidas del parche {patch}.")
+                break
+
+        limit = batch_size if max_players is None else min(batch_size, max_players - summary.players)
+        players = repo.claim_crawl_players(limit, max_depth=max_depth)
+        if not players:
+            break
+
+        try:
+            crawl_batch(
+                repo,
+                players,
+                summary,
+                queue=queue,
+                matches_per_player=matches_per_player,
+                concurrency=concurrency,
+            )
+        except BaseException:
+            # Interrupción a mitad de lote: sólo se devuelven los jugadores de este lote.
+            repo.release_crawl_players(puuid for puuid, _ in players)
+            raise
+        status = repo.get_crawl_status()
+        log(
+            f"Jugadores: {summary.players} (profundidad {players[-1][1]}), "
+            f"partidas nuevas: {summary.stored}, frontera pendiente: {status['pending']}"
+        )
+
+    summary.patch_sizes = repo.get_patch_sample_sizes()
+    return summary
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Punto de entrada de línea de comandos del crawler."""
+
+    parser = argparse.ArgumentParser(description="Reúne una muestra de partidas recorriendo jugadores en anchura.")
+    parser.add_argument("players", nargs="*", help="Riot IDs (Nombre#TAG) o PUUIDs semilla.")
+    parser.add_argument("--file", help="Archivo con un jugador semilla por línea.")
+    parser.add_argument("--db", default=str(DEFAULT_DB_PATH), help="Ruta de la base SQLite.")
+    parser.add_argument("--max-players", type=int, default=None, help="Máximo de jugadores a procesar.")
+    parser.add_argument("--max-depth", type=int, default=DEFAULT_MAX_DEPTH, help="Profundidad máxima.")
+    parser.add_argument(
+        "--matches-per-player", type=int, default=DEFAULT_MATCHES_PER_PLAYER, help="Partidas por jugador."
+    )
+    parser.add_argument(
+        "--queue", type=int, default=RANKED_SOLO_QUEUE, help="ID de cola (0 = todas las colas)."
+    )
+    parser.add_argument("--patch-target", type=int, default=None, help="Partidas objetivo del último parche.")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Jugadores por lote.")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=data_collection.DEFAULT_MAX_CONCURRENCY,
+        help="Peticiones a la API en paralelo.",
+    )
+    args = parser.parse_args(argv)
+
+    seeds = []
+    for identifier in read_players(args.players, args.file):
+        puuid, _, _ = resolve_player(identifier)
+        if puuid:
+            seeds.append(puuid)
+        else:
+            print(f"No se pudo resolver {identifier}.")
+
+    with connect_repository(args.db) as repo:
+        if not seeds and not repo.get_crawl_status()["pending"]:
+            parser.error("La frontera está vacía: indica al menos un jugador semilla.")
+        summary = crawl(
+            repo,
+            seeds,
+            max_players=args.max_players,
+            max_depth=args.max_depth,
+            queue=args.queue or None,
+            matches_per_player=args.matches_per_player,
+            patch_target=args.patch_target,
+            batch_size=args.batch_size,
+            concurrency=args.concurrency,
+        )
+
+    patch, size = latest_patch_size(summary.patch_sizes)
+    print(
+        f"Jugadores: {summary.players} ({len(summary.failed_players)} con errores), "
+        f"descubiertos: {summary.discovered}. Partidas descargadas: {summary.fetched}, "
+        f"nuevas: {summary.stored}, errores: {summary.errors}. "
+        f"Último parche: {patch or '-'} ({size} partidas)."
+    )
+    return 1 if summary.failed_players else 0
+
+
+__all__ = [
+    "CrawlSummary",
+    "crawl",
+    "crawl_batch",
+    "latest_patch_size",
+]
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,20 +1,29 @@
 """App principal en Streamlit para explorar jugadores de League of Legends."""
 from __future__ import annotations
-import requests
+
 import streamlit as st
 import pandas as pd
+import json_codec
+from analysis import summarize_player_matches
+from database import connect_repository
 from data_collection import (
-    get_champion_data,
-    get_puuid_by_riot_id,
-    get_champion_mastery,
+    get_champion_index,
     get_match_ids,
-    get_match_details,
-    get_latest_version,
+    get_match_details_many,
 )
+from lookup_cache import get_lookup_cache
 from match_view import show_match_view
 
 
-def analyze_player_matches(puuid: str, champion_names: dict, match_count: int = 10):
+def analyze_player_matches(
+    puuid: str,
+    champion_names: dict,
+    match_count: int = 10,
+    *,
+    refresh: bool = False,
+    game_name: str | None = None,
+    tag_line: str | None = None,
+):
     """
     Analiza las últimas partidas de un jugador.
     
@@ -22,146 +31,64 @@ def analyze_player_matches(puuid: str, champion_names: dict, match_count: int =
         puuid (str): PUUID del jugador
         champion_names (dict): Diccionario de traducción de IDs a nombres
         match_count (int): Número de partidas a analizar
+        refresh (bool): Consultar la API por partidas nuevas aunque haya suficientes guardadas
+        game_name (str | None): Nombre del jugador para registrarlo en la base
+        tag_line (str | None): Tag del jugador para registrarlo en la base
         
     Returns:
         tuple: (overall_stats, stats_by_role, stats_by_champion)
-    """
-    match_ids = get_match_ids(puuid, count=match_count)
-
-    if not isinstance(match_ids, list) or len(match_ids) == 0:
-        return None, None, None
-
-    stats_by_role = {}
-    stats_by_champion = {}
-    overall_stats = {
-        'total_games': 0,
-        'wins': 0,
-        'champions_played': [],
-        'bans': [],
-        'total_kills': 0,
-        'total_deaths': 0,
-        'total_assists': 0,
-        'total_gold': 0,
-        'total_game_duration': 0
-    }
-
-    progress_bar = st.progress(0)
-    status_text = st.empty()
-
-    for idx, match_id in enumerate(match_ids):
-        progress_bar.progress((idx + 1) / len(match_ids))
-        status_text.text(f"Procesando partida {idx + 1}/{len(match_ids)}")
-
-        match_data = get_match_details(match_id)
-
-        if not isinstance(match_data, dict) or 'info' not in match_data:
-            continue
 
-        player_data = next(
-            (
-                participant
-                for participant in match_data['info']['participants']
-                if participant['puuid'] == puuid
-            ),
-            None,
-        )
-        if not player_data:
-            continue
-
-        # Datos básicos
-        role = player_data.get('teamPosition', 'UNKNOWN')
-        champion_id = player_data['championId']
-        champion_name = champion_names.get(champion_id, f"ID:{champion_id}")
-        won = player_data['win']
-
-        # KDA
-        kills = player_data.get('kills', 0)
-        deaths = player_data.get('deaths', 0)
-        assists = player_data.get('assists', 0)
-
-        # Gold
-        total_gold = player_data.get('goldEarned', 0)
-        game_duration_minutes = match_data['info']['gameDuration'] / 60
-        gold_per_min = total_gold / game_duration_minutes if game_duration_minutes > 0 else 0
-
-        # Oro a los 15 min
-        gold_at_15 = player_data.get('challenges', {}).get('goldPerMinute', 0) * 15
-        if gold_at_15 == 0:
-            gold_at_15 = gold_per_min * min(15, game_duration_minutes)
+    Notes:
+        Las partidas se leen de la base local. Sólo si faltan partidas (o con
+        `refresh`) se piden los IDs a la API y se descargan las que no estén
+        guardadas, que se almacenan para la próxima vez.
+    """
+    with connect_repository() as repo:
+        stored = repo.get_stored_matches(puuid, limit=match_count)
+        matches = [json_codec.loads(record.raw_json) for record in stored if record.raw_json]
 
-        # Ban del equipo
-        team_id = player_data['teamId']
-        player_ban = None
-        for team in match_data['info']['teams']:
-            if team['teamId'] == team_id:
-                if 'bans' in team and len(team['bans']) > 0:
-                    ban_champion_id = team['bans'][0].get('championId', -1)
-                    if ban_champion_id != -1:
-                        player_ban = champion_names.get(ban_champion_id, f"ID:{ban_champion_id}")
-                break
+        if refresh or len(matches) < match_count:
+            match_ids = get_match_ids(puuid, count=match_count)
+            if isinstance(match_ids, list) and match_ids:
+                matches = _load_matches(repo, puuid, match_ids, game_name, tag_line)
 
-        # Estadísticas por rol
-        if role not in stats_by_role:
-            stats_by_role[role] = {
-                'games': 0,
-                'wins': 0,
-                'total_gold_15min': 0,
-                'champions': [],
-                'total_kills': 0,
-                'total_deaths': 0,
-                'total_assists': 0,
-                'total_gold': 0,
-                'total_duration': 0
-            }
+    if not matches:
+        return None, None, None
 
-        stats_by_role[role]['games'] += 1
-        stats_by_role[role]['wins'] += 1 if won else 0
-        stats_by_role[role]['total_gold_15min'] += gold_at_15
-        stats_by_role[role]['champions'].append(champion_name)
-        stats_by_role[role]['total_kills'] += kills
-        stats_by_role[role]['total_deaths'] += deaths
-        stats_by_role[role]['total_assists'] += assists
-        stats_by_role[role]['total_gold'] += total_gold
-        stats_by_role[role]['total_duration'] += game_duration_minutes
+    return summarize_player_matches(puuid, matches, champion_names)
 
-        # Estadísticas por campeón
-        if champion_name not in stats_by_champion:
-            stats_by_champion[champion_name] = {
-                'picks': 0,
-                'wins': 0,
-                'total_kills': 0,
-                'total_deaths': 0,
-                'total_assists': 0,
-                'total_gold': 0,
-                'total_duration': 0,
-                'roles': []
-            }
 
-        stats_by_champion[champion_name]['picks'] += 1
-        stats_by_champion[champion_name]['wins'] += 1 if won else 0
-        stats_by_champion[champion_name]['total_kills'] += kills
-        stats_by_champion[champion_name]['total_deaths'] += deaths
-        stats_by_champion[champion_name]['total_assists'] += assists
-        stats_by_champion[champion_name]['total_gold'] += total_gold
-        stats_by_champion[champion_name]['total_duration'] += game_duration_minutes
-        stats_by_champion[champion_name]['roles'].append(role)
+def _load_matches(repo, puuid: str, match_ids: list, game_name: str | None, tag_line: str | None) -> list:
+    """Devuelve las partidas de `match_ids` leyendo de la base y descargando sólo las que faltan."""
+    known = {
+        record.match_id: json_codec.loads(record.raw_json)
+        for record in repo.get_matches_by_ids(match_ids)
+        if record.raw_json
+    }
+    missing_ids = [match_id for match_id in match_ids if match_id not in known]
 
-        # Estadísticas generales
-        overall_stats['total_games'] += 1
-        overall_stats['wins'] += 1 if won else 0
-        overall_stats['champions_played'].append(champion_name)
-        overall_stats['total_kills'] += kills
-        overall_stats['total_deaths'] += deaths
-        overall_stats['total_assists'] += assists
-        overall_stats['total_gold'] += total_gold
-        overall_stats['total_game_duration'] += game_duration_minutes
-        if player_ban:
-            overall_stats['bans'].append(player_ban)
+    fetched = {}
+    if missing_ids:
+        progress_bar = st.progress(0)
+        status_text = st.empty()
+        for idx, (match_id, match_data) in enumerate(get_match_details_many(missing_ids)):
+            progress_bar.progress((idx + 1) / len(missing_ids))
+            status_text.text(f"Descargando partida {idx + 1}/{len(missing_ids)}")
+            if isinstance(match_data, dict) and 'info' in match_data:
+                fetched[match_id] = match_data
+        progress_bar.empty()
+        status_text.empty()
 
-    progress_bar.empty()
-    status_text.empty()
+    if fetched:
+        # `matches.puuid` referencia a `players`: el jugador debe existir antes de guardar.
+        repo.register_player(puuid, game_name=game_name, tag_line=tag_line)
+        repo.store_matches(puuid, list(fetched.values()))
 
-    return overall_stats, stats_by_role, stats_by_champion
+    return [
+        known[match_id] if match_id in known else fetched[match_id]
+        for match_id in match_ids
+        if match_id in known or match_id in fetched
+    ]
 
 
 def main():
@@ -173,21 +100,11 @@ def main():
     # Cargar datos de campeones y mapeo para URLs
     if 'champion_names' not in st.session_state:
         with st.spinner("Cargando datos de campeones..."):
-            st.session_state.champion_names = get_champion_data()
-            
-            # Cachear también el mapeo de champion_id a nombre interno para URLs
-            latest_version = get_latest_version()
-            champions_url = f"https://ddragon.leagueoflegends.com/cdn/{latest_version}/data/es_MX/champion.json"
-            response = requests.get(champions_url, timeout=10)
-            champions_data = response.json()
-            
-            champion_id_to_key = {}
-            for champ_key, champ_info in champions_data['data'].items():
-                champion_id = int(champ_info['key'])
-                champion_id_to_key[champion_id] = champ_key
-            
-            st.session_state.champion_id_to_key = champion_id_to_key
-            st.session_state.ddragon_version = latest_version
+            # Una sola carga (desde la caché en disco si existe) para nombres, claves y versión
+            champion_index = get_champion_index()
+            st.session_state.champion_names = champion_index.names
+            st.session_state.champion_id_to_key = champion_index.keys
+            st.session_state.ddragon_version = champion_index.version
     
     champion_names = st.session_state.champion_names
     
@@ -201,10 +118,16 @@ def main():
         tag_line = st.text_input("Tag", value="LAN")
     
     match_count = st.sidebar.slider("Número de partidas a analizar", 5, 20, 10)
+    refresh_matches = st.sidebar.checkbox(
+        "Buscar partidas nuevas en la API",
+        value=False,
+        help="Sin marcar, el análisis usa las partidas ya guardadas si hay suficientes.",
+    )
     
     if st.sidebar.button("Analizar Jugador", type="primary"):
         with st.spinner(f"Obteniendo información de {game_name}#{tag_line}..."):
-            account_info = get_puuid_by_riot_id(game_name, tag_line)
+            # Riot ID -> PUUID sale de la base mientras no venza su TTL
+            account_info = get_lookup_cache().resolve_riot_id(game_name, tag_line)
             
             if 'puuid' not in account_info:
                 st.error(f"No se pudo encontrar el jugador {game_name}#{tag_line}")
@@ -226,7 +149,7 @@ def main():
         
         with tab1:
             with st.spinner("Obteniendo maestría de campeones..."):
-                mastery_data = get_champion_mastery(puuid)
+                mastery_data = get_lookup_cache().get_champion_mastery(puuid)
                 
                 if isinstance(mastery_data, list):
                     st.subheader("Top 10 Campeones por Maestría")
@@ -245,7 +168,14 @@ def main():
         
         with tab2:
             if st.button("Analizar Últimas Partidas"):
-                overall_stats, stats_by_role, stats_by_champion = analyze_player_matches(puuid, champion_names, match_count)
+                overall_stats, stats_by_role, stats_by_champion = analyze_player_matches(
+                    puuid,
+                    champion_names,
+                    match_count,
+                    refresh=refresh_matches,
+                    game_name=st.session_state.get('game_name'),
+                    tag_line=st.session_state.get('tag_line'),
+                )
                 
                 if overall_stats:
                     # Métricas generales
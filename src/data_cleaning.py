@@ -1,33 +1,166 @@
 """Funciones para limpiar y normalizar datos recolectados.
 
-Incluye manejo de NaNs, transformación de tipos y export a `data/processed/`.
+Incluye manejo de NaNs y transformación de tipos. La exportación columnar a
+`data/processed/` está en `parquet_export`.
 """
 from __future__ import annotations
 import pandas as pd
-from typing import Tuple
+from pathlib import Path
+from typing import Iterator, Sequence, Tuple
 
 
-def clean_match_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+# Columnas mínimas de un dataset de partidas.
+EXPECTED_COLUMNS = ["champion", "patch", "player_tier", "result"]
+
+# Tipos explícitos al leer CSV: evita que pandas infiera `object` (o float para el parche).
+MATCH_CSV_DTYPES = {
+    "champion": "category",
+    "patch": "category",
+    "player_tier": "category",
+    "result": "Int8",
+}
+
+# Vocabulario fijo y ordenado de tiers de clasificatoria. Los valores que no
+# aparecen aquí (por ejemplo ligas profesionales) se añaden al final.
+TIER_ORDER = [
+    "IRON", "BRONZE", "SILVER", "GOLD", "PLATINUM", "EMERALD",
+    "DIAMOND", "MASTER", "GRANDMASTER", "CHALLENGER",
+]
+
+# Filas por bloque al leer CSV grandes.
+DEFAULT_CHUNK_SIZE = 500_000
+
+
+def _to_categorical(values: pd.Series, vocabulary: Sequence[str] | None = None, ordered: bool = False) -> pd.Series:
+    """Convierte a categórica usando `vocabulary` como categorías base (más los valores extra)."""
+    if not isinstance(values.dtype, pd.CategoricalDtype):
+        values = values.astype("category")
+    if vocabulary is None:
+        return values
+    known = set(vocabulary)
+    extra = [value for value in values.cat.categories if value not in known]
+    return values.cat.set_categories([*vocabulary, *extra], ordered=ordered)
+
+
+def _patch_sort_key(patch: str) -> tuple:
+    major, _, rest = patch.partition(".")
+    minor = rest.split(".", 1)[0]
+    if major.isdigit() and minor.isdigit():
+        return (0, int(major), int(minor), patch)
+    return (1, 0, 0, patch)
+
+
+def _compact_patch(patch: pd.Series) -> Tuple[pd.Series, pd.Series, pd.Series]:
+    """
+    Devuelve el parche como categórica ordenada y sus componentes mayor/menor.
+
+    El parseo se hace sobre las categorías (unas pocas decenas), no sobre las filas.
+    """
+    if isinstance(patch.dtype, pd.CategoricalDtype):
+        patch = patch.cat.rename_categories(patch.cat.categories.astype(str))
+    else:
+        patch = patch.astype("string").astype("category")
+    categories = sorted(patch.cat.categories, key=_patch_sort_key)
+    patch = patch.cat.reorder_categories(categories, ordered=True)
+
+    parts = pd.Series(categories, dtype="string").str.extract(r"^(\d+)\.(\d+)")
+    codes = patch.cat.codes.to_numpy()
+    components = []
+    for column in (0, 1):
+        by_category = pd.to_numeric(parts[column]).astype("Int8").array
+        components.append(pd.Series(by_category.take(codes, allow_fill=True), index=patch.index))
+    return patch, components[0], components[1]
+
+
+def clean_match_dataframe(
+    df: pd.DataFrame,
+    champion_vocabulary: Sequence[str] | None = None,
+) -> pd.DataFrame:
     """
-    Limpia un DataFrame de partidas (ejemplo).
+    Limpia un DataFrame de partidas y lo deja con tipos compactos.
 
     Args:
         df (pd.DataFrame): DataFrame crudo con datos de partidas.
+        champion_vocabulary (Sequence[str] | None): Nombres de campeones usados como
+            categorías fijas (por ejemplo, los de Data Dragon) para que todos los
+            bloques compartan las mismas categorías.
 
     Returns:
-        pd.DataFrame: DataFrame limpio y normalizado.
+        pd.DataFrame: DataFrame limpio (no modifica `df`) con:
+            - champion: categórica (con el vocabulario indicado)
+            - patch: categórica ordenada por versión ('13.2' < '13.10')
+            - patch_major / patch_minor: Int8 (nulos si el parche no es 'X.Y')
+            - player_tier: categórica ordenada según TIER_ORDER
+            - result: int8 (Int8 si hay resultados nulos)
     """
     # Ejemplo: asegurar columnas mínimas
-    expected_cols = ["champion", "patch", "player_tier", "result"]
-    for col in expected_cols:
-        if col not in df.columns:
-            df[col] = pd.NA
+    missing = {col: pd.NA for col in EXPECTED_COLUMNS if col not in df.columns}
+    if missing:
+        df = df.assign(**missing)
+
+    # Filas sin campeón o parche no sirven para ninguna agregación
+    df = df[df["champion"].notna() & df["patch"].notna()]
 
-    # Normalizaciones básicas
-    df["patch"] = df["patch"].astype(str)
-    df = df.dropna(subset=["champion", "patch"], how="any")
+    patch, patch_major, patch_minor = _compact_patch(df["patch"])
+    result = pd.to_numeric(df["result"], errors="coerce")
+    result = result.astype("Int8" if result.isna().any() else "int8")
 
-    return df
+    return df.assign(
+        champion=_to_categorical(df["champion"], champion_vocabulary),
+        patch=patch,
+        patch_major=patch_major,
+        patch_minor=patch_minor,
+        player_tier=_to_categorical(df["player_tier"], TIER_ORDER, ordered=True),
+        result=result,
+    )
+
+
+def memory_report(before: pd.DataFrame, after: pd.DataFrame) -> dict:
+    """
+    Compara el uso de memoria de un DataFrame antes y después de limpiarlo.
+
+    Args:
+        before (pd.DataFrame): DataFrame original.
+        after (pd.DataFrame): DataFrame limpio.
+
+    Returns:
+        dict: {'bytes_before', 'bytes_after', 'bytes_saved', 'ratio'} contando
+        el contenido real de las cadenas (`memory_usage(deep=True)`).
+    """
+    bytes_before = int(before.memory_usage(deep=True).sum())
+    bytes_after = int(after.memory_usage(deep=True).sum())
+    return {
+        "bytes_before": bytes_before,
+        "bytes_after": bytes_after,
+        "bytes_saved": bytes_before - bytes_after,
+        "ratio": bytes_before / bytes_after if bytes_after else float("inf"),
+    }
+
+
+def iter_match_csv(
+    path: Path | str,
+    chunksize: int = DEFAULT_CHUNK_SIZE,
+    usecols: list[str] | None = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Lee un CSV de partidas por bloques y devuelve cada bloque ya limpio.
+
+    Args:
+        path (Path | str): Ruta del CSV.
+        chunksize (int): Filas por bloque; acota la memoria máxima usada.
+        usecols (list[str] | None): Columnas a leer (por defecto, todas).
+
+    Yields:
+        pd.DataFrame: Bloques limpios con categóricas para champion, patch y player_tier.
+
+    Notes:
+        Las categorías de cada bloque son independientes; para agregar entre
+        bloques usa reductores como `analysis.WinrateAccumulator`.
+    """
+    dtypes = {col: dtype for col, dtype in MATCH_CSV_DTYPES.items() if usecols is None or col in usecols}
+    with pd.read_csv(path, dtype=dtypes, usecols=usecols, chunksize=chunksize) as reader:
+        for chunk in reader:
+            yield clean_match_dataframe(chunk)
 
 
 # TODO: Añadir funciones para transformar formatos provenientes de distintas fuentes
@@ -1,19 +1,175 @@
 """Módulo para recolectar datos desde Riot API.
 
 Contiene funciones para llamar endpoints de Riot API, Data Dragon y obtener información de jugadores.
+Todas las peticiones pasan por un `RiotClient` compartido con conexiones keep-alive.
 """
 from __future__ import annotations
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
 import requests
-from typing import Any, Dict, List
+from typing import Any, Callable, Container, Dict, Iterable, Iterator, List, Tuple
 from dotenv import load_dotenv
 
+try:
+    from .ddragon_cache import DEFAULT_CACHE_DIR, ChampionIndex, DataDragonCache
+    from .response_cache import DEFAULT_CACHE_PATH, DEFAULT_MAX_BYTES, ResponseCache
+    from .riot_client import RiotClient
+except ImportError:  # Ejecución directa con `streamlit run src/dashboard.py`
+    from ddragon_cache import DEFAULT_CACHE_DIR, ChampionIndex, DataDragonCache
+    from response_cache import DEFAULT_CACHE_PATH, DEFAULT_MAX_BYTES, ResponseCache
+    from riot_client import RiotClient
+
 load_dotenv()
 
 API_KEY = os.getenv("RIOT_API_KEY")
 REGION = os.getenv("RIOT_REGION", "americas")
 PLATFORM = os.getenv("RIOT_PLATFORM", "la1")
 
+# URLs base de la API. Se pueden sobreescribir (por ejemplo, para apuntar a un servidor local en tests).
+REGIONAL_BASE_URL = os.getenv("RIOT_REGIONAL_BASE_URL", f"https://{REGION}.api.riotgames.com")
+PLATFORM_BASE_URL = os.getenv("RIOT_PLATFORM_BASE_URL", f"https://{PLATFORM}.api.riotgames.com")
+
+# Número de descargas simultáneas por defecto para las consultas masivas.
+DEFAULT_MAX_CONCURRENCY = 8
+
+# Máximo de IDs por llamada que admite Match-V5.
+MATCH_IDS_PAGE_SIZE = 100
+
+# Directorio de la caché en disco de Data Dragon.
+DDRAGON_CACHE_DIR = os.getenv("DDRAGON_CACHE_DIR", str(DEFAULT_CACHE_DIR))
+
+# Caché persistente de partidas y líneas de tiempo (RIOT_RESPONSE_CACHE=0 la desactiva).
+RESPONSE_CACHE_ENABLED = os.getenv("RIOT_RESPONSE_CACHE", "1") != "0"
+RESPONSE_CACHE_PATH = os.getenv("RIOT_RESPONSE_CACHE_PATH", str(DEFAULT_CACHE_PATH))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RIOT_RESPONSE_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+
+# Cliente HTTP y caché de Data Dragon compartidos por el módulo (se crean bajo demanda).
+_client: RiotClient | None = None
+_ddragon_cache: DataDragonCache | None = None
+_response_cache: ResponseCache | None = None
+_response_cache_enabled = RESPONSE_CACHE_ENABLED
+_client_lock = threading.Lock()
+
+
+class RiotAPIError(RuntimeError):
+    """Error devuelto por la API de Riot en las funciones que no pueden devolverlo como texto."""
+
+
+def get_client() -> RiotClient:
+    """
+    Devuelve el cliente HTTP compartido, creándolo si todavía no existe.
+
+    Returns:
+        RiotClient: Cliente con sesiones keep-alive y limitador de peticiones
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = RiotClient(API_KEY)
+        return _client
+
+
+def set_client(client: RiotClient | None) -> RiotClient | None:
+    """
+    Reemplaza el cliente HTTP compartido.
+
+    Args:
+        client (RiotClient | None): Nuevo cliente; ``None`` para crear uno por defecto en la siguiente llamada
+
+    Returns:
+        RiotClient | None: Cliente anterior (no se cierra automáticamente)
+    """
+    global _client
+    with _client_lock:
+        previous, _client = _client, client
+        return previous
+
+
+def get_response_cache() -> ResponseCache | None:
+    """
+    Devuelve la caché compartida de respuestas, creándola si todavía no existe.
+
+    Returns:
+        ResponseCache | None: Caché de partidas y líneas de tiempo, o ``None`` si está desactivada
+    """
+    global _response_cache
+    if not _response_cache_enabled:
+        return None
+    with _client_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache(RESPONSE_CACHE_PATH, max_bytes=RESPONSE_CACHE_MAX_BYTES)
+        return _response_cache
+
+
+def set_response_cache(cache: ResponseCache | None) -> ResponseCache | None:
+    """
+    Reemplaza la caché compartida de respuestas.
+
+    Args:
+        cache (ResponseCache | None): Nueva caché; ``None`` desactiva la caché
+
+    Returns:
+        ResponseCache | None: Caché anterior (no se cierra automáticamente)
+    """
+    global _response_cache, _response_cache_enabled
+    with _client_lock:
+        previous, _response_cache = _response_cache, cache
+        _response_cache_enabled = cache is not None
+        return previous
+
+
+def _get_cached_match_resource(kind: str, match_id: str, url: str, method: str) -> Dict[str, Any] | str:
+    """Descarga un recurso inmutable de Match-V5 pasando por la caché de respuestas."""
+    cache = get_response_cache()
+    if cache is not None:
+        cached = cache.get(kind, REGION, match_id)
+        if cached is not None:
+            return cached
+
+    response = get_client().get(url, host=REGION, method=method)
+    if response.status_code != 200:
+        return response.text
+    payload = response.json()
+    if cache is not None and isinstance(payload, dict) and "info" in payload:
+        cache.put(kind, REGION, match_id, payload)
+    return payload
+
+
+def _fetch_ddragon_json(url: str) -> Any:
+    """Descarga un recurso JSON de Data Dragon con el cliente compartido."""
+    response = get_client().get(url, method="ddragon")
+    response.raise_for_status()
+    return response.json()
+
+
+def get_ddragon_cache() -> DataDragonCache:
+    """
+    Devuelve la caché compartida de Data Dragon, creándola si todavía no existe.
+
+    Returns:
+        DataDragonCache: Caché en disco de versiones y datos de campeones
+    """
+    global _ddragon_cache
+    with _client_lock:
+        if _ddragon_cache is None:
+            _ddragon_cache = DataDragonCache(_fetch_ddragon_json, DDRAGON_CACHE_DIR)
+        return _ddragon_cache
+
+
+def get_champion_index() -> ChampionIndex:
+    """
+    Obtiene los índices de campeones de la versión más reciente de Data Dragon.
+
+    Returns:
+        ChampionIndex: Versión, {championId: nombre} y {championId: clave interna}
+
+    Notes:
+        Tras la primera carga los datos salen de memoria o de disco sin llamadas de red.
+    """
+    return get_ddragon_cache().champion_index()
+
 
 def get_latest_version() -> str:
     """
@@ -21,10 +177,11 @@ def get_latest_version() -> str:
     
     Returns:
         str: Versión más reciente (ej: "13.24.1")
+
+    Notes:
+        La lista de versiones se cachea en disco con un TTL.
     """
-    versions_url = "https://ddragon.leagueoflegends.com/api/versions.json"
-    versions = requests.get(versions_url, timeout=10).json()
-    return versions[0]
+    return get_ddragon_cache().latest_version()
 
 
 def get_champion_data() -> Dict[int, str]:
@@ -37,18 +194,7 @@ def get_champion_data() -> Dict[int, str]:
     Notes:
         Usa la versión más reciente de Data Dragon y datos en español (es_MX).
     """
-    latest_version = get_latest_version()
-    
-    champions_url = f"https://ddragon.leagueoflegends.com/cdn/{latest_version}/data/es_MX/champion.json"
-    response = requests.get(champions_url, timeout=10)
-    champions_data = response.json()
-    
-    champion_dict = {}
-    for champ_key, champ_info in champions_data['data'].items():
-        champion_id = int(champ_info['key'])
-        champion_dict[champion_id] = champ_info['name']
-    
-    return champion_dict
+    return dict(get_champion_index().names)
 
 
 def get_champion_icon_url(champion_id: int, champion_name: str | None = None) -> str:
@@ -67,25 +213,7 @@ def get_champion_icon_url(champion_id: int, champion_name: str | None = None) ->
         Usa el nombre interno del campeón (ej: "MonkeyKing" para Wukong).
     """
     try:
-        latest_version = get_latest_version()
-        
-        # Si no se proporciona el nombre, obtener datos de campeones
-        if not champion_name:
-            champions_url = f"https://ddragon.leagueoflegends.com/cdn/{latest_version}/data/es_MX/champion.json"
-            response = requests.get(champions_url, timeout=10)
-            champions_data = response.json()
-            
-            # Buscar el campeón por ID
-            for champ_key, champ_info in champions_data['data'].items():
-                if int(champ_info['key']) == champion_id:
-                    champion_name = champ_key
-                    break
-        
-        if champion_name:
-            return f"https://ddragon.leagueoflegends.com/cdn/{latest_version}/img/champion/{champion_name}.png"
-        else:
-            # Fallback a un icono genérico
-            return f"https://ddragon.leagueoflegends.com/cdn/{latest_version}/img/profileicon/29.png"
+        return get_champion_index().icon_url(champion_id, champion_name)
     except Exception:
         # En caso de error, devolver icono por defecto
         return "https://ddragon.leagueoflegends.com/cdn/13.24.1/img/profileicon/29.png"
@@ -105,9 +233,8 @@ def get_puuid_by_riot_id(game_name: str, tag_line: str) -> Dict[str, Any]:
     Notes:
         Usa Account-V1 API con routing regional (americas/europe/asia).
     """
-    url = f"https://{REGION}.api.riotgames.com/riot/account/v1/accounts/by-riot-id/{game_name}/{tag_line}"
-    headers = {"X-Riot-Token": API_KEY}
-    response = requests.get(url, headers=headers, timeout=10)
+    url = f"{REGIONAL_BASE_URL}/riot/account/v1/accounts/by-riot-id/{game_name}/{tag_line}"
+    response = get_client().get(url, host=REGION, method="account-v1.by-riot-id")
     return response.json() if response.status_code == 200 else {"error": response.status_code, "message": response.text}
 
 
@@ -124,19 +251,32 @@ def get_champion_mastery(puuid: str) -> Dict[str, Any] | List[Dict[str, Any]]:
     Notes:
         Usa Champion-Mastery-V4 API con plataforma específica (la1/na1/euw1).
     """
-    url = f"https://{PLATFORM}.api.riotgames.com/lol/champion-mastery/v4/champion-masteries/by-puuid/{puuid}"
-    headers = {"X-Riot-Token": API_KEY}
-    response = requests.get(url, headers=headers, timeout=10)
+    url = f"{PLATFORM_BASE_URL}/lol/champion-mastery/v4/champion-masteries/by-puuid/{puuid}"
+    response = get_client().get(url, host=PLATFORM, method="champion-mastery-v4.by-puuid")
     return response.json() if response.status_code == 200 else {"error": response.status_code, "message": response.text}
 
 
-def get_match_ids(puuid: str, count: int = 20) -> List[str] | str:
+def get_match_ids(
+    puuid: str,
+    count: int = 20,
+    start: int = 0,
+    *,
+    start_time: int | None = None,
+    end_time: int | None = None,
+    queue: int | None = None,
+    match_type: str | None = None,
+) -> List[str] | str:
     """
     Obtiene lista de IDs de partidas recientes de un jugador.
     
     Args:
         puuid (str): PUUID del jugador
-        count (int): Número de partidas a obtener
+        count (int): Número de partidas a obtener (máximo 100 por llamada)
+        start (int): Posición desde la que empezar (0 = la más reciente)
+        start_time (int | None): Sólo partidas posteriores a este epoch (segundos)
+        end_time (int | None): Sólo partidas anteriores a este epoch (segundos)
+        queue (int | None): ID de cola (por ejemplo 420 para SoloQ)
+        match_type (str | None): Tipo de partida ('ranked', 'normal', 'tourney', 'tutorial')
         
     Returns:
         List[str]: Lista de IDs de partidas o string con error
@@ -144,13 +284,91 @@ def get_match_ids(puuid: str, count: int = 20) -> List[str] | str:
     Notes:
         Usa Match-V5 API con routing regional (americas/europe/asia).
     """
-    url = f"https://{REGION}.api.riotgames.com/lol/match/v5/matches/by-puuid/{puuid}/ids"
-    headers = {"X-Riot-Token": API_KEY}
-    params = {"count": count}
-    response = requests.get(url, headers=headers, params=params, timeout=10)
+    url = f"{REGIONAL_BASE_URL}/lol/match/v5/matches/by-puuid/{puuid}/ids"
+    params = {"start": start, "count": count} if start else {"count": count}
+    filters = {"startTime": start_time, "endTime": end_time, "queue": queue, "type": match_type}
+    params.update({name: value for name, value in filters.items() if value is not None})
+    response = get_client().get(url, host=REGION, method="match-v5.ids-by-puuid", params=params)
     return response.json() if response.status_code == 200 else response.text
 
 
+def year_start_timestamp(year: int | None = None) -> int:
+    """Devuelve el epoch (segundos, UTC) del 1 de enero de `year` (por defecto, el año en curso)."""
+
+    year = datetime.now(timezone.utc).year if year is None else year
+    return int(datetime(year, 1, 1, tzinfo=timezone.utc).timestamp())
+
+
+def iter_match_ids(
+    puuid: str,
+    *,
+    start: int = 0,
+    start_time: int | None = None,
+    end_time: int | None = None,
+    queue: int | None = None,
+    match_type: str | None = None,
+    max_ids: int | None = None,
+    is_known: Callable[[List[str]], Container[str]] | None = None,
+    page_size: int = MATCH_IDS_PAGE_SIZE,
+) -> Iterator[str]:
+    """
+    Recorre el historial de un jugador página a página, de la partida más reciente a la más antigua.
+
+    Args:
+        puuid (str): PUUID del jugador
+        start (int): Posición desde la que empezar (0 = la más reciente)
+        start_time, end_time, queue, match_type: Filtros de `get_match_ids`
+        max_ids (int | None): Máximo de IDs a devolver; ``None`` recorre todo el historial
+        is_known (Callable | None): Recibe los IDs de una página y devuelve los que ya están
+            guardados (por ejemplo `MatchRepository.get_known_match_ids`); esos IDs no se
+            devuelven
+        page_size (int): IDs por llamada (máximo 100)
+
+    Yields:
+        str: IDs de partida en el orden de la API.
+
+    Raises:
+        RiotAPIError: Si una página devuelve un error.
+
+    Notes:
+        Con `is_known` la iteración termina tras ``page_size`` IDs guardados
+        seguidos: el resto del historial es más antiguo y se sincronizó antes. No
+        se corta en el primer ID conocido porque una descarga fallida deja un
+        hueco entre partidas guardadas, que así se recupera en la siguiente
+        sincronización. Una actualización incremental cuesta una o dos llamadas.
+    """
+    yielded = 0
+    known_run = 0
+    while max_ids is None or yielded < max_ids:
+        count = page_size if max_ids is None else min(page_size, max_ids - yielded)
+        page = get_match_ids(
+            puuid,
+            count=count,
+            start=start,
+            start_time=start_time,
+            end_time=end_time,
+            queue=queue,
+            match_type=match_type,
+        )
+        if not isinstance(page, list):
+            raise RiotAPIError(f"Error al listar partidas de {puuid}: {page}")
+
+        known = is_known(page) if is_known is not None and page else ()
+        for match_id in page:
+            if match_id in known:
+                known_run += 1
+                if known_run >= page_size:
+                    return
+                continue
+            known_run = 0
+            yield match_id
+            yielded += 1
+
+        if len(page) < count:
+            return
+        start += len(page)
+
+
 def get_match_details(match_id: str) -> Dict[str, Any] | str:
     """
     Obtiene detalles completos de una partida.
@@ -162,12 +380,49 @@ def get_match_details(match_id: str) -> Dict[str, Any] | str:
         Dict[str, Any]: Datos completos de la partida o string con error
         
     Notes:
-        Usa Match-V5 API con routing regional (americas/europe/asia).
+        Usa Match-V5 API con routing regional (americas/europe/asia). Las partidas
+        descargadas se guardan en la caché de respuestas (ver `get_response_cache`).
     """
-    url = f"https://{REGION}.api.riotgames.com/lol/match/v5/matches/{match_id}"
-    headers = {"X-Riot-Token": API_KEY}
-    response = requests.get(url, headers=headers, timeout=10)
-    return response.json() if response.status_code == 200 else response.text
+    url = f"{REGIONAL_BASE_URL}/lol/match/v5/matches/{match_id}"
+    return _get_cached_match_resource("match", match_id, url, "match-v5.match")
+
+
+def get_match_details_many(
+    match_ids: Iterable[str], max_concurrency: int = DEFAULT_MAX_CONCURRENCY
+) -> Iterator[Tuple[str, Dict[str, Any] | str]]:
+    """
+    Descarga los detalles de varias partidas en paralelo.
+
+    Args:
+        match_ids (Iterable[str]): IDs de las partidas a descargar
+        max_concurrency (int): Número máximo de peticiones simultáneas
+
+    Returns:
+        Iterator[Tuple[str, Dict[str, Any] | str]]: Pares (match_id, detalles) en el orden
+        en que se completan las descargas. Los detalles son un string con el error si la
+        petición falla.
+
+    Notes:
+        Usa un pool de hilos sobre `get_match_details`, por lo que el orden de salida no
+        coincide con el de entrada. Si el consumidor deja de iterar, las descargas
+        pendientes se cancelan.
+    """
+    pending_ids = list(dict.fromkeys(match_ids))
+    if not pending_ids:
+        return
+
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(pending_ids))))
+    try:
+        futures = {executor.submit(get_match_details, match_id): match_id for match_id in pending_ids}
+        for future in as_completed(futures):
+            match_id = futures[future]
+            try:
+                details = future.result()
+            except requests.RequestException as exc:
+                details = str(exc)
+            yield match_id, details
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
 
 
 def get_match_timeline(match_id: str) -> Dict[str, Any] | str:
@@ -181,9 +436,8 @@ def get_match_timeline(match_id: str) -> Dict[str, Any] | str:
         Dict[str, Any]: Datos de la línea de tiempo o string con error
 
     Notes:
-        Usa Match-V5 API con routing regional (americas/europe/asia).
+        Usa Match-V5 API con routing regional (americas/europe/asia). Las líneas
+        de tiempo descargadas se guardan en la caché de respuestas.
     """
-    url = f"https://{REGION}.api.riotgames.com/lol/match/v5/matches/{match_id}/timeline"
-    headers = {"X-Riot-Token": API_KEY}
-    response = requests.get(url, headers=headers, timeout=10)
-    return response.json() if response.status_code == 200 else response.text
+    url = f"{REGIONAL_BASE_URL}/lol/match/v5/matches/{match_id}/timeline"
+    return _get_cached_match_resource("timeline", match_id, url, "match-v5.timeline")
@@ -5,21 +5,173 @@ identificadores de partida consultados para cada jugador (PUUID). La lógica
 principal se centra en agregar únicamente las partidas del año en curso (YTD)
 que todavía no existen en la base, permitiendo así hacer consultas recurrentes
 sin duplicados.
+
+Las conexiones se reparten con `ConnectionManager`: la base trabaja en modo WAL,
+cada hilo lee con su propia conexión y las escrituras se serializan en una sola.
 """
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+import argparse
+import base64
+from contextlib import contextmanager
+from dataclasses import astuple, dataclass, field
 from datetime import datetime, timezone
 import json
+import os
 import sqlite3
+import threading
 from pathlib import Path
-from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+try:
+    from . import json_codec, storage_codec
+    from .parsed_match import parse_match
+    from .timeline_features import TimelineFeatures, extract_timeline_features
+except ImportError:  # Ejecución directa con `streamlit run src/dashboard.py`
+    import json_codec
+    import storage_codec
+    from parsed_match import parse_match
+    from timeline_features import TimelineFeatures, extract_timeline_features
 
 
 # Ruta por defecto para la base de datos dentro del repositorio
 DEFAULT_DB_PATH = Path("data/processed/lol_matches.db")
 
+# `INSERT ... RETURNING` está disponible desde SQLite 3.35.
+_SUPPORTS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+# Máximo de parámetros `?` por consulta (el límite por defecto de SQLite antiguo es 999).
+_MAX_QUERY_PARAMS = 500
+
+# Compresión usada al escribir `raw_json` y `timeline_json` ("zlib", "zstd" o vacío
+# para guardar JSON plano). Las filas existentes se leen siempre, sea cual sea su formato.
+DEFAULT_COMPRESSION = os.getenv("LOL_DB_COMPRESSION") or None
+
+# Tiempo tras el cual un trabajo 'in_progress' de las colas (líneas de tiempo,
+# crawler) se considera abandonado y puede volver a reclamarse. Un trabajo dura
+# segundos; el margen evita quitárselo a otro proceso que siga activo.
+JOB_LEASE_SECONDS = 15 * 60
+
+# Pragmas aplicados a todas las conexiones. WAL permite lecturas concurrentes con
+# un escritor; `synchronous=NORMAL` es seguro en WAL y evita un fsync por commit.
+CONNECTION_PRAGMAS = (
+    "PRAGMA foreign_keys = ON;",
+    "PRAGMA synchronous = NORMAL;",
+    "PRAGMA busy_timeout = 5000;",
+    "PRAGMA temp_store = MEMORY;",
+    "PRAGMA mmap_size = 268435456;",  # 256 MB
+    "PRAGMA cache_size = -65536;",  # 64 MB
+)
+
+# Tablas de resumen mantenidas por triggers sobre `participants`, con sus claves.
+# Las claves de texto nulas se guardan como '' para que el UPSERT las agrupe.
+ROLLUP_TABLES = {
+    "player_champion_stats": ("puuid", "champion_id"),
+    "player_role_stats": ("puuid", "team_position"),
+    "champion_patch_stats": ("champion_id", "patch"),
+}
+_ROLLUP_KEY_TYPES = {"puuid": "TEXT", "champion_id": "INTEGER", "team_position": "TEXT", "patch": "TEXT"}
+_NULLABLE_ROLLUP_KEYS = {"team_position", "patch"}
+
+# Columnas de totales de los rollups y su expresión sobre una fila de `participants`.
+_ROLLUP_METRICS = (
+    ("games", "1"),
+    ("wins", "{row}win"),
+    ("kills", "{row}kills"),
+    ("deaths", "{row}deaths"),
+    ("assists", "{row}assists"),
+    ("gold", "{row}gold"),
+    ("damage", "{row}damage"),
+    ("vision", "{row}vision"),
+    ("duration", "COALESCE({row}duration, 0)"),
+)
+
+
+@dataclass(frozen=True)
+class ParticipantRecord:
+    """Fila normalizada con el rendimiento de un jugador en una partida.
+
+    Attributes:
+        match_id: Identificador de la partida.
+        puuid: PUUID del participante.
+        champion_id: ID del campeón jugado.
+        team_id: Equipo (100 = azul, 200 = rojo).
+        team_position: Rol asignado (TOP, JUNGLE, MIDDLE, BOTTOM, UTILITY).
+        win: 1 si el equipo ganó, 0 en caso contrario.
+        kills: Asesinatos.
+        deaths: Muertes.
+        assists: Asistencias.
+        gold: Oro total obtenido.
+        damage: Daño total a campeones.
+        vision: Puntuación de visión.
+        duration: Duración de la partida en segundos.
+        patch: Parche en formato ``major.minor`` (por ejemplo ``"14.2"``).
+    """
+
+    match_id: str
+    puuid: str
+    champion_id: int
+    team_id: Optional[int]
+    team_position: Optional[str]
+    win: int
+    kills: int
+    deaths: int
+    assists: int
+    gold: int
+    damage: int
+    vision: int
+    duration: Optional[int]
+    patch: Optional[str]
+
+
+@dataclass(frozen=True)
+class AggregateStats:
+    """Totales agregados de un grupo de participaciones (campeón, rol, parche...).
+
+    Attributes:
+        key: Valor del grupo (ID de campeón, rol o tupla ``(champion_id, patch)``).
+        games: Partidas jugadas.
+        wins: Partidas ganadas.
+        kills: Suma de asesinatos.
+        deaths: Suma de muertes.
+        assists: Suma de asistencias.
+        gold: Suma de oro.
+        damage: Suma de daño a campeones.
+        vision: Suma de puntuación de visión.
+        duration: Suma de duración en segundos.
+    """
+
+    key: Any
+    games: int
+    wins: int
+    kills: int
+    deaths: int
+    assists: int
+    gold: int
+    damage: int
+    vision: int
+    duration: int
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.games if self.games else 0.0
+
+
+@dataclass(frozen=True)
+class MatchPage:
+    """Página del historial de partidas obtenida por cursor.
+
+    Attributes:
+        records: Partidas de la página, de la más reciente a la más antigua.
+        next_cursor: Cursor opaco para la página siguiente (más antigua) o ``None``.
+        prev_cursor: Cursor opaco para la página anterior (más reciente) o ``None``.
+    """
+
+    records: List["MatchRecord"]
+    next_cursor: Optional[str]
+    prev_cursor: Optional[str]
+
 
 @dataclass(frozen=True)
 class MatchRecord:
@@ -30,12 +182,117 @@ class MatchRecord:
         game_year: Año en que se jugó la partida.
         game_timestamp: Timestamp Unix (segundos) del inicio del juego.
         raw_json: Representación cruda opcional de la partida.
+        participants: Filas normalizadas de participantes extraídas al parsear.
     """
 
     match_id: str
     game_year: int
     game_timestamp: Optional[int] = None
     raw_json: Optional[str] = None
+    participants: Tuple[ParticipantRecord, ...] = field(default=(), compare=False, repr=False)
+
+
+def _configure_connection(conn: sqlite3.Connection) -> sqlite3.Connection:
+    """Aplica los pragmas de rendimiento a una conexión."""
+
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def _rollup_key_expr(column: str, row: str = "") -> str:
+    """Expresión de una clave de rollup sobre una fila de `participants`."""
+
+    if column in _NULLABLE_ROLLUP_KEYS:
+        return f"COALESCE({row}{column}, '')"
+    return f"{row}{column}"
+
+
+def _rollup_schema_sql() -> str:
+    """Genera las tablas de rollup y los triggers que las mantienen al día.
+
+    Cada INSERT en `participants` suma la fila a los tres rollups dentro de la
+    misma transacción (incluidos `store_matches` y `backfill_participants`); cada
+    DELETE la resta. Así los resúmenes se leen por clave primaria sin agregar.
+    """
+
+    metric_columns = ", ".join(name for name, _ in _ROLLUP_METRICS)
+    statements: List[str] = []
+    insert_body: List[str] = []
+    delete_body: List[str] = []
+    for table, keys in ROLLUP_TABLES.items():
+        key_columns = ", ".join(keys)
+        columns_sql = ",\n    ".join(
+            [f"{key} {_ROLLUP_KEY_TYPES[key]} NOT NULL" for key in keys]
+            + [f"{name} INTEGER NOT NULL DEFAULT 0" for name, _ in _ROLLUP_METRICS]
+        )
+        statements.append(
+            f"CREATE TABLE IF NOT EXISTS {table} (\n    {columns_sql},\n"
+            f"    PRIMARY KEY ({key_columns})\n) WITHOUT ROWID;"
+        )
+
+        new_values = ", ".join(
+            [_rollup_key_expr(key, "NEW.") for key in keys]
+            + [expr.format(row="NEW.") for _, expr in _ROLLUP_METRICS]
+        )
+        increments = ", ".join(f"{name} = {name} + excluded.{name}" for name, _ in _ROLLUP_METRICS)
+        insert_body.append(
+            f"INSERT INTO {table} ({key_columns}, {metric_columns}) VALUES ({new_values})\n"
+            f"    ON CONFLICT ({key_columns}) DO UPDATE SET {increments};"
+        )
+
+        match_old = " AND ".join(f"{key} = {_rollup_key_expr(key, 'OLD.')}" for key in keys)
+        decrements = ", ".join(
+            f"{name} = {name} - {expr.format(row='OLD.')}" for name, expr in _ROLLUP_METRICS
+        )
+        delete_body.append(f"UPDATE {table} SET {decrements} WHERE {match_old};")
+        delete_body.append(f"DELETE FROM {table} WHERE {match_old} AND games <= 0;")
+
+    statements.append(
+        "CREATE TRIGGER IF NOT EXISTS trg_participants_rollup_insert\n"
+        "AFTER INSERT ON participants\nBEGIN\n" + "\n".join(insert_body) + "\nEND;"
+    )
+    statements.append(
+        "CREATE TRIGGER IF NOT EXISTS trg_participants_rollup_delete\n"
+        "AFTER DELETE ON participants\nBEGIN\n" + "\n".join(delete_body) + "\nEND;"
+    )
+    return "\n\n".join(statements)
+
+
+def _rollup_aggregate_sql(table: str) -> str:
+    """Consulta que recalcula un rollup desde cero a partir de `participants`."""
+
+    keys = ROLLUP_TABLES[table]
+    key_exprs = [_rollup_key_expr(key) for key in keys]
+    totals = ", ".join(
+        "COUNT(*)" if name == "games" else f"SUM({expr.format(row='')})"
+        for name, expr in _ROLLUP_METRICS
+    )
+    return (
+        f"SELECT {', '.join(key_exprs)}, {totals} FROM participants "
+        f"GROUP BY {', '.join(key_exprs)}"
+    )
+
+
+def _rebuild_rollups(conn: sqlite3.Connection) -> None:
+    """Vacía y recalcula todos los rollups dentro de la transacción en curso."""
+
+    metric_columns = ", ".join(name for name, _ in _ROLLUP_METRICS)
+    for table, keys in ROLLUP_TABLES.items():
+        conn.execute(f"DELETE FROM {table};")
+        conn.execute(
+            f"INSERT INTO {table} ({', '.join(keys)}, {metric_columns}) "
+            f"{_rollup_aggregate_sql(table)};"
+        )
+
+
+def _ensure_columns(conn: sqlite3.Connection, table: str, columns: Dict[str, str]) -> None:
+    """Añade a ``table`` las columnas de ``columns`` (nombre -> tipo) que aún no existan."""
+
+    existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table});")}
+    for name, column_type in columns.items():
+        if name not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {column_type};")
 
 
 def _initialize_database(db_path: Path | str = DEFAULT_DB_PATH) -> sqlite3.Connection:
@@ -45,15 +302,17 @@ def _initialize_database(db_path: Path | str = DEFAULT_DB_PATH) -> sqlite3.Conne
     if not db_path.parent.exists():
         db_path.parent.mkdir(parents=True, exist_ok=True)
 
-    conn = sqlite3.connect(db_path)
-    conn.execute("PRAGMA foreign_keys = ON;")
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode = WAL;")
+    _configure_connection(conn)
     conn.executescript(
         """
         CREATE TABLE IF NOT EXISTS players (
             puuid TEXT PRIMARY KEY,
             game_name TEXT,
             tag_line TEXT,
-            last_searched TEXT DEFAULT CURRENT_TIMESTAMP
+            last_searched TEXT DEFAULT CURRENT_TIMESTAMP,
+            account_checked_at REAL
         );
 
         CREATE TABLE IF NOT EXISTS matches (
@@ -63,22 +322,133 @@ def _initialize_database(db_path: Path | str = DEFAULT_DB_PATH) -> sqlite3.Conne
             game_timestamp INTEGER,
             raw_json TEXT,
             created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            -- Orden de inserción explícito: a diferencia del rowid implícito, VACUUM
+            -- no lo renumera, así que sirve de marca de agua (ver `parquet_export`).
+            seq INTEGER,
             FOREIGN KEY (puuid) REFERENCES players(puuid)
         );
 
         CREATE INDEX IF NOT EXISTS idx_matches_puuid_year
             ON matches (puuid, game_year);
         
-        CREATE INDEX IF NOT EXISTS idx_matches_puuid_timestamp
-            ON matches (puuid, game_timestamp DESC);
+        -- Índice de la paginación por cursor: (game_timestamp, match_id) desempata
+        -- partidas con el mismo timestamp. Sustituye al índice sólo por timestamp.
+        CREATE INDEX IF NOT EXISTS idx_matches_puuid_timestamp_id
+            ON matches (puuid, game_timestamp DESC, match_id DESC);
+
+        DROP INDEX IF EXISTS idx_matches_puuid_timestamp;
 
         CREATE TABLE IF NOT EXISTS match_timelines (
             match_id TEXT PRIMARY KEY,
             timeline_json TEXT NOT NULL,
             FOREIGN KEY (match_id) REFERENCES matches(match_id)
         );
+
+        CREATE TABLE IF NOT EXISTS participants (
+            match_id TEXT NOT NULL,
+            puuid TEXT NOT NULL,
+            champion_id INTEGER NOT NULL,
+            team_id INTEGER,
+            team_position TEXT,
+            win INTEGER NOT NULL,
+            kills INTEGER NOT NULL DEFAULT 0,
+            deaths INTEGER NOT NULL DEFAULT 0,
+            assists INTEGER NOT NULL DEFAULT 0,
+            gold INTEGER NOT NULL DEFAULT 0,
+            damage INTEGER NOT NULL DEFAULT 0,
+            vision INTEGER NOT NULL DEFAULT 0,
+            duration INTEGER,
+            patch TEXT,
+            PRIMARY KEY (match_id, puuid),
+            FOREIGN KEY (match_id) REFERENCES matches(match_id)
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_participants_puuid_champion
+            ON participants (puuid, champion_id);
+
+        CREATE INDEX IF NOT EXISTS idx_participants_champion_patch
+            ON participants (champion_id, patch);
+
+        -- Cola persistente de líneas de tiempo por descargar (ver `timeline_prefetch`).
+        -- status: 'pending', 'in_progress', 'done' o 'failed'.
+        CREATE TABLE IF NOT EXISTS timeline_queue (
+            match_id TEXT PRIMARY KEY,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            last_error TEXT,
+            enqueued_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (match_id) REFERENCES matches(match_id)
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_timeline_queue_status
+            ON timeline_queue (status, enqueued_at);
+
+        -- Progreso de la ingesta por línea de comandos (ver `ingest`).
+        CREATE TABLE IF NOT EXISTS ingest_checkpoints (
+            puuid TEXT PRIMARY KEY,
+            next_start INTEGER NOT NULL DEFAULT 0,
+            completed INTEGER NOT NULL DEFAULT 0,
+            updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+        );
+
+        -- Frontera del crawler (ver `crawler`): jugadores descubiertos en las partidas
+        -- guardadas, recorridos en anchura por `depth`.
+        CREATE TABLE IF NOT EXISTS crawl_frontier (
+            puuid TEXT PRIMARY KEY,
+            depth INTEGER NOT NULL DEFAULT 0,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            last_error TEXT,
+            discovered_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_crawl_frontier_status
+            ON crawl_frontier (status, depth, discovered_at);
+
+        -- Última respuesta de Champion-Mastery-V4 por jugador (ver `lookup_cache`).
+        CREATE TABLE IF NOT EXISTS player_mastery (
+            puuid TEXT PRIMARY KEY,
+            payload TEXT NOT NULL,
+            fetched_at REAL NOT NULL
+        );
+
+        -- Series por minuto extraídas de `match_timelines` (ver `timeline_features`).
+        CREATE TABLE IF NOT EXISTS match_timeline_features (
+            match_id TEXT PRIMARY KEY,
+            data BLOB NOT NULL,
+            FOREIGN KEY (match_id) REFERENCES match_timelines(match_id)
+        );
+
+        CREATE TABLE IF NOT EXISTS compression_dictionaries (
+            dict_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            codec TEXT NOT NULL,
+            data BLOB NOT NULL,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        );
         """
     )
+    # Columnas añadidas después de crear la tabla en bases existentes.
+    _ensure_columns(conn, "players", {"account_checked_at": "REAL"})
+    _ensure_columns(conn, "matches", {"seq": "INTEGER"})
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_matches_seq ON matches (seq);")
+    with conn:
+        # Partidas anteriores a la columna: su rowid aún refleja el orden de inserción.
+        conn.execute(
+            """
+            UPDATE matches SET seq = (SELECT COALESCE(MAX(seq), 0) FROM matches) + rowid
+            WHERE seq IS NULL;
+            """
+        )
+    conn.executescript(_rollup_schema_sql())
+
+    # Bases anteriores a los rollups: se calculan una vez a partir de `participants`.
+    has_rollups = conn.execute("SELECT 1 FROM player_champion_stats LIMIT 1;").fetchone()
+    has_participants = conn.execute("SELECT 1 FROM participants LIMIT 1;").fetchone()
+    if has_participants and not has_rollups:
+        with conn:
+            _rebuild_rollups(conn)
     return conn
 
 
@@ -118,6 +488,54 @@ def _determine_year_from_match(match: dict) -> Optional[int]:
     return datetime.fromtimestamp(timestamp, tz=timezone.utc).year
 
 
+def _extract_participant_records(match_id: str, match: dict) -> Tuple[ParticipantRecord, ...]:
+    """Extrae una fila normalizada por participante de una partida de Match-V5."""
+
+    parsed = parse_match(match, match_id)
+    if parsed is None:
+        return ()
+
+    return tuple(
+        ParticipantRecord(
+            match_id=match_id,
+            puuid=participant.puuid,
+            champion_id=participant.champion_id,
+            team_id=participant.team_id,
+            team_position=participant.team_position or None,
+            win=int(participant.win),
+            kills=participant.kills,
+            deaths=participant.deaths,
+            assists=participant.assists,
+            gold=participant.gold,
+            damage=participant.damage,
+            vision=participant.vision,
+            duration=parsed.duration,
+            patch=parsed.patch,
+        )
+        for participant in parsed.participants
+        if participant.puuid
+    )
+
+
+def _encode_cursor(direction: str, game_timestamp: Optional[int], match_id: str) -> str:
+    """Serializa una posición del historial en un cursor opaco."""
+
+    payload = json.dumps([direction, game_timestamp, match_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> Tuple[str, Tuple[Optional[int], str]]:
+    """Recupera ``(dirección, (game_timestamp, match_id))`` de un cursor."""
+
+    try:
+        direction, game_timestamp, match_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, TypeError) as exc:
+        raise ValueError(f"Cursor de paginación inválido: {cursor!r}") from exc
+    if direction not in ("next", "prev") or not isinstance(match_id, str):
+        raise ValueError(f"Cursor de paginación inválido: {cursor!r}")
+    return direction, (game_timestamp, match_id)
+
+
 def _parse_match_records(
     matches: Iterable[dict | str],
     default_year: Optional[int],
@@ -131,6 +549,7 @@ def _parse_match_records(
         raw_json: Optional[str] = None
         match_year: Optional[int] = None
         game_timestamp: Optional[int] = None
+        participants: Tuple[ParticipantRecord, ...] = ()
 
         if isinstance(match, dict):
             metadata = match.get("metadata")
@@ -138,9 +557,11 @@ def _parse_match_records(
                 match_id = metadata.get("matchId")
             if not match_id:
                 match_id = match.get("matchId") or match.get("id")
-            raw_json = json.dumps(match, ensure_ascii=False)
+            raw_json = json_codec.dumps(match)
             match_year = _determine_year_from_match(match)
             game_timestamp = _extract_timestamp_from_match(match)
+            if match_id:
+                participants = _extract_participant_records(match_id, match)
         elif isinstance(match, str):
             match_id = match
 
@@ -157,12 +578,147 @@ def _parse_match_records(
             match_id=match_id, 
             game_year=match_year, 
             game_timestamp=game_timestamp,
-            raw_json=raw_json
+            raw_json=raw_json,
+            participants=participants,
         ))
 
     return records
 
 
+class ConnectionManager:
+    """Reparte conexiones a una base SQLite entre hilos.
+
+    El esquema se crea una sola vez al construir el gestor. Cada hilo obtiene su
+    propia conexión de lectura (WAL permite leer mientras otro hilo escribe) y
+    todas las escrituras pasan por una única conexión protegida por un lock, de
+    modo que la ingesta en segundo plano y las sesiones del dashboard no se
+    bloquean entre sí.
+
+    Las lecturas llegan desde hilos de vida corta (reruns de Streamlit, hilos de
+    revalidación, workers de los executors), así que al abrir un lector nuevo se
+    cierran los de los hilos que ya terminaron.
+    """
+
+    def __init__(self, db_path: Path | str = DEFAULT_DB_PATH) -> None:
+        self.db_path = Path(db_path)
+        self._owner_thread: Optional[int] = None
+        self._writer: Optional[sqlite3.Connection] = _initialize_database(self.db_path)
+        self._writer_lock = threading.RLock()
+        self._local = threading.local()
+        self._readers: List[Tuple[threading.Thread, sqlite3.Connection]] = []
+        self._readers_lock = threading.Lock()
+
+    @classmethod
+    def from_connection(cls, connection: sqlite3.Connection) -> "ConnectionManager":
+        """Envuelve una conexión existente, que se usa tanto para leer como para escribir.
+
+        Una sola conexión no puede dar lectores por hilo, así que el gestor sólo se
+        puede usar desde el hilo que lo creó; desde otro hilo se lanza
+        ``RuntimeError``. Para compartir la base entre hilos usa `get_connection_manager`.
+        """
+
+        manager = cls.__new__(cls)
+        manager.db_path = None
+        manager._owner_thread = threading.get_ident()
+        manager._writer = connection
+        manager._writer_lock = threading.RLock()
+        manager._local = threading.local()
+        manager._local.connection = connection
+        manager._readers = []
+        manager._readers_lock = threading.Lock()
+        return manager
+
+    @property
+    def closed(self) -> bool:
+        return self._writer is None
+
+    def _check_thread(self) -> None:
+        if self._owner_thread is not None and threading.get_ident() != self._owner_thread:
+            raise RuntimeError(
+                "Este repositorio envuelve una única conexión y sólo puede usarse desde el hilo que lo creó."
+            )
+
+    def reader(self) -> sqlite3.Connection:
+        """Devuelve la conexión de lectura del hilo actual (creándola si hace falta)."""
+
+        if self._writer is None:
+            raise RuntimeError("La conexión a la base de datos ha sido cerrada.")
+        self._check_thread()
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            if self.db_path is None:
+                # Gestor creado a partir de una única conexión: se comparte con el escritor.
+                return self._writer
+            connection = _configure_connection(sqlite3.connect(self.db_path, check_same_thread=False))
+            self._local.connection = connection
+            with self._readers_lock:
+                self._close_finished_readers()
+                self._readers.append((threading.current_thread(), connection))
+        return connection
+
+    def _close_finished_readers(self) -> None:
+        """Cierra las conexiones de lectura de hilos que ya terminaron (con el lock tomado)."""
+
+        alive = []
+        for thread, connection in self._readers:
+            if thread.is_alive():
+                alive.append((thread, connection))
+            else:
+                connection.close()
+        self._readers = alive
+
+    @property
+    def reader_count(self) -> int:
+        """Conexiones de lectura abiertas."""
+
+        with self._readers_lock:
+            return len(self._readers)
+
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        """Entrega la conexión de escritura en exclusiva y confirma al salir."""
+
+        self._check_thread()
+        with self._writer_lock:
+            if self._writer is None:
+                raise RuntimeError("La conexión a la base de datos ha sido cerrada.")
+            try:
+                yield self._writer
+            except BaseException:
+                self._writer.rollback()
+                raise
+            else:
+                self._writer.commit()
+
+    def close(self) -> None:
+        """Cierra la conexión de escritura y todas las de lectura."""
+
+        with self._writer_lock:
+            with self._readers_lock:
+                for _, connection in self._readers:
+                    connection.close()
+                self._readers.clear()
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+
+_MANAGERS: Dict[Path, ConnectionManager] = {}
+_MANAGERS_LOCK = threading.Lock()
+
+
+def get_connection_manager(db_path: Path | str = DEFAULT_DB_PATH) -> ConnectionManager:
+    """Devuelve el gestor compartido para una ruta, inicializando el esquema sólo la primera vez."""
+
+    key = Path(db_path).resolve()
+    with _MANAGERS_LOCK:
+        manager = _MANAGERS.get(key)
+        if manager is None or manager.closed:
+            manager = ConnectionManager(db_path)
+            _MANAGERS[key] = manager
+        return manager
+
+
 class MatchRepository:
     """Encapsula las operaciones de persistencia sobre la base de datos local.
 
@@ -171,8 +727,24 @@ class MatchRepository:
     el propio proyecto (sin endpoints HTTP adicionales).
     """
 
-    def __init__(self, connection: sqlite3.Connection) -> None:
-        self._connection = connection
+    def __init__(
+        self,
+        connection: Optional[sqlite3.Connection] = None,
+        *,
+        manager: Optional[ConnectionManager] = None,
+        compression: Optional[str] = DEFAULT_COMPRESSION,
+    ) -> None:
+        if compression is not None and compression not in storage_codec.available_codecs():
+            raise ValueError(f"Compresión no disponible: {compression!r}")
+        if (connection is None) == (manager is None):
+            raise ValueError("Indica una conexión o un gestor de conexiones.")
+        # Un repositorio creado con una conexión propia la cierra al cerrarse; los
+        # gestores compartidos siguen abiertos para otras sesiones.
+        self._owns_manager = manager is None
+        self._manager: Optional[ConnectionManager] = manager or ConnectionManager.from_connection(connection)
+        self._compression = compression
+        self._dictionaries: Optional[Dict[int, bytes]] = None
+        self._active_dictionary_id: Optional[int] = None
 
     def __enter__(self) -> "MatchRepository":
         return self
@@ -181,45 +753,172 @@ class MatchRepository:
         self.close()
 
     @classmethod
-    def connect(cls, db_path: Path | str = DEFAULT_DB_PATH) -> "MatchRepository":
-        """Crea un repositorio conectado a la ruta indicada."""
+    def connect(
+        cls,
+        db_path: Path | str = DEFAULT_DB_PATH,
+        *,
+        compression: Optional[str] = DEFAULT_COMPRESSION,
+    ) -> "MatchRepository":
+        """Crea un repositorio sobre el gestor compartido de la ruta indicada."""
 
-        connection = _initialize_database(db_path)
-        return cls(connection)
+        return cls(manager=get_connection_manager(db_path), compression=compression)
 
     def close(self) -> None:
-        """Cierra la conexión subyacente si sigue abierta."""
+        """Libera el repositorio; cierra las conexiones sólo si le pertenecen."""
 
-        if self._connection is not None:
-            self._connection.close()
-            self._connection = None
+        if self._manager is not None:
+            if self._owns_manager:
+                self._manager.close()
+            self._manager = None
 
     def _get_connection(self) -> sqlite3.Connection:
-        """Devuelve la conexión activa o lanza un error si fue cerrada."""
+        """Devuelve la conexión de lectura del hilo actual o lanza un error si fue cerrada."""
 
-        if self._connection is None:
+        if self._manager is None:
             raise RuntimeError("La conexión a la base de datos ha sido cerrada.")
-        return self._connection
+        return self._manager.reader()
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        """Entrega la conexión de escritura serializada; confirma al salir sin errores."""
+
+        if self._manager is None:
+            raise RuntimeError("La conexión a la base de datos ha sido cerrada.")
+        with self._manager.writer() as conn:
+            yield conn
+
+    def _load_dictionaries(self) -> Dict[int, bytes]:
+        """Carga (una vez) los diccionarios de compresión guardados en la base."""
+
+        if self._dictionaries is None:
+            cursor = self._get_connection().execute(
+                "SELECT dict_id, data FROM compression_dictionaries;"
+            )
+            self._dictionaries = {dict_id: bytes(data) for dict_id, data in cursor.fetchall()}
+        return self._dictionaries
+
+    def _active_dictionary(self) -> Tuple[int, Optional[bytes]]:
+        """Devuelve el diccionario más reciente para el codec configurado."""
+
+        if self._active_dictionary_id is None:
+            row = self._get_connection().execute(
+                """
+                SELECT dict_id FROM compression_dictionaries
+                WHERE codec = ? ORDER BY dict_id DESC LIMIT 1;
+                """,
+                (self._compression,),
+            ).fetchone()
+            self._active_dictionary_id = row[0] if row else 0
+        if not self._active_dictionary_id:
+            return 0, None
+        return self._active_dictionary_id, self._load_dictionaries().get(self._active_dictionary_id)
+
+    def _encode_payload(self, text: Optional[str]) -> str | bytes | None:
+        """Aplica la compresión configurada a un JSON serializado."""
+
+        if text is None or self._compression is None:
+            return text
+        dictionary_id, dictionary = self._active_dictionary()
+        return storage_codec.compress_text(
+            text, self._compression, dictionary=dictionary, dictionary_id=dictionary_id
+        )
+
+    def _decode_payload(self, value: Any) -> Optional[str]:
+        """Devuelve el JSON en texto de una columna plana o comprimida."""
+
+        if storage_codec.is_compressed(value):
+            return storage_codec.decode_text(value, self._load_dictionaries())
+        return storage_codec.decode_text(value)
+
+    def train_compression_dictionary(self, *, sample_size: int = 200) -> int:
+        """Entrena un diccionario compartido con partidas y timelines almacenados.
+
+        Args:
+            sample_size: Número máximo de partidas y de timelines usados como muestra.
+
+        Returns:
+            Identificador del diccionario creado; pasa a usarse en las escrituras siguientes.
+        """
+
+        if self._compression is None:
+            raise ValueError("El repositorio no tiene compresión configurada.")
+
+        conn = self._get_connection()
+        samples: List[bytes] = []
+        for query in (
+            "SELECT raw_json FROM matches WHERE raw_json IS NOT NULL ORDER BY RANDOM() LIMIT ?;",
+            "SELECT timeline_json FROM match_timelines ORDER BY RANDOM() LIMIT ?;",
+        ):
+            for (value,) in conn.execute(query, (sample_size,)):
+                text = self._decode_payload(value)
+                if text:
+                    samples.append(text.encode("utf-8"))
+
+        dictionary = storage_codec.train_dictionary(samples, self._compression)
+        with self._write() as writer:
+            cursor = writer.execute(
+                "INSERT INTO compression_dictionaries (codec, data) VALUES (?, ?);",
+                (self._compression, dictionary),
+            )
+        self._load_dictionaries()[cursor.lastrowid] = dictionary
+        self._active_dictionary_id = cursor.lastrowid
+        return cursor.lastrowid
+
+    def migrate_storage(self, *, batch_size: int = 200) -> Tuple[int, int]:
+        """Reescribe `raw_json` y `timeline_json` existentes con la compresión configurada.
+
+        Con ``compression=None`` descomprime las filas a JSON plano.
+
+        Returns:
+            Tupla ``(partidas_reescritas, timelines_reescritas)``.
+        """
+
+        conn = self._get_connection()
+        rewritten = []
+        for table, column in (("matches", "raw_json"), ("match_timelines", "timeline_json")):
+            count = 0
+            last_rowid = 0
+            while True:
+                rows = conn.execute(
+                    f"""
+                    SELECT rowid, {column} FROM {table}
+                    WHERE rowid > ? AND {column} IS NOT NULL
+                    ORDER BY rowid LIMIT ?;
+                    """,
+                    (last_rowid, batch_size),
+                ).fetchall()
+                if not rows:
+                    break
+                updates = []
+                for rowid, value in rows:
+                    last_rowid = rowid
+                    encoded = self._encode_payload(self._decode_payload(value))
+                    if encoded != value:
+                        updates.append((encoded, rowid))
+                with self._write() as writer:
+                    writer.executemany(f"UPDATE {table} SET {column} = ? WHERE rowid = ?;", updates)
+                count += len(updates)
+            rewritten.append(count)
+        return rewritten[0], rewritten[1]
 
     def register_player(
         self, puuid: str, game_name: str | None = None, tag_line: str | None = None
     ) -> None:
         """Registra o actualiza la información básica de un jugador."""
 
-        conn = self._get_connection()
         timestamp = datetime.now(timezone.utc).isoformat()
-        conn.execute(
-            """
-            INSERT INTO players (puuid, game_name, tag_line, last_searched)
-            VALUES (?, ?, ?, ?)
-            ON CONFLICT(puuid) DO UPDATE SET
-                game_name = COALESCE(excluded.game_name, players.game_name),
-                tag_line = COALESCE(excluded.tag_line, players.tag_line),
-                last_searched = excluded.last_searched;
-            """,
-            (puuid, game_name, tag_line, timestamp),
-        )
-        conn.commit()
+        with self._write() as conn:
+            conn.execute(
+                """
+                INSERT INTO players (puuid, game_name, tag_line, last_searched)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(puuid) DO UPDATE SET
+                    game_name = COALESCE(excluded.game_name, players.game_name),
+                    tag_line = COALESCE(excluded.tag_line, players.tag_line),
+                    last_searched = excluded.last_searched;
+                """,
+                (puuid, game_name, tag_line, timestamp),
+            )
 
     def store_matches(
         self,
@@ -227,51 +926,250 @@ class MatchRepository:
         matches: Iterable[dict | str],
         *,
         default_year: Optional[int] = None,
+        enqueue_timelines: bool = True,
     ) -> List[str]:
-        """Guarda partidas nuevas para un jugador sólo si pertenecen al año actual."""
+        """Guarda partidas nuevas para un jugador sólo si pertenecen al año actual.
+
+        Con ``enqueue_timelines`` las partidas nuevas se encolan en ``timeline_queue``
+        para el prefetch del dashboard. Las cargas masivas (`ingest`, `crawler`) lo
+        desactivan para no gastar el presupuesto de rate limit de la interfaz.
+        """
 
-        conn = self._get_connection()
         current_year = datetime.now(timezone.utc).year
         records = _parse_match_records(matches, default_year, current_year)
 
         if not records:
             return []
 
-        # Bulk check for existing matches to avoid N+1 queries.
-        # Process in batches to respect SQLite variable limit (999 by default).
-        match_ids = [record.match_id for record in records]
-        existing_ids: set[str] = set()
-        batch_size = 500  # Conservative batch size well under SQLite limit
+        # Todo el lote viaja a una tabla temporal con `executemany` y se inserta con un
+        # único INSERT ... SELECT dentro de una transacción explícita. La compresión se
+        # aplica en SQL, así que sólo se codifican las partidas realmente nuevas.
+        payload_expr = "staging.raw_json"
+        if self._compression is not None:
+            self._active_dictionary()  # Carga previa: la función SQL no debe consultar la base.
+            payload_expr = "encode_payload(staging.raw_json)"
+
+        with self._write() as conn:
+            if self._compression is not None:
+                conn.create_function("encode_payload", 1, self._encode_payload, deterministic=True)
+            conn.execute(
+                """
+                CREATE TEMP TABLE IF NOT EXISTS staging_matches (
+                    match_id TEXT PRIMARY KEY,
+                    game_year INTEGER NOT NULL,
+                    game_timestamp INTEGER,
+                    raw_json TEXT
+                );
+                """
+            )
+            conn.execute("DELETE FROM staging_matches;")
+            conn.executemany(
+                """
+                INSERT OR IGNORE INTO staging_matches (match_id, game_year, game_timestamp, raw_json)
+                VALUES (?, ?, ?, ?);
+                """,
+                [
+                    (record.match_id, record.game_year, record.game_timestamp, record.raw_json)
+                    for record in records
+                ],
+            )
 
-        for i in range(0, len(match_ids), batch_size):
-            batch = match_ids[i : i + batch_size]
-            # Safe: placeholders is generated from len(batch), not user input
-            placeholders = ",".join("?" * len(batch))
-            cursor = conn.execute(
-                f"SELECT match_id FROM matches WHERE match_id IN ({placeholders});",
-                batch,
+            # `seq` continúa la secuencia en el orden del lote; se calcula dentro de la
+            # transacción de escritura, así que dos escritores nunca repiten valores.
+            (last_seq,) = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM matches;").fetchone()
+            insert_sql = f"""
+                INSERT INTO matches (match_id, puuid, game_year, game_timestamp, raw_json, seq)
+                SELECT staging.match_id, ?, staging.game_year, staging.game_timestamp, {payload_expr},
+                       ? + staging.rowid
+                FROM staging_matches AS staging
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM matches WHERE matches.match_id = staging.match_id
+                )
+            """
+            if _SUPPORTS_RETURNING:
+                cursor = conn.execute(insert_sql + " RETURNING match_id;", (puuid, last_seq))
+                new_ids = {row[0] for row in cursor.fetchall()}
+            else:
+                cursor = conn.execute(
+                    """
+                    SELECT staging.match_id FROM staging_matches AS staging
+                    WHERE NOT EXISTS (
+                        SELECT 1 FROM matches WHERE matches.match_id = staging.match_id
+                    );
+                    """
+                )
+                new_ids = {row[0] for row in cursor.fetchall()}
+                conn.execute(insert_sql + ";", (puuid, last_seq))
+
+            self._insert_participants(
+                conn,
+                (
+                    participant
+                    for record in records
+                    if record.match_id in new_ids
+                    for participant in record.participants
+                ),
             )
-            existing_ids.update(row[0] for row in cursor.fetchall())
+            if enqueue_timelines:
+                # Las líneas de tiempo de las partidas nuevas se descargan en segundo plano.
+                self._enqueue_timelines(conn, new_ids)
+            conn.execute("DELETE FROM staging_matches;")
 
-        inserted: List[str] = []
+        # Mantiene el orden de entrada y descarta IDs repetidos dentro del lote.
+        return [match_id for match_id in dict.fromkeys(r.match_id for r in records) if match_id in new_ids]
 
-        for record in records:
-            if record.match_id in existing_ids:
-                continue
+    @staticmethod
+    def _insert_participants(
+        conn: sqlite3.Connection, participants: Iterable[ParticipantRecord]
+    ) -> None:
+        """Inserta filas de participantes dentro de la transacción en curso."""
 
-            conn.execute(
+        conn.executemany(
+            """
+            INSERT OR IGNORE INTO participants (
+                match_id, puuid, champion_id, team_id, team_position, win,
+                kills, deaths, assists, gold, damage, vision, duration, patch
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
+            """,
+            [astuple(participant) for participant in participants],
+        )
+
+    def iter_match_payloads(
+        self, *, after_seq: int = 0, batch_size: int = 500
+    ) -> Iterator[List[Tuple[int, str, Optional[str]]]]:
+        """Recorre las partidas guardadas en orden de inserción, por lotes.
+
+        Args:
+            after_seq: Sólo se devuelven partidas con ``seq`` mayor (marca de agua).
+            batch_size: Número de partidas por lote.
+
+        Yields:
+            Listas de ``(seq, match_id, raw_json)`` con el JSON ya decodificado.
+        """
+
+        conn = self._get_connection()
+        last_seq = after_seq
+        while True:
+            rows = conn.execute(
                 """
-                INSERT OR IGNORE INTO matches (match_id, puuid, game_year, game_timestamp, raw_json)
-                VALUES (?, ?, ?, ?, ?);
+                SELECT seq, match_id, raw_json
+                FROM matches
+                WHERE seq > ?
+                ORDER BY seq
+                LIMIT ?;
                 """,
-                (record.match_id, puuid, record.game_year, record.game_timestamp, record.raw_json),
-            )
-            inserted.append(record.match_id)
+                (last_seq, batch_size),
+            ).fetchall()
+            if not rows:
+                return
+            last_seq = rows[-1][0]
+            yield [(seq, match_id, self._decode_payload(raw_json)) for seq, match_id, raw_json in rows]
+
+    def backfill_participants(self, *, batch_size: int = 500) -> int:
+        """Genera las filas de `participants` para partidas guardadas antes de existir la tabla.
+
+        Args:
+            batch_size: Número de partidas procesadas por transacción.
+
+        Returns:
+            Número de partidas a las que se añadieron participantes.
+        """
+
+        conn = self._get_connection()
+        processed = 0
+        last_rowid = 0
+        while True:
+            rows = conn.execute(
+                """
+                SELECT m.rowid, m.match_id, m.raw_json
+                FROM matches AS m
+                WHERE m.rowid > ?
+                  AND m.raw_json IS NOT NULL
+                  AND NOT EXISTS (SELECT 1 FROM participants AS p WHERE p.match_id = m.match_id)
+                ORDER BY m.rowid
+                LIMIT ?;
+                """,
+                (last_rowid, batch_size),
+            ).fetchall()
+            if not rows:
+                return processed
+
+            batch: List[ParticipantRecord] = []
+            for rowid, match_id, raw_json in rows:
+                last_rowid = rowid
+                try:
+                    # Sólo hacen falta los participantes: decodificación parcial.
+                    match = json_codec.decode_match_summary(self._decode_payload(raw_json))
+                except (ValueError, TypeError):
+                    continue
+                participants = _extract_participant_records(match_id, match)
+                if participants:
+                    batch.extend(participants)
+                    processed += 1
+            with self._write() as writer:
+                self._insert_participants(writer, batch)
+
+    def _read_rollup(self, table: str, key_column: str, filter_column: str, value: Any) -> List[AggregateStats]:
+        """Lee los totales de un rollup filtrando por la primera columna de su clave."""
+
+        key_expr = f"NULLIF({key_column}, '')" if key_column in _NULLABLE_ROLLUP_KEYS else key_column
+        metric_columns = ", ".join(name for name, _ in _ROLLUP_METRICS)
+        cursor = self._get_connection().execute(
+            f"""
+            SELECT {key_expr}, {metric_columns}
+            FROM {table}
+            WHERE {filter_column} = ?
+            ORDER BY games DESC;
+            """,
+            (value,),
+        )
+        return [AggregateStats(*row) for row in cursor.fetchall()]
+
+    def get_player_champion_stats(self, puuid: str) -> List[AggregateStats]:
+        """Totales por campeón de un jugador (clave: ``champion_id``)."""
+
+        return self._read_rollup("player_champion_stats", "champion_id", "puuid", puuid)
 
-        if inserted:
-            conn.commit()
+    def get_player_role_stats(self, puuid: str) -> List[AggregateStats]:
+        """Totales por rol de un jugador (clave: ``team_position``)."""
 
-        return inserted
+        return self._read_rollup("player_role_stats", "team_position", "puuid", puuid)
+
+    def get_champion_patch_stats(self, champion_id: int) -> List[AggregateStats]:
+        """Totales por parche de un campeón entre todos los participantes guardados."""
+
+        return self._read_rollup("champion_patch_stats", "patch", "champion_id", champion_id)
+
+    def rebuild_rollups(self) -> None:
+        """Recalcula los rollups desde `participants` en una sola transacción."""
+
+        with self._write() as conn:
+            _rebuild_rollups(conn)
+
+    def check_rollups(self) -> Dict[str, int]:
+        """Compara cada rollup con una agregación completa de `participants`.
+
+        Returns:
+            Número de filas distintas por tabla (0 en todas si son consistentes).
+        """
+
+        conn = self._get_connection()
+        mismatches: Dict[str, int] = {}
+        for table, keys in ROLLUP_TABLES.items():
+            stored = f"SELECT {', '.join(keys)}, {', '.join(name for name, _ in _ROLLUP_METRICS)} FROM {table}"
+            expected = _rollup_aggregate_sql(table)
+            (count,) = conn.execute(
+                f"""
+                SELECT COUNT(*) FROM (
+                    SELECT * FROM ({stored} EXCEPT {expected})
+                    UNION ALL
+                    SELECT * FROM ({expected} EXCEPT {stored})
+                );
+                """
+            ).fetchone()
+            mismatches[table] = count
+        return mismatches
 
     def get_stored_match_ids(self, puuid: str, *, year: Optional[int] = None) -> List[str]:
         """Obtiene los IDs de partidas almacenadas para un jugador."""
@@ -324,8 +1222,192 @@ class MatchRepository:
             query += f" LIMIT {limit} OFFSET {offset}"
         
         cursor = conn.execute(query, params)
-        return [MatchRecord(match_id, game_year, game_timestamp, raw_json) for match_id, game_year, game_timestamp, raw_json in cursor.fetchall()]
+        return [
+            MatchRecord(match_id, game_year, game_timestamp, self._decode_payload(raw_json))
+            for match_id, game_year, game_timestamp, raw_json in cursor.fetchall()
+        ]
     
+    def get_known_match_ids(self, match_ids: Iterable[str]) -> Set[str]:
+        """Devuelve cuáles de los IDs indicados ya están guardados (sin leer ``raw_json``)."""
+
+        match_ids = list(dict.fromkeys(match_ids))
+        conn = self._get_connection()
+        known: Set[str] = set()
+        for start in range(0, len(match_ids), _MAX_QUERY_PARAMS):
+            chunk = match_ids[start:start + _MAX_QUERY_PARAMS]
+            cursor = conn.execute(
+                f"SELECT match_id FROM matches WHERE match_id IN ({', '.join('?' * len(chunk))});",
+                chunk,
+            )
+            known.update(row[0] for row in cursor)
+        return known
+
+    def get_matches_by_ids(self, match_ids: Iterable[str]) -> List[MatchRecord]:
+        """Obtiene las partidas guardadas entre los IDs indicados, sea cual sea su jugador.
+
+        Args:
+            match_ids: IDs a buscar (los que no estén guardados se omiten).
+
+        Returns:
+            Registros con ``raw_json`` decodificado, en el orden de ``match_ids``.
+        """
+
+        match_ids = list(dict.fromkeys(match_ids))
+        conn = self._get_connection()
+        found: Dict[str, MatchRecord] = {}
+        # SQLite limita el número de parámetros por consulta; se consulta por bloques.
+        for start in range(0, len(match_ids), _MAX_QUERY_PARAMS):
+            chunk = match_ids[start:start + _MAX_QUERY_PARAMS]
+            cursor = conn.execute(
+                f"""
+                SELECT match_id, game_year, game_timestamp, raw_json
+                FROM matches
+                WHERE match_id IN ({", ".join("?" * len(chunk))});
+                """,
+                chunk,
+            )
+            for match_id, game_year, game_timestamp, raw_json in cursor.fetchall():
+                found[match_id] = MatchRecord(
+                    match_id, game_year, game_timestamp, self._decode_payload(raw_json)
+                )
+        return [found[match_id] for match_id in match_ids if match_id in found]
+
+    def get_stored_matches_page(
+        self,
+        puuid: str,
+        *,
+        cursor: Optional[str] = None,
+        page_size: int = 10,
+        year: Optional[int] = None,
+    ) -> MatchPage:
+        """Obtiene una página del historial usando paginación por cursor (keyset).
+
+        En lugar de ``OFFSET`` se busca directamente la posición ``(game_timestamp,
+        match_id)`` en `idx_matches_puuid_timestamp_id`, así que el coste de una
+        página no depende de su profundidad. El orden coincide con
+        `get_stored_matches`: timestamp descendente con las partidas sin timestamp al
+        final.
+
+        Args:
+            puuid: PUUID del jugador.
+            cursor: Cursor devuelto en una página previa (``None`` para la primera).
+            page_size: Número de partidas por página.
+            year: Filtrar por año específico.
+
+        Raises:
+            ValueError: Si el cursor no es válido.
+        """
+
+        if page_size <= 0:
+            raise ValueError("page_size debe ser mayor que cero.")
+
+        direction, key = ("next", None) if cursor is None else _decode_cursor(cursor)
+        fetch_size = page_size + 1
+        if direction == "next":
+            rows = self._seek_older(puuid, key, fetch_size, year)
+        else:
+            rows = list(reversed(self._seek_newer(puuid, key, fetch_size, year)))
+
+        has_more = len(rows) > page_size
+        if direction == "next":
+            rows = rows[:page_size]
+            has_older, has_newer = has_more, cursor is not None
+        else:
+            rows = rows[-page_size:]
+            has_older, has_newer = True, has_more
+
+        records = [
+            MatchRecord(match_id, game_year, game_timestamp, self._decode_payload(raw_json))
+            for match_id, game_year, game_timestamp, raw_json in rows
+        ]
+        next_cursor = prev_cursor = None
+        if records and has_older:
+            next_cursor = _encode_cursor("next", records[-1].game_timestamp, records[-1].match_id)
+        if records and has_newer:
+            prev_cursor = _encode_cursor("prev", records[0].game_timestamp, records[0].match_id)
+        return MatchPage(records, next_cursor, prev_cursor)
+
+    def _seek_older(
+        self,
+        puuid: str,
+        key: Optional[Tuple[Optional[int], str]],
+        limit: int,
+        year: Optional[int],
+    ) -> List[tuple]:
+        """Filas posteriores a `key` en orden de historial (más antiguas primero tras ella)."""
+
+        conn = self._get_connection()
+        year_filter, year_params = ("AND game_year = ?", (year,)) if year is not None else ("", ())
+        columns = "match_id, game_year, game_timestamp, raw_json"
+        rows: List[tuple] = []
+
+        if key is None or key[0] is not None:
+            seek, seek_params = ("", ()) if key is None else ("AND (game_timestamp, match_id) < (?, ?)", key)
+            rows = conn.execute(
+                f"""
+                SELECT {columns} FROM matches
+                WHERE puuid = ? AND game_timestamp IS NOT NULL {seek} {year_filter}
+                ORDER BY game_timestamp DESC, match_id DESC
+                LIMIT ?;
+                """,
+                (puuid, *seek_params, *year_params, limit),
+            ).fetchall()
+            key = None
+
+        if len(rows) < limit:
+            seek, seek_params = ("", ()) if key is None else ("AND match_id < ?", (key[1],))
+            rows += conn.execute(
+                f"""
+                SELECT {columns} FROM matches
+                WHERE puuid = ? AND game_timestamp IS NULL {seek} {year_filter}
+                ORDER BY match_id DESC
+                LIMIT ?;
+                """,
+                (puuid, *seek_params, *year_params, limit - len(rows)),
+            ).fetchall()
+        return rows
+
+    def _seek_newer(
+        self,
+        puuid: str,
+        key: Tuple[Optional[int], str],
+        limit: int,
+        year: Optional[int],
+    ) -> List[tuple]:
+        """Filas anteriores a `key` en orden de historial, empezando por la más cercana."""
+
+        conn = self._get_connection()
+        year_filter, year_params = ("AND game_year = ?", (year,)) if year is not None else ("", ())
+        columns = "match_id, game_year, game_timestamp, raw_json"
+        rows: List[tuple] = []
+        timestamp, match_id = key
+
+        if timestamp is None:
+            rows = conn.execute(
+                f"""
+                SELECT {columns} FROM matches
+                WHERE puuid = ? AND game_timestamp IS NULL AND match_id > ? {year_filter}
+                ORDER BY match_id ASC
+                LIMIT ?;
+                """,
+                (puuid, match_id, *year_params, limit),
+            ).fetchall()
+            seek, seek_params = "", ()
+        else:
+            seek, seek_params = "AND (game_timestamp, match_id) > (?, ?)", (timestamp, match_id)
+
+        if len(rows) < limit:
+            rows += conn.execute(
+                f"""
+                SELECT {columns} FROM matches
+                WHERE puuid = ? AND game_timestamp IS NOT NULL {seek} {year_filter}
+                ORDER BY game_timestamp ASC, match_id ASC
+                LIMIT ?;
+                """,
+                (puuid, *seek_params, *year_params, limit - len(rows)),
+            ).fetchall()
+        return rows
+
     def get_match_count(self, puuid: str, *, year: Optional[int] = None) -> int:
         """Obtiene el número total de partidas almacenadas para un jugador.
         
@@ -357,20 +1439,108 @@ class MatchRepository:
         row = cursor.fetchone()
         return row if row is not None else None
 
-    def store_match_timeline(self, match_id: str, timeline_data: dict) -> None:
-        """Guarda la línea de tiempo de una partida."""
+    def find_player_by_riot_id(self, game_name: str, tag_line: str) -> Optional[Tuple[str, Optional[float]]]:
+        """Busca un jugador por Riot ID (sin distinguir mayúsculas).
 
-        conn = self._get_connection()
-        timeline_json = json.dumps(timeline_data, ensure_ascii=False)
-        conn.execute(
+        Returns:
+            ``(puuid, account_checked_at)`` o ``None``. ``account_checked_at`` es el
+            epoch de la última vez que la API confirmó el Riot ID (``None`` si nunca).
+        """
+
+        row = self._get_connection().execute(
             """
-            INSERT INTO match_timelines (match_id, timeline_json)
-            VALUES (?, ?)
-            ON CONFLICT(match_id) DO NOTHING;
+            SELECT puuid, account_checked_at FROM players
+            WHERE game_name = ? COLLATE NOCASE AND tag_line = ? COLLATE NOCASE
+            ORDER BY account_checked_at DESC NULLS LAST
+            LIMIT 1;
             """,
-            (match_id, timeline_json),
-        )
-        conn.commit()
+            (game_name, tag_line),
+        ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def save_account(self, puuid: str, game_name: str, tag_line: str) -> None:
+        """Registra un Riot ID confirmado por Account-V1.
+
+        Un Riot ID sólo pertenece a una cuenta: si otro PUUID lo tenía (cambio de
+        nombre), se le quita para que no vuelva a resolverse.
+        """
+
+        timestamp = datetime.now(timezone.utc)
+        with self._write() as conn:
+            conn.execute(
+                """
+                UPDATE players SET game_name = NULL, tag_line = NULL, account_checked_at = NULL
+                WHERE puuid <> ? AND game_name = ? COLLATE NOCASE AND tag_line = ? COLLATE NOCASE;
+                """,
+                (puuid, game_name, tag_line),
+            )
+            conn.execute(
+                """
+                INSERT INTO players (puuid, game_name, tag_line, last_searched, account_checked_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(puuid) DO UPDATE SET
+                    game_name = excluded.game_name,
+                    tag_line = excluded.tag_line,
+                    last_searched = excluded.last_searched,
+                    account_checked_at = excluded.account_checked_at;
+                """,
+                (puuid, game_name, tag_line, timestamp.isoformat(), timestamp.timestamp()),
+            )
+
+    def get_mastery(self, puuid: str) -> Optional[Tuple[Any, float]]:
+        """Devuelve ``(respuesta, fetched_at)`` de la última maestría guardada, o ``None``."""
+
+        row = self._get_connection().execute(
+            "SELECT payload, fetched_at FROM player_mastery WHERE puuid = ?;",
+            (puuid,),
+        ).fetchone()
+        return (json.loads(row[0]), row[1]) if row else None
+
+    def save_mastery(self, puuid: str, payload: Any) -> None:
+        """Guarda la respuesta de Champion-Mastery-V4 de un jugador."""
+
+        with self._write() as conn:
+            conn.execute(
+                """
+                INSERT INTO player_mastery (puuid, payload, fetched_at) VALUES (?, ?, ?)
+                ON CONFLICT(puuid) DO UPDATE SET
+                    payload = excluded.payload,
+                    fetched_at = excluded.fetched_at;
+                """,
+                (puuid, json.dumps(payload, separators=(",", ":")), datetime.now(timezone.utc).timestamp()),
+            )
+
+    def store_match_timeline(self, match_id: str, timeline_data: dict) -> None:
+        """Guarda la línea de tiempo de una partida y sus series por minuto."""
+
+        timeline_json = self._encode_payload(json_codec.dumps(timeline_data))
+        features = extract_timeline_features(timeline_data).to_bytes()
+        with self._write() as conn:
+            conn.execute(
+                """
+                INSERT INTO match_timelines (match_id, timeline_json)
+                VALUES (?, ?)
+                ON CONFLICT(match_id) DO NOTHING;
+                """,
+                (match_id, timeline_json),
+            )
+            conn.execute(
+                """
+                INSERT INTO match_timeline_features (match_id, data)
+                VALUES (?, ?)
+                ON CONFLICT(match_id) DO NOTHING;
+                """,
+                (match_id, features),
+            )
+            # Una descarga bajo demanda también resuelve el trabajo de la cola.
+            conn.execute(
+                """
+                UPDATE timeline_queue
+                SET status = 'done', last_error = NULL, updated_at = CURRENT_TIMESTAMP
+                WHERE match_id = ?;
+                """,
+                (match_id,),
+            )
 
     def get_match_timeline(self, match_id: str) -> Optional[dict]:
         """Recupera la línea de tiempo de una partida."""
@@ -383,16 +1553,397 @@ class MatchRepository:
         row = cursor.fetchone()
         if row and row[0]:
             try:
-                return json.loads(row[0])
-            except (json.JSONDecodeError, TypeError):
+                return json_codec.loads(self._decode_payload(row[0]))
+            except (ValueError, TypeError, KeyError):
                 return None
         return None
 
+    def get_timeline_features(self, match_id: str) -> Optional[TimelineFeatures]:
+        """Recupera las series por minuto de una partida sin parsear el JSON.
+
+        Si la línea de tiempo se guardó antes de existir la tabla de series, se
+        extraen y guardan en ese momento.
+        """
+
+        row = self._get_connection().execute(
+            "SELECT data FROM match_timeline_features WHERE match_id = ? LIMIT 1;",
+            (match_id,),
+        ).fetchone()
+        if row:
+            try:
+                return TimelineFeatures.from_bytes(row[0])
+            except ValueError:
+                pass  # Formato antiguo: se regenera desde el JSON.
+
+        timeline = self.get_match_timeline(match_id)
+        if timeline is None:
+            return None
+        features = extract_timeline_features(timeline)
+        with self._write() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO match_timeline_features (match_id, data) VALUES (?, ?);",
+                (match_id, features.to_bytes()),
+            )
+        return features
+
+    def backfill_timeline_features(self, *, batch_size: int = 100) -> int:
+        """Extrae las series de las líneas de tiempo guardadas que aún no las tienen.
+
+        Returns:
+            Número de líneas de tiempo procesadas.
+        """
+
+        conn = self._get_connection()
+        processed = 0
+        last_rowid = 0
+        while True:
+            rows = conn.execute(
+                """
+                SELECT t.rowid, t.match_id, t.timeline_json
+                FROM match_timelines AS t
+                WHERE t.rowid > ?
+                  AND NOT EXISTS (
+                      SELECT 1 FROM match_timeline_features AS f WHERE f.match_id = t.match_id
+                  )
+                ORDER BY t.rowid
+                LIMIT ?;
+                """,
+                (last_rowid, batch_size),
+            ).fetchall()
+            if not rows:
+                return processed
+
+            batch: List[Tuple[str, bytes]] = []
+            for rowid, match_id, timeline_json in rows:
+                last_rowid = rowid
+                try:
+                    timeline = json_codec.loads(self._decode_payload(timeline_json))
+                except (ValueError, TypeError):
+                    continue
+                batch.append((match_id, extract_timeline_features(timeline).to_bytes()))
+            with self._write() as writer:
+                writer.executemany(
+                    "INSERT OR IGNORE INTO match_timeline_features (match_id, data) VALUES (?, ?);",
+                    batch,
+                )
+            processed += len(batch)
+
+    @staticmethod
+    def _enqueue_timelines(conn: sqlite3.Connection, match_ids: Iterable[str]) -> None:
+        """Encola líneas de tiempo sin descargar dentro de la transacción en curso."""
+
+        conn.executemany(
+            """
+            INSERT OR IGNORE INTO timeline_queue (match_id)
+            SELECT ? WHERE NOT EXISTS (SELECT 1 FROM match_timelines WHERE match_id = ?);
+            """,
+            [(match_id, match_id) for match_id in match_ids],
+        )
+
+    def enqueue_timelines(self, match_ids: Optional[Iterable[str]] = None) -> int:
+        """Encola líneas de tiempo para descargar.
+
+        Args:
+            match_ids: Partidas a encolar. Si es ``None`` se encolan todas las
+                partidas guardadas que aún no tienen línea de tiempo.
+
+        Returns:
+            Número de partidas añadidas a la cola.
+        """
+
+        with self._write() as conn:
+            before = conn.total_changes
+            if match_ids is None:
+                conn.execute(
+                    """
+                    INSERT OR IGNORE INTO timeline_queue (match_id)
+                    SELECT m.match_id FROM matches AS m
+                    WHERE NOT EXISTS (SELECT 1 FROM match_timelines AS t WHERE t.match_id = m.match_id);
+                    """
+                )
+            else:
+                self._enqueue_timelines(conn, match_ids)
+            return conn.total_changes - before
+
+    def claim_timeline_jobs(self, limit: int = 10) -> List[str]:
+        """Marca como 'in_progress' y devuelve las siguientes partidas pendientes de la cola."""
+
+        with self._write() as conn:
+            rows = conn.execute(
+                """
+                SELECT match_id FROM timeline_queue
+                WHERE status = 'pending'
+                ORDER BY enqueued_at, match_id
+                LIMIT ?;
+                """,
+                (limit,),
+            ).fetchall()
+            match_ids = [row[0] for row in rows]
+            conn.executemany(
+                """
+                UPDATE timeline_queue
+                SET status = 'in_progress', attempts = attempts + 1, updated_at = CURRENT_TIMESTAMP
+                WHERE match_id = ?;
+                """,
+                [(match_id,) for match_id in match_ids],
+            )
+        return match_ids
+
+    def finish_timeline_job(
+        self, match_id: str, *, error: Optional[str] = None, max_attempts: int = 3
+    ) -> None:
+        """Cierra un trabajo de la cola.
+
+        Sin ``error`` se marca como 'done'. Con error vuelve a 'pending' hasta
+        agotar ``max_attempts`` intentos; después queda como 'failed'.
+        """
+
+        with self._write() as conn:
+            if error is None:
+                conn.execute(
+                    """
+                    UPDATE timeline_queue
+                    SET status = 'done', last_error = NULL, updated_at = CURRENT_TIMESTAMP
+                    WHERE match_id = ?;
+                    """,
+                    (match_id,),
+                )
+            else:
+                conn.execute(
+                    """
+                    UPDATE timeline_queue
+                    SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                        last_error = ?, updated_at = CURRENT_TIMESTAMP
+                    WHERE match_id = ?;
+                    """,
+                    (max_attempts, error[:500], match_id),
+                )
+
+    def release_timeline_jobs(self, match_ids: Iterable[str]) -> int:
+        """Devuelve a 'pending', sin gastar un intento, trabajos reclamados y no procesados."""
+
+        with self._write() as conn:
+            cursor = conn.executemany(
+                """
+                UPDATE timeline_queue
+                SET status = 'pending', attempts = MAX(attempts - 1, 0), updated_at = CURRENT_TIMESTAMP
+                WHERE match_id = ? AND status = 'in_progress';
+                """,
+                [(match_id,) for match_id in match_ids],
+            )
+            return cursor.rowcount
+
+    def reset_stale_timeline_jobs(self, lease_seconds: float = JOB_LEASE_SECONDS) -> int:
+        """Devuelve a 'pending' los trabajos 'in_progress' reclamados hace más de ``lease_seconds``.
+
+        Recupera el trabajo de un proceso que terminó a medias sin quitárselo a otro
+        proceso que lo esté descargando ahora mismo.
+        """
+
+        with self._write() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE timeline_queue SET status = 'pending'
+                WHERE status = 'in_progress' AND updated_at <= datetime('now', ?);
+                """,
+                (f"-{int(lease_seconds)} seconds",),
+            )
+            return cursor.rowcount
+
+    def get_timeline_queue_status(self) -> Dict[str, int]:
+        """Número de trabajos de la cola por estado."""
 
-def connect_repository(db_path: Path | str = DEFAULT_DB_PATH) -> MatchRepository:
+        status = {"pending": 0, "in_progress": 0, "done": 0, "failed": 0}
+        cursor = self._get_connection().execute(
+            "SELECT status, COUNT(*) FROM timeline_queue GROUP BY status;"
+        )
+        status.update(dict(cursor.fetchall()))
+        return status
+
+    def get_ingest_checkpoint(self, puuid: str) -> Tuple[int, bool]:
+        """Devuelve ``(next_start, completed)`` de la ingesta de un jugador."""
+
+        row = self._get_connection().execute(
+            "SELECT next_start, completed FROM ingest_checkpoints WHERE puuid = ?;",
+            (puuid,),
+        ).fetchone()
+        return (row[0], bool(row[1])) if row else (0, False)
+
+    def save_ingest_checkpoint(self, puuid: str, next_start: int, *, completed: bool = False) -> None:
+        """Guarda el progreso de la ingesta de un jugador."""
+
+        with self._write() as conn:
+            conn.execute(
+                """
+                INSERT INTO ingest_checkpoints (puuid, next_start, completed, updated_at)
+                VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(puuid) DO UPDATE SET
+                    next_start = excluded.next_start,
+                    completed = excluded.completed,
+                    updated_at = excluded.updated_at;
+                """,
+                (puuid, next_start, int(completed)),
+            )
+
+    def add_crawl_seeds(self, puuids: Iterable[str], *, depth: int = 0) -> int:
+        """Añade jugadores a la frontera del crawler (los ya descubiertos se ignoran).
+
+        Returns:
+            Número de jugadores nuevos en la frontera.
+        """
+
+        with self._write() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO crawl_frontier (puuid, depth) VALUES (?, ?);",
+                [(puuid, depth) for puuid in dict.fromkeys(puuids) if puuid],
+            )
+            return conn.total_changes - before
+
+    def expand_crawl_frontier(self, match_ids: Iterable[str], *, depth: int) -> int:
+        """Añade a la frontera los participantes de las partidas indicadas.
+
+        Los PUUIDs se leen de ``participants``, que se rellena a partir de
+        ``raw_json`` al guardar cada partida, así que no hace falta decodificarlo.
+
+        Args:
+            match_ids: Partidas guardadas cuyos participantes se descubren.
+            depth: Profundidad asignada a los jugadores nuevos.
+
+        Returns:
+            Número de jugadores nuevos en la frontera.
+        """
+
+        match_ids = list(dict.fromkeys(match_ids))
+        with self._write() as conn:
+            before = conn.total_changes
+            for start in range(0, len(match_ids), _MAX_QUERY_PARAMS):
+                chunk = match_ids[start:start + _MAX_QUERY_PARAMS]
+                conn.execute(
+                    f"""
+                    INSERT OR IGNORE INTO crawl_frontier (puuid, depth)
+                    SELECT DISTINCT puuid, ? FROM participants
+                    WHERE match_id IN ({", ".join("?" * len(chunk))}) AND puuid <> 'BOT';
+                    """,
+                    [depth, *chunk],
+                )
+            return conn.total_changes - before
+
+    def claim_crawl_players(self, limit: int = 10, *, max_depth: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Marca como 'in_progress' y devuelve ``(puuid, depth)`` de los siguientes jugadores.
+
+        Se reclaman por profundidad creciente y orden de descubrimiento, lo que
+        convierte la frontera en un recorrido en anchura.
+        """
+
+        with self._write() as conn:
+            rows = conn.execute(
+                """
+                SELECT puuid, depth FROM crawl_frontier
+                WHERE status = 'pending' AND (? IS NULL OR depth <= ?)
+                ORDER BY depth, discovered_at, puuid
+                LIMIT ?;
+                """,
+                (max_depth, max_depth, limit),
+            ).fetchall()
+            conn.executemany(
+                """
+                UPDATE crawl_frontier
+                SET status = 'in_progress', attempts = attempts + 1, updated_at = CURRENT_TIMESTAMP
+                WHERE puuid = ?;
+                """,
+                [(puuid,) for puuid, _ in rows],
+            )
+        return [(puuid, depth) for puuid, depth in rows]
+
+    def finish_crawl_player(
+        self, puuid: str, *, error: Optional[str] = None, max_attempts: int = 3
+    ) -> None:
+        """Cierra un jugador de la frontera, con las mismas reglas que `finish_timeline_job`."""
+
+        with self._write() as conn:
+            if error is None:
+                conn.execute(
+                    """
+                    UPDATE crawl_frontier
+                    SET status = 'done', last_error = NULL, updated_at = CURRENT_TIMESTAMP
+                    WHERE puuid = ?;
+                    """,
+                    (puuid,),
+                )
+            else:
+                conn.execute(
+                    """
+                    UPDATE crawl_frontier
+                    SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                        last_error = ?, updated_at = CURRENT_TIMESTAMP
+                    WHERE puuid = ?;
+                    """,
+                    (max_attempts, error[:500], puuid),
+                )
+
+    def release_crawl_players(self, puuids: Iterable[str]) -> int:
+        """Devuelve a 'pending', sin gastar un intento, jugadores reclamados y no procesados."""
+
+        with self._write() as conn:
+            cursor = conn.executemany(
+                """
+                UPDATE crawl_frontier
+                SET status = 'pending', attempts = MAX(attempts - 1, 0), updated_at = CURRENT_TIMESTAMP
+                WHERE puuid = ? AND status = 'in_progress';
+                """,
+                [(puuid,) for puuid in puuids],
+            )
+            return cursor.rowcount
+
+    def reset_stale_crawl_players(self, lease_seconds: float = JOB_LEASE_SECONDS) -> int:
+        """Devuelve a 'pending' los jugadores 'in_progress' reclamados hace más de ``lease_seconds``.
+
+        Como en `reset_stale_timeline_jobs`, los reclamados hace poco pueden
+        pertenecer a otro crawler activo sobre la misma base.
+        """
+
+        with self._write() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE crawl_frontier SET status = 'pending'
+                WHERE status = 'in_progress' AND updated_at <= datetime('now', ?);
+                """,
+                (f"-{int(lease_seconds)} seconds",),
+            )
+            return cursor.rowcount
+
+    def get_crawl_status(self) -> Dict[str, int]:
+        """Número de jugadores de la frontera por estado."""
+
+        status = {"pending": 0, "in_progress": 0, "done": 0, "failed": 0}
+        cursor = self._get_connection().execute(
+            "SELECT status, COUNT(*) FROM crawl_frontier GROUP BY status;"
+        )
+        status.update(dict(cursor.fetchall()))
+        return status
+
+    def get_patch_sample_sizes(self) -> Dict[str, int]:
+        """Número de partidas guardadas por parche (según ``participants``)."""
+
+        cursor = self._get_connection().execute(
+            """
+            SELECT patch, COUNT(DISTINCT match_id) FROM participants
+            WHERE patch IS NOT NULL
+            GROUP BY patch;
+            """
+        )
+        return dict(cursor.fetchall())
+
+
+def connect_repository(
+    db_path: Path | str = DEFAULT_DB_PATH,
+    *,
+    compression: Optional[str] = DEFAULT_COMPRESSION,
+) -> MatchRepository:
     """Función de conveniencia para abrir un repositorio listo para usarse."""
 
-    return MatchRepository.connect(db_path)
+    return MatchRepository.connect(db_path, compression=compression)
 
 
 def iter_stored_matches(
@@ -403,11 +1954,85 @@ def iter_stored_matches(
     yield from repo.get_stored_match_ids(puuid, year=year)
 
 
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Punto de entrada de línea de comandos para tareas de mantenimiento de la base."""
+
+    parser = argparse.ArgumentParser(description="Mantenimiento de la base de partidas.")
+    parser.add_argument("--db", default=str(DEFAULT_DB_PATH), help="Ruta de la base SQLite.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser(
+        "backfill-participants",
+        help="Genera la tabla participants para partidas ya almacenadas.",
+    )
+    migrate_parser = subparsers.add_parser(
+        "migrate-storage",
+        help="Reescribe raw_json y timeline_json con otra compresión.",
+    )
+    migrate_parser.add_argument(
+        "--codec",
+        choices=["none", *storage_codec.available_codecs()],
+        default="zlib",
+        help="Formato de destino ('none' guarda JSON plano).",
+    )
+    migrate_parser.add_argument(
+        "--train-dictionary",
+        action="store_true",
+        help="Entrena un diccionario compartido antes de migrar.",
+    )
+    subparsers.add_parser(
+        "backfill-timeline-features",
+        help="Extrae las series por minuto de las líneas de tiempo ya almacenadas.",
+    )
+    subparsers.add_parser(
+        "rebuild-rollups",
+        help="Recalcula las tablas de resumen desde participants.",
+    )
+    subparsers.add_parser(
+        "check-rollups",
+        help="Verifica que las tablas de resumen coinciden con participants.",
+    )
+    args = parser.parse_args(argv)
+
+    compression = None if getattr(args, "codec", "none") == "none" else args.codec
+    with connect_repository(args.db, compression=compression) as repo:
+        if args.command == "backfill-participants":
+            processed = repo.backfill_participants()
+            print(f"Participantes generados para {processed} partidas.")
+        elif args.command == "migrate-storage":
+            if args.train_dictionary and compression is not None:
+                dict_id = repo.train_compression_dictionary()
+                print(f"Diccionario {dict_id} entrenado para {compression}.")
+            matches, timelines = repo.migrate_storage()
+            print(f"Reescritas {matches} partidas y {timelines} timelines.")
+        elif args.command == "backfill-timeline-features":
+            processed = repo.backfill_timeline_features()
+            print(f"Series generadas para {processed} líneas de tiempo.")
+        elif args.command == "rebuild-rollups":
+            repo.rebuild_rollups()
+            print("Rollups recalculados.")
+        elif args.command == "check-rollups":
+            mismatches = repo.check_rollups()
+            for table, count in mismatches.items():
+                print(f"{table}: {'OK' if count == 0 else f'{count} filas distintas'}")
+            if any(mismatches.values()):
+                return 1
+    return 0
+
+
 __all__ = [
     "DEFAULT_DB_PATH",
+    "AggregateStats",
+    "ConnectionManager",
+    "MatchPage",
     "MatchRecord",
     "MatchRepository",
+    "ParticipantRecord",
     "connect_repository",
+    "get_connection_manager",
     "iter_stored_matches",
 ]
 
+
+if __name__ == "__main__":
+    raise SystemExit(main())
+
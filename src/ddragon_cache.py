@@ -0,0 +1,204 @@
+"""Caché en disco de Data Dragon.
+
+Data Dragon es inmutable por versión: el ``champion.json`` de la versión
+``14.1.1`` nunca cambia. Este módulo guarda cada ``champion.json`` en
+``data/raw/ddragon/{version}/{locale}/champion.json`` y sólo consulta
+``versions.json`` cuando su copia local supera un TTL. Los índices
+``championId -> nombre`` y ``championId -> clave interna`` se construyen una sola
+vez por versión, así que resolver un icono es una búsqueda en diccionario sin
+llamadas de red.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import json
+import os
+from pathlib import Path
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+DDRAGON_BASE_URL = "https://ddragon.leagueoflegends.com"
+DEFAULT_CACHE_DIR = Path("data/raw/ddragon")
+DEFAULT_LOCALE = "es_MX"
+
+# Tiempo que se considera vigente la lista de versiones descargada.
+DEFAULT_VERSIONS_TTL_SECONDS = 6 * 60 * 60
+
+# Versión usada si no hay red ni caché local.
+FALLBACK_VERSION = "13.24.1"
+FALLBACK_ICON_PATH = "img/profileicon/29.png"
+
+
+@dataclass(frozen=True)
+class ChampionIndex:
+    """Índices de campeones para una versión y locale de Data Dragon.
+
+    Attributes:
+        version: Versión de Data Dragon.
+        locale: Idioma de los nombres (por ejemplo ``es_MX``).
+        names: Mapeo ``championId -> nombre visible``.
+        keys: Mapeo ``championId -> clave interna`` (``MonkeyKing`` para Wukong).
+    """
+
+    version: str
+    locale: str
+    names: Dict[int, str]
+    keys: Dict[int, str]
+
+    @classmethod
+    def from_champion_json(cls, version: str, locale: str, champions_data: Dict[str, Any]) -> "ChampionIndex":
+        """Construye los índices a partir del contenido de ``champion.json``."""
+
+        names: Dict[int, str] = {}
+        keys: Dict[int, str] = {}
+        for champ_key, champ_info in champions_data.get("data", {}).items():
+            champion_id = int(champ_info["key"])
+            names[champion_id] = champ_info["name"]
+            keys[champion_id] = champ_key
+        return cls(version=version, locale=locale, names=names, keys=keys)
+
+    def icon_url(self, champion_id: int, champion_key: Optional[str] = None) -> str:
+        """Devuelve la URL del icono del campeón (o un icono genérico si no existe)."""
+
+        champion_key = champion_key or self.keys.get(champion_id)
+        if champion_key:
+            return f"{DDRAGON_BASE_URL}/cdn/{self.version}/img/champion/{champion_key}.png"
+        return f"{DDRAGON_BASE_URL}/cdn/{self.version}/{FALLBACK_ICON_PATH}"
+
+
+def _write_json_atomic(path: Path, payload: Any) -> None:
+    """Escribe un JSON en disco de forma atómica para no dejar archivos a medias."""
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + f".{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        json.dump(payload, handle, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path: Path) -> Optional[Any]:
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+
+class DataDragonCache:
+    """Caché de versiones y datos de campeones de Data Dragon.
+
+    Args:
+        fetch_json: Función que descarga una URL y devuelve el JSON decodificado.
+        cache_dir: Directorio raíz de la caché en disco.
+        locale: Idioma de los datos de campeones.
+        versions_ttl: Segundos durante los que la lista de versiones es válida.
+        clock: Reloj de pared (inyectable en tests).
+    """
+
+    def __init__(
+        self,
+        fetch_json: Callable[[str], Any],
+        cache_dir: Path | str = DEFAULT_CACHE_DIR,
+        *,
+        locale: str = DEFAULT_LOCALE,
+        versions_ttl: float = DEFAULT_VERSIONS_TTL_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._fetch_json = fetch_json
+        self.cache_dir = Path(cache_dir)
+        self.locale = locale
+        self.versions_ttl = versions_ttl
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._versions: Optional[List[str]] = None
+        self._versions_fetched_at = 0.0
+        self._indexes: Dict[Tuple[str, str], ChampionIndex] = {}
+
+    @property
+    def _versions_path(self) -> Path:
+        return self.cache_dir / "versions.json"
+
+    def _champion_path(self, version: str, locale: str) -> Path:
+        return self.cache_dir / version / locale / "champion.json"
+
+    def latest_version(self) -> str:
+        """
+        Devuelve la versión más reciente de Data Dragon.
+
+        Returns:
+            str: Versión más reciente (ej: "13.24.1")
+
+        Notes:
+            Usa la copia en memoria o en disco mientras no supere el TTL. Si la red
+            falla se usa la última lista conocida aunque esté caducada.
+        """
+        with self._lock:
+            now = self._clock()
+            if self._versions and now - self._versions_fetched_at < self.versions_ttl:
+                return self._versions[0]
+
+            cached = _read_json(self._versions_path)
+            if isinstance(cached, dict) and cached.get("versions"):
+                self._versions = cached["versions"]
+                self._versions_fetched_at = float(cached.get("fetched_at", 0))
+                if now - self._versions_fetched_at < self.versions_ttl:
+                    return self._versions[0]
+
+            try:
+                versions = self._fetch_json(f"{DDRAGON_BASE_URL}/api/versions.json")
+            except Exception:
+                versions = None
+
+            if isinstance(versions, list) and versions:
+                self._versions = versions
+                self._versions_fetched_at = now
+                _write_json_atomic(self._versions_path, {"fetched_at": now, "versions": versions})
+            elif not self._versions:
+                return FALLBACK_VERSION
+            return self._versions[0]
+
+    def champion_index(self, version: Optional[str] = None, locale: Optional[str] = None) -> ChampionIndex:
+        """
+        Devuelve los índices de campeones para una versión (la más reciente por defecto).
+
+        Args:
+            version (str | None): Versión de Data Dragon
+            locale (str | None): Idioma; por defecto el de la caché
+
+        Returns:
+            ChampionIndex: Índices id -> nombre e id -> clave interna
+        """
+        with self._lock:
+            version = version or self.latest_version()
+            locale = locale or self.locale
+            index = self._indexes.get((version, locale))
+            if index is not None:
+                return index
+
+            path = self._champion_path(version, locale)
+            champions_data = _read_json(path)
+            if not isinstance(champions_data, dict) or "data" not in champions_data:
+                champions_data = self._fetch_json(
+                    f"{DDRAGON_BASE_URL}/cdn/{version}/data/{locale}/champion.json"
+                )
+                _write_json_atomic(path, champions_data)
+
+            index = ChampionIndex.from_champion_json(version, locale, champions_data)
+            self._indexes[(version, locale)] = index
+            return index
+
+    def icon_url(self, champion_id: int, champion_key: Optional[str] = None) -> str:
+        """Devuelve la URL del icono de un campeón usando los índices en memoria."""
+
+        return self.champion_index().icon_url(champion_id, champion_key)
+
+
+__all__ = [
+    "ChampionIndex",
+    "DataDragonCache",
+    "DEFAULT_CACHE_DIR",
+    "DEFAULT_LOCALE",
+]
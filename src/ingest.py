@@ -0,0 +1,284 @@
+"""Ingesta de partidas por línea de comandos, sin abrir el dashboard.
+
+Recibe Riot IDs (``Nombre#TAG``) o PUUIDs, pagina ``match-v5`` con
+`data_collection.iter_match_ids` y guarda en `MatchRepository` sólo las partidas que aún no
+existen, descargando los detalles en paralelo. Tras cada página se guarda un
+checkpoint por jugador en ``ingest_checkpoints``, así que una ejecución
+interrumpida continúa donde se quedó. Las partidas no se encolan para el
+prefetch de líneas de tiempo del dashboard (ver `MatchRepository.enqueue_timelines`).
+
+Uso::
+
+    python -m src.ingest "Jugador#LAN" otro-puuid --file jugadores.txt --max-matches 500
+"""
+
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass, field
+from pathlib import Path
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    from . import data_collection
+    from .database import DEFAULT_DB_PATH, MatchRepository, connect_repository
+except ImportError:  # Ejecución directa como script
+    import data_collection
+    from database import DEFAULT_DB_PATH, MatchRepository, connect_repository
+
+
+# Partidas descargadas y guardadas entre checkpoints.
+PAGE_SIZE = data_collection.MATCH_IDS_PAGE_SIZE
+
+
+@dataclass
+class IngestSummary:
+    """Totales de una ejecución de ingesta.
+
+    Attributes:
+        players: Jugadores procesados.
+        skipped_players: Jugadores ya completados en una ejecución anterior (sólo se
+            buscan sus partidas nuevas).
+        failed_players: Identificadores que no se pudieron resolver o paginar.
+        listed: IDs de partida recibidos de la API.
+        fetched: Partidas descargadas.
+        stored: Partidas nuevas guardadas.
+        errors: Descargas de partidas fallidas.
+    """
+
+    players: int = 0
+    skipped_players: int = 0
+    failed_players: List[str] = field(default_factory=list)
+    listed: int = 0
+    fetched: int = 0
+    stored: int = 0
+    errors: int = 0
+
+
+def resolve_player(identifier: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """
+    Convierte un Riot ID o PUUID en ``(puuid, game_name, tag_line)``.
+
+    Args:
+        identifier (str): ``Nombre#TAG`` o un PUUID.
+
+    Returns:
+        tuple: PUUID (``None`` si no se pudo resolver) y el Riot ID si se indicó.
+    """
+    if "#" not in identifier:
+        return identifier, None, None
+
+    game_name, tag_line = identifier.rsplit("#", 1)
+    account = data_collection.get_puuid_by_riot_id(game_name, tag_line)
+    return account.get("puuid"), game_name, tag_line
+
+
+def read_players(identifiers: Iterable[str], file: Optional[Path | str] = None) -> List[str]:
+    """Combina los identificadores de la línea de comandos y de un archivo (uno por línea)."""
+
+    players = [identifier.strip() for identifier in identifiers]
+    if file is not None:
+        with open(file, "r", encoding="utf-8") as handle:
+            players.extend(line.strip() for line in handle if not line.lstrip().startswith("#"))
+    return list(dict.fromkeys(player for player in players if player))
+
+
+def _batched(items: Iterable[str], size: int) -> Iterator[List[str]]:
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _store_batch(
+    repo: MatchRepository, puuid: str, match_ids: List[str], summary: IngestSummary, concurrency: int
+) -> bool:
+    """Descarga y guarda las partidas de `match_ids` que no estén ya en la base."""
+
+    summary.listed += len(match_ids)
+    known = repo.get_known_match_ids(match_ids)
+    matches = []
+    errors = 0
+    for _, details in data_collection.get_match_details_many(
+        [match_id for match_id in match_ids if match_id not in known], max_concurrency=concurrency
+    ):
+        if isinstance(details, dict) and "info" in details:
+            matches.append(details)
+        else:
+            errors += 1
+    summary.fetched += len(matches)
+    summary.errors += errors
+
+    stored = repo.store_matches(puuid, matches, enqueue_timelines=False) if matches else []
+    summary.stored += len(stored)
+    return not errors
+
+
+def ingest_player(
+    repo: MatchRepository,
+    puuid: str,
+    summary: IngestSummary,
+    *,
+    max_matches: Optional[int] = None,
+    concurrency: int = data_collection.DEFAULT_MAX_CONCURRENCY,
+    resume: bool = True,
+) -> bool:
+    """
+    Pagina el historial de un jugador y guarda las partidas nuevas.
+
+    Args:
+        repo (MatchRepository): Repositorio de destino.
+        puuid (str): PUUID del jugador (ya registrado en ``players``).
+        summary (IngestSummary): Totales que se actualizan durante la ingesta.
+        max_matches (int | None): Máximo de partidas a listar por jugador.
+        concurrency (int): Descargas de detalles en paralelo.
+        resume (bool): Continuar desde el checkpoint guardado.
+
+    Returns:
+        bool: ``False`` si hubo errores; se conserva el checkpoint de la última
+        página completa para reintentar.
+
+    Notes:
+        `store_matches` sólo guarda partidas del año en curso, así que el
+        historial se lista con ``startTime`` en el 1 de enero. Un jugador ya
+        completo sólo se sincroniza hasta encontrar una página de partidas
+        conocidas; si esa sincronización falla, deja de estar completo.
+    """
+    start, completed = repo.get_ingest_checkpoint(puuid) if resume else (0, False)
+    year_start = data_collection.year_start_timestamp()
+
+    if completed:
+        summary.skipped_players += 1
+        match_ids = data_collection.iter_match_ids(
+            puuid, start_time=year_start, max_ids=max_matches, is_known=repo.get_known_match_ids
+        )
+        try:
+            synced = all(
+                _store_batch(repo, puuid, batch, summary, concurrency)
+                for batch in _batched(match_ids, PAGE_SIZE)
+            )
+        except data_collection.RiotAPIError:
+            synced = False
+        if not synced:
+            # Las partidas guardadas alrededor de una descarga fallida pueden ocultar
+            # el hueco a la sincronización incremental: la próxima ejecución vuelve
+            # a listar el año completo y sólo descarga lo que falte.
+            repo.save_ingest_checkpoint(puuid, 0)
+        return synced
+
+    remaining = None if max_matches is None else max_matches - start
+    listed = 0
+    if remaining is None or remaining > 0:
+        match_ids = data_collection.iter_match_ids(
+            puuid, start=start, start_time=year_start, max_ids=remaining
+        )
+        try:
+            for batch in _batched(match_ids, PAGE_SIZE):
+                if not _store_batch(repo, puuid, batch, summary, concurrency):
+                    return False
+                listed += len(batch)
+                repo.save_ingest_checkpoint(puuid, start + listed)
+        except data_collection.RiotAPIError:
+            return False
+
+    # Con `max_matches` alcanzado el jugador no se marca completo: otra ejecución
+    # con un límite mayor continúa desde aquí.
+    exhausted = remaining is None or listed < remaining
+    repo.save_ingest_checkpoint(puuid, start + listed, completed=exhausted)
+    return True
+
+
+def ingest_players(
+    repo: MatchRepository,
+    identifiers: Sequence[str],
+    *,
+    max_matches: Optional[int] = None,
+    concurrency: int = data_collection.DEFAULT_MAX_CONCURRENCY,
+    resume: bool = True,
+    log: Callable[[str], None] = print,
+) -> IngestSummary:
+    """
+    Ingresa las partidas de varios jugadores.
+
+    Args:
+        repo (MatchRepository): Repositorio de destino.
+        identifiers (Sequence[str]): Riot IDs (``Nombre#TAG``) o PUUIDs.
+        max_matches (int | None): Máximo de partidas a listar por jugador.
+        concurrency (int): Descargas de detalles en paralelo.
+        resume (bool): Continuar desde los checkpoints guardados.
+        log (Callable[[str], None]): Función para mensajes de progreso.
+
+    Returns:
+        IngestSummary: Totales de la ejecución.
+    """
+    summary = IngestSummary()
+    for position, identifier in enumerate(identifiers, start=1):
+        puuid, game_name, tag_line = resolve_player(identifier)
+        if not puuid:
+            summary.failed_players.append(identifier)
+            log(f"[{position}/{len(identifiers)}] No se pudo resolver {identifier}.")
+            continue
+
+        repo.register_player(puuid, game_name=game_name, tag_line=tag_line)
+        stored_before = summary.stored
+        finished = ingest_player(
+            repo, puuid, summary, max_matches=max_matches, concurrency=concurrency, resume=resume
+        )
+        summary.players += 1
+        if not finished:
+            summary.failed_players.append(identifier)
+        log(
+            f"[{position}/{len(identifiers)}] {identifier}: {summary.stored - stored_before} partidas nuevas"
+            + ("" if finished else " (incompleto, se reanudará en la próxima ejecución)")
+        )
+    return summary
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Punto de entrada de línea de comandos para la ingesta masiva."""
+
+    parser = argparse.ArgumentParser(description="Descarga partidas de varios jugadores a la base local.")
+    parser.add_argument("players", nargs="*", help="Riot IDs (Nombre#TAG) o PUUIDs.")
+    parser.add_argument("--file", help="Archivo con un jugador por línea.")
+    parser.add_argument("--db", default=str(DEFAULT_DB_PATH), help="Ruta de la base SQLite.")
+    parser.add_argument("--max-matches", type=int, default=None, help="Máximo de partidas por jugador.")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=data_collection.DEFAULT_MAX_CONCURRENCY,
+        help="Descargas de partidas en paralelo.",
+    )
+    parser.add_argument("--no-resume", action="store_true", help="Ignora los checkpoints guardados.")
+    args = parser.parse_args(argv)
+
+    players = read_players(args.players, args.file)
+    if not players:
+        parser.error("Indica al menos un jugador o un archivo con --file.")
+
+    with connect_repository(args.db) as repo:
+        summary = ingest_players(
+            repo,
+            players,
+            max_matches=args.max_matches,
+            concurrency=args.concurrency,
+            resume=not args.no_resume,
+        )
+    print(
+        f"Jugadores: {summary.players} ({summary.skipped_players} ya completos, "
+        f"{len(summary.failed_players)} con errores). Partidas listadas: {summary.listed}, "
+        f"descargadas: {summary.fetched}, nuevas: {summary.stored}, errores: {summary.errors}."
+    )
+    return 1 if summary.failed_players else 0
+
+
+__all__ = [
+    "IngestSummary",
+    "ingest_player",
+    "ingest_players",
+    "read_players",
+    "resolve_player",
+]
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
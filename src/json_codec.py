@@ -0,0 +1,249 @@
+"""Serialización JSON intercambiable para las partidas guardadas.
+
+``raw_json`` se codifica al guardar cada partida y se decodifica en cada render
+de la vista de partidas y en cada agregación masiva, así que el coste de
+`json` domina el CPU en los análisis grandes. Este módulo elige el backend más
+rápido disponible:
+
+* ``orjson``: paquete opcional, el más rápido en ``dumps`` y ``loads``.
+* ``msgspec``: paquete opcional; además permite la decodificación parcial tipada.
+* ``json``: librería estándar, siempre disponible.
+
+La variable de entorno ``LOL_JSON_BACKEND`` fuerza uno concreto. Todos producen
+JSON compacto en UTF-8 (sin escapar caracteres no ASCII) y lanzan
+``ValueError`` ante datos inválidos.
+
+`decode_match_summary` extrae sólo los campos de ``info.participants`` que usan
+`parsed_match` y los rollups. Con ``msgspec`` decodifica directamente a
+estructuras tipadas y descarta el resto del documento sin construir sus
+diccionarios; sin él recurre a una decodificación completa.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import json
+import os
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+try:
+    import orjson
+except ImportError:  # Dependencia opcional
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # Dependencia opcional
+    msgspec = None
+
+
+# Orden de preferencia cuando no se indica un backend.
+BACKEND_PREFERENCE = ("orjson", "msgspec", "json")
+
+# Campos de cada participante que conserva `decode_match_summary`.
+PARTICIPANT_FIELDS = {
+    "puuid": "",
+    "participantId": None,
+    "teamId": None,
+    "championId": 0,
+    "teamPosition": "",
+    "win": False,
+    "kills": 0,
+    "deaths": 0,
+    "assists": 0,
+    "goldEarned": 0,
+    "totalDamageDealtToChampions": 0,
+    "visionScore": 0,
+    "riotIdGameName": "",
+    "summonerName": "",
+}
+INFO_FIELDS = ("gameDuration", "gameVersion", "gameStartTimestamp", "gameCreation", "queueId")
+
+
+@dataclass(frozen=True)
+class Serializer:
+    """Par ``dumps``/``loads`` de un backend JSON.
+
+    Attributes:
+        name: Nombre del backend (``orjson``, ``msgspec`` o ``json``).
+        dumps: Convierte un objeto en texto JSON.
+        loads: Convierte texto (o bytes) JSON en objetos de Python.
+    """
+
+    name: str
+    dumps: Callable[[Any], str]
+    loads: Callable[[str | bytes], Any]
+
+
+def _stdlib_serializer() -> Serializer:
+    return Serializer(
+        "json",
+        lambda obj: json.dumps(obj, ensure_ascii=False, separators=(",", ":")),
+        json.loads,
+    )
+
+
+def _orjson_serializer() -> Serializer:
+    return Serializer("orjson", lambda obj: orjson.dumps(obj).decode("utf-8"), orjson.loads)
+
+
+def _msgspec_serializer() -> Serializer:
+    encoder = msgspec.json.Encoder()
+    decoder = msgspec.json.Decoder()
+    return Serializer("msgspec", lambda obj: encoder.encode(obj).decode("utf-8"), decoder.decode)
+
+
+_FACTORIES: Dict[str, Callable[[], Serializer]] = {
+    "json": _stdlib_serializer,
+    "orjson": _orjson_serializer,
+    "msgspec": _msgspec_serializer,
+}
+
+
+def available_serializers() -> Sequence[str]:
+    """Backends que se pueden usar en este entorno, por orden de preferencia."""
+
+    installed = {"json": True, "orjson": orjson is not None, "msgspec": msgspec is not None}
+    return [name for name in BACKEND_PREFERENCE if installed[name]]
+
+
+def get_serializer(name: Optional[str] = None) -> Serializer:
+    """
+    Crea el serializador de un backend.
+
+    Args:
+        name (str | None): Backend a usar; ``None`` elige el más rápido disponible.
+
+    Returns:
+        Serializer: Funciones ``dumps``/``loads`` del backend.
+
+    Raises:
+        ValueError: Si el backend no existe o no está instalado.
+    """
+    available = available_serializers()
+    name = name or available[0]
+    if name not in available:
+        raise ValueError(f"Serializador JSON no disponible: {name!r}")
+    return _FACTORIES[name]()
+
+
+_serializer = get_serializer(os.getenv("LOL_JSON_BACKEND") or None)
+
+
+def set_serializer(name: Optional[str]) -> Serializer:
+    """Cambia el backend usado por `dumps` y `loads`; devuelve el anterior."""
+
+    global _serializer
+    previous, _serializer = _serializer, get_serializer(name)
+    return previous
+
+
+def current_serializer() -> Serializer:
+    return _serializer
+
+
+def dumps(obj: Any) -> str:
+    """Serializa ``obj`` con el backend activo."""
+
+    return _serializer.dumps(obj)
+
+
+def loads(data: str | bytes) -> Any:
+    """Decodifica JSON con el backend activo."""
+
+    return _serializer.loads(data)
+
+
+if msgspec is not None:
+
+    class _ParticipantSummary(msgspec.Struct):
+        puuid: str = ""
+        participantId: Optional[int] = None
+        teamId: Optional[int] = None
+        championId: int = 0
+        teamPosition: Optional[str] = ""
+        win: bool = False
+        kills: int = 0
+        deaths: int = 0
+        assists: int = 0
+        goldEarned: int = 0
+        totalDamageDealtToChampions: int = 0
+        visionScore: int = 0
+        riotIdGameName: Optional[str] = ""
+        summonerName: Optional[str] = ""
+
+    class _InfoSummary(msgspec.Struct):
+        gameDuration: Optional[int] = None
+        gameVersion: Optional[str] = None
+        gameStartTimestamp: Optional[int] = None
+        gameCreation: Optional[int] = None
+        queueId: Optional[int] = None
+        participants: List[_ParticipantSummary] = []
+
+    class _MetadataSummary(msgspec.Struct):
+        matchId: Optional[str] = None
+
+    class _MatchSummary(msgspec.Struct):
+        metadata: Optional[_MetadataSummary] = None
+        info: Optional[_InfoSummary] = None
+
+    _summary_decoder = msgspec.json.Decoder(_MatchSummary)
+
+
+def _project_summary(match: Any) -> Optional[Dict[str, Any]]:
+    """Reduce una partida ya decodificada a los campos de `decode_match_summary`."""
+
+    info = match.get("info") if isinstance(match, dict) else None
+    if not isinstance(info, dict):
+        return None
+    metadata = match.get("metadata") if isinstance(match.get("metadata"), dict) else {}
+    summary_info = {name: info.get(name) for name in INFO_FIELDS}
+    summary_info["participants"] = [
+        {name: participant.get(name, default) for name, default in PARTICIPANT_FIELDS.items()}
+        for participant in info.get("participants") or []
+        if isinstance(participant, dict)
+    ]
+    return {"metadata": {"matchId": metadata.get("matchId")}, "info": summary_info}
+
+
+def decode_match_summary(data: str | bytes) -> Optional[Dict[str, Any]]:
+    """
+    Decodifica de una partida sólo los datos de sus participantes.
+
+    Args:
+        data (str | bytes): ``raw_json`` de una partida de Match-V5.
+
+    Returns:
+        dict | None: Partida reducida con ``metadata.matchId``, los campos de
+        ``INFO_FIELDS`` e ``info.participants`` con los campos de
+        ``PARTICIPANT_FIELDS``; compatible con `parsed_match.parse_match`.
+        ``None`` si la partida no tiene ``info``.
+
+    Raises:
+        ValueError: Si ``data`` no es JSON válido.
+    """
+    if msgspec is not None:
+        try:
+            summary = _summary_decoder.decode(data)
+        except msgspec.ValidationError:
+            # Tipos inesperados en algún campo: se decodifica sin esquema.
+            return _project_summary(loads(data))
+        if summary.info is None:
+            return None
+        return {
+            "metadata": {"matchId": summary.metadata.matchId if summary.metadata else None},
+            "info": msgspec.to_builtins(summary.info),
+        }
+    return _project_summary(loads(data))
+
+
+__all__ = [
+    "Serializer",
+    "available_serializers",
+    "current_serializer",
+    "decode_match_summary",
+    "dumps",
+    "get_serializer",
+    "loads",
+    "set_serializer",
+]
@@ -0,0 +1,165 @@
+"""Consultas de cuenta y maestría con caché TTL persistente.
+
+Streamlit vuelve a ejecutar el script completo en cada interacción, así que sin
+caché cada rerun repetiría las llamadas a Account-V1 y Champion-Mastery-V4.
+`LookupCache` guarda las respuestas en la base de partidas (columna
+``players.account_checked_at`` y tabla ``player_mastery``) y aplica
+*stale-while-revalidate*:
+
+- Dentro del TTL se devuelve el valor guardado sin tocar la red.
+- Vencido el TTL se devuelve igualmente el valor guardado y se refresca en un
+  hilo en segundo plano (una sola actualización en curso por clave).
+- Sin valor guardado se consulta la API de forma síncrona.
+
+Las respuestas con error no se guardan.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    from . import data_collection
+    from .database import DEFAULT_DB_PATH, connect_repository
+except ImportError:  # Ejecución directa con `streamlit run src/dashboard.py`
+    import data_collection
+    from database import DEFAULT_DB_PATH, connect_repository
+
+
+# Un Riot ID cambia muy rara vez; la maestría, con cada partida.
+ACCOUNT_TTL_SECONDS = 7 * 24 * 60 * 60
+MASTERY_TTL_SECONDS = 60 * 60
+
+
+class LookupCache:
+    """Caché de Riot ID -> PUUID y de maestría de campeones.
+
+    Args:
+        db_path: Base de datos donde se guardan las respuestas.
+        account_ttl: Segundos que se considera vigente un Riot ID resuelto.
+        mastery_ttl: Segundos que se considera vigente la maestría.
+        fetch_account: Función equivalente a `data_collection.get_puuid_by_riot_id`.
+        fetch_mastery: Función equivalente a `data_collection.get_champion_mastery`.
+        background: Refrescar los valores vencidos en un hilo (si es ``False`` se
+            refrescan de forma síncrona).
+    """
+
+    def __init__(
+        self,
+        db_path: Path | str = DEFAULT_DB_PATH,
+        *,
+        account_ttl: float = ACCOUNT_TTL_SECONDS,
+        mastery_ttl: float = MASTERY_TTL_SECONDS,
+        fetch_account: Callable[[str, str], Dict[str, Any]] = data_collection.get_puuid_by_riot_id,
+        fetch_mastery: Callable[[str], Any] = data_collection.get_champion_mastery,
+        background: bool = True,
+    ) -> None:
+        self.db_path = Path(db_path)
+        self.account_ttl = account_ttl
+        self.mastery_ttl = mastery_ttl
+        self._fetch_account = fetch_account
+        self._fetch_mastery = fetch_mastery
+        self.background = background
+        self._lock = threading.Lock()
+        self._inflight: Dict[Tuple[str, ...], threading.Thread] = {}
+        self.last_error: Optional[str] = None
+
+    def resolve_riot_id(self, game_name: str, tag_line: str) -> Dict[str, Any]:
+        """Devuelve la cuenta de un Riot ID con el formato de `get_puuid_by_riot_id`."""
+
+        with connect_repository(self.db_path) as repo:
+            cached = repo.find_player_by_riot_id(game_name, tag_line)
+        if cached is not None and cached[1] is not None:
+            puuid, checked_at = cached
+            if time.time() - checked_at > self.account_ttl:
+                key = ("account", game_name.lower(), tag_line.lower())
+                self._revalidate(key, lambda: self._refresh_account(game_name, tag_line))
+            return {"puuid": puuid, "gameName": game_name, "tagLine": tag_line}
+        return self._refresh_account(game_name, tag_line)
+
+    def get_champion_mastery(self, puuid: str) -> Dict[str, Any] | List[Dict[str, Any]]:
+        """Devuelve la maestría de un jugador con el formato de `get_champion_mastery`."""
+
+        with connect_repository(self.db_path) as repo:
+            cached = repo.get_mastery(puuid)
+        if cached is not None:
+            payload, fetched_at = cached
+            if time.time() - fetched_at > self.mastery_ttl:
+                self._revalidate(("mastery", puuid), lambda: self._refresh_mastery(puuid))
+            return payload
+        return self._refresh_mastery(puuid)
+
+    def _refresh_account(self, game_name: str, tag_line: str) -> Dict[str, Any]:
+        account = self._fetch_account(game_name, tag_line)
+        if isinstance(account, dict) and account.get("puuid"):
+            with connect_repository(self.db_path) as repo:
+                # Se guarda el Riot ID consultado: es el que se buscará la próxima vez.
+                repo.save_account(account["puuid"], game_name, tag_line)
+        else:
+            self.last_error = str(account)
+        return account
+
+    def _refresh_mastery(self, puuid: str) -> Dict[str, Any] | List[Dict[str, Any]]:
+        mastery = self._fetch_mastery(puuid)
+        if isinstance(mastery, list):
+            with connect_repository(self.db_path) as repo:
+                repo.save_mastery(puuid, mastery)
+        else:
+            self.last_error = str(mastery)
+        return mastery
+
+    def _revalidate(self, key: Tuple[str, ...], refresh: Callable[[], Any]) -> None:
+        """Lanza ``refresh`` en segundo plano salvo que ya haya uno en curso para ``key``."""
+
+        if not self.background:
+            refresh()
+            return
+
+        def run() -> None:
+            try:
+                refresh()
+            except Exception as exc:  # Se conserva el valor anterior
+                self.last_error = f"{type(exc).__name__}: {exc}"
+            finally:
+                with self._lock:
+                    self._inflight.pop(key, None)
+
+        with self._lock:
+            if key in self._inflight:
+                return
+            thread = threading.Thread(target=run, name=f"revalidate-{key[0]}", daemon=True)
+            self._inflight[key] = thread
+        thread.start()
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Espera a que terminen los refrescos en segundo plano en curso."""
+
+        with self._lock:
+            threads = list(self._inflight.values())
+        for thread in threads:
+            thread.join(timeout)
+
+
+_CACHES: Dict[Path, LookupCache] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def get_lookup_cache(db_path: Path | str = DEFAULT_DB_PATH, **kwargs: Any) -> LookupCache:
+    """Devuelve la caché compartida de una base (una por base y proceso)."""
+
+    key = Path(db_path).resolve()
+    with _CACHES_LOCK:
+        cache = _CACHES.get(key)
+        if cache is None:
+            cache = LookupCache(db_path, **kwargs)
+            _CACHES[key] = cache
+        return cache
+
+
+__all__ = [
+    "LookupCache",
+    "get_lookup_cache",
+]
@@ -2,14 +2,15 @@
 
 from __future__ import annotations
 
-import json
-
 import pandas as pd
 import plotly.graph_objects as go
 import streamlit as st
 
 import data_collection
 import database
+import json_codec
+import timeline_prefetch
+from parsed_match import parse_match
 
 def show_match_view() -> None:
     """Muestra la vista de historial de partidos, permitiendo la actualización y visualización."""
@@ -25,6 +26,12 @@ def show_match_view() -> None:
     game_name = st.session_state.get("game_name")
     tag_line = st.session_state.get("tag_line")
 
+    # Las líneas de tiempo de partidas nuevas se descargan en segundo plano
+    prefetcher = timeline_prefetch.ensure_prefetcher(database.DEFAULT_DB_PATH)
+    prefetch_status = prefetcher.status()
+    if prefetch_status.pending:
+        st.caption(f"Descargando líneas de tiempo en segundo plano: {prefetch_status.pending} pendientes.")
+
     if st.button("Buscar nuevas partidas", type="primary"):
         with st.spinner("Buscando nuevas partidas..."):
             try:
@@ -32,73 +39,79 @@ def show_match_view() -> None:
                     # Asegurar que el jugador exista en la tabla `players` antes de insertar partidas.
                     repo.register_player(puuid, game_name=game_name, tag_line=tag_line)
 
+                    # Sólo se listan las partidas del año en curso que aún no están guardadas,
+                    # hasta una página por búsqueda: el historial completo se carga con `ingest`.
                     stored_match_ids = set(repo.get_stored_match_ids(puuid))
-                    recent_match_ids = data_collection.get_match_ids(puuid, count=100)
-                    if isinstance(recent_match_ids, list):
-                        new_match_ids = [m_id for m_id in recent_match_ids if m_id not in stored_match_ids]
-                        new_match_ids.reverse()
-                        if new_match_ids:
-                            _extracted_from_show_match_view_28(new_match_ids, repo, puuid)
-                        else:
-                            st.success("¡No se encontraron nuevas partidas! El historial está al día.")
+                    new_match_ids = list(data_collection.iter_match_ids(
+                        puuid,
+                        start_time=data_collection.year_start_timestamp(),
+                        max_ids=data_collection.MATCH_IDS_PAGE_SIZE,
+                        is_known=stored_match_ids.intersection,
+                    ))
+                    if new_match_ids:
+                        _extracted_from_show_match_view_28(new_match_ids, repo, puuid)
+                        prefetcher.wake()
+                    else:
+                        st.success("¡No se encontraron nuevas partidas! El historial está al día.")
             except Exception as e:
                 st.error(f"Ocurrió un error al actualizar el historial: {e}")
 
-    # Mostrar las partidas almacenadas con paginación
+    # Mostrar las partidas almacenadas con paginación por cursor
     try:
-        # Inicializar estado de paginación
-        if 'match_page' not in st.session_state:
+        # Reiniciar la paginación si cambió el jugador
+        if st.session_state.get('match_view_puuid') != puuid:
+            st.session_state.match_view_puuid = puuid
             st.session_state.match_page = 0
+            st.session_state.match_cursor = None
         
         matches_per_page = 10
         
         with database.connect_repository() as repo:
+            # Se cuenta en cada rerun (un COUNT sobre el índice por jugador): la ingesta,
+            # el crawler o el análisis del dashboard pueden haber guardado partidas.
             total_matches = repo.get_match_count(puuid)
             
             if total_matches == 0:
                 st.info("No hay partidas almacenadas para este jugador. Haz clic en 'Buscar nuevas partidas' para empezar.")
                 return
             
-            # Calcular paginación
+            # Obtener solo las partidas de la página actual
+            page = repo.get_stored_matches_page(
+                puuid, cursor=st.session_state.match_cursor, page_size=matches_per_page
+            )
             total_pages = (total_matches + matches_per_page - 1) // matches_per_page
             current_page = st.session_state.match_page
-            offset = current_page * matches_per_page
             
             # Mostrar información de paginación
             col1, col2, col3 = st.columns([1, 2, 1])
             with col1:
-                if current_page > 0:
+                if page.prev_cursor is not None:
                     if st.button("< Anterior"):
                         st.session_state.match_page -= 1
+                        st.session_state.match_cursor = page.prev_cursor if st.session_state.match_page > 0 else None
                         st.rerun()
             
             with col2:
                 st.markdown(f"<div style='text-align: center'>Página {current_page + 1} de {total_pages} ({total_matches} partidas totales)</div>", unsafe_allow_html=True)
             
             with col3:
-                if current_page < total_pages - 1:
+                if page.next_cursor is not None:
                     if st.button("Siguiente >"):
                         st.session_state.match_page += 1
+                        st.session_state.match_cursor = page.next_cursor
                         st.rerun()
             
             st.divider()
             
-            # Obtener solo las partidas de la página actual
-            matches = repo.get_stored_matches(puuid, limit=matches_per_page, offset=offset)
+            matches = page.records
 
             for match_record in matches:
                 if match_record.raw_json:
-                    match_data = json.loads(match_record.raw_json)
-                    if player_data := next(
-                        (
-                            p
-                            for p in match_data['info']['participants']
-                            if p['puuid'] == puuid
-                        ),
-                        None,
-                    ):
+                    # Sólo se decodifican los participantes y se recorren una vez
+                    match = parse_match(json_codec.decode_match_summary(match_record.raw_json))
+                    if match is not None and (player_data := match.player(puuid)):
                         champion_names = st.session_state.get('champion_names', {})
-                        champion_id = int(player_data['championId'])
+                        champion_id = player_data.champion_id
                         champion_name = champion_names.get(champion_id, f"ID:{champion_id}")
                         
                         # Obtener URL de la imagen del campeón
@@ -108,14 +121,11 @@ def show_match_view() -> None:
                         champion_icon_url = f"https://ddragon.leagueoflegends.com/cdn/{ddragon_version}/img/champion/{champion_key}.png"
                         
                         # Obtener nombre del jugador (prioridad: riotIdGameName > summonerName > game_name del session_state)
-                        player_name = player_data.get('riotIdGameName') or player_data.get('summonerName') or game_name or 'Jugador'
-                        kda = f"{player_data['kills']}/{player_data['deaths']}/{player_data['assists']}"
-                        result = "Victoria" if player_data['win'] else "Derrota"
-                        result_emoji = "🟢" if player_data['win'] else "🔴"
-                        
-                        # Calcular KDA ratio
-                        deaths = player_data['deaths'] if player_data['deaths'] > 0 else 1
-                        kda_ratio = round((player_data['kills'] + player_data['assists']) / deaths, 2)
+                        player_name = player_data.name or game_name or 'Jugador'
+                        kda = player_data.kda
+                        result = "Victoria" if player_data.win else "Derrota"
+                        result_emoji = "🟢" if player_data.win else "🔴"
+                        kda_ratio = round(player_data.kda_ratio, 2)
 
                         # Título del expander (sin HTML)
                         expander_title = f"{result_emoji} {player_name} jugó {champion_name} - KDA: {kda} ({kda_ratio}:1) - {result}"
@@ -126,7 +136,7 @@ def show_match_view() -> None:
                             with col_img:
                                 st.image(champion_icon_url, width=80)
                             with col_info:
-                                result_color = "green" if player_data['win'] else "red"
+                                result_color = "green" if player_data.win else "red"
                                 st.markdown(f"### {player_name}")
                                 st.markdown(f"**Campeón:** {champion_name}")
                                 st.markdown(f"**Resultado:** :{result_color}[{result}]")
@@ -136,26 +146,19 @@ def show_match_view() -> None:
                             tab1, tab2 = st.tabs(["Desglose por Jugador", "Estadísticas"])
 
                             with tab1:
-                                teams = {}
-                                for p in match_data['info']['participants']:
-                                    team_id = p['teamId']
-                                    if team_id not in teams:
-                                        teams[team_id] = []
-                                    teams[team_id].append(p)
-
-                                for players in teams.values():
-                                    team_result = "Victoria" if players[0]['win'] else "Derrota"
+                                for players in match.teams.values():
+                                    team_result = "Victoria" if players[0].win else "Derrota"
                                     st.subheader(f"Equipo ({team_result})")
 
                                     cols = st.columns(len(players))
                                     for i, player_details in enumerate(players):
                                         with cols[i]:
-                                            champ_id = int(player_details['championId'])
+                                            champ_id = player_details.champion_id
                                             champion_name = champion_names.get(champ_id, f"ID:{champ_id}")
-                                            player_kda = f"{player_details['kills']}/{player_details['deaths']}/{player_details['assists']}"
+                                            player_kda = player_details.kda
                                             
                                             # Obtener nombre del jugador (prioridad: riotIdGameName > summonerName)
-                                            display_name = player_details.get('riotIdGameName') or player_details.get('summonerName', 'Jugador')
+                                            display_name = player_details.name or 'Jugador'
                                             
                                             # Obtener URL de imagen del campeón
                                             champion_key = champion_id_to_key.get(champ_id, 'Annie')
@@ -165,58 +168,52 @@ def show_match_view() -> None:
                                             st.markdown(f"**{display_name}**")
                                             st.markdown(f"*{champion_name}*")
                                             st.text(f"KDA: {player_kda}")
-                                            st.text(f"Daño: {player_details['totalDamageDealtToChampions']:,}")
-                                            st.text(f"Oro: {player_details['goldEarned']:,}")
-                                            st.text(f"Visión: {player_details['visionScore']}")
+                                            st.text(f"Daño: {player_details.damage:,}")
+                                            st.text(f"Oro: {player_details.gold:,}")
+                                            st.text(f"Visión: {player_details.vision}")
 
                             with tab2:
-                                timeline_data = repo.get_match_timeline(match_record.match_id)
-                                if not timeline_data:
+                                features = repo.get_timeline_features(match_record.match_id)
+                                if features is None:
                                     with st.spinner("Descargando datos de la línea de tiempo..."):
                                         timeline_data = data_collection.get_match_timeline(match_record.match_id)
                                         if isinstance(timeline_data, dict):
+                                            # Guarda el JSON y sus series por minuto en la misma operación
                                             repo.store_match_timeline(match_record.match_id, timeline_data)
+                                            features = repo.get_timeline_features(match_record.match_id)
                                         else:
                                             st.error("No se pudieron obtener los datos de la línea de tiempo.")
-                                            timeline_data = None
 
-                                if timeline_data and isinstance(timeline_data, dict) and 'info' in timeline_data:
-                                    gold_data = {}
-                                    damage_data = {}
+                                if features is not None:
                                     team_colors = {}  # Mapeo de jugador a color de equipo
                                     
                                     # Crear mapa de participantId a nombre de jugador y asignar colores por equipo
                                     participant_map = {}
-                                    for p in match_data['info']['participants']:
-                                        participant_id = p.get('participantId')
+                                    for participant_id, p in match.by_participant_id.items():
                                         if participant_id:
-                                            player_name = p.get('riotIdGameName') or p.get('summonerName', f'Jugador {participant_id}')
+                                            player_name = p.name or f'Jugador {participant_id}'
                                             participant_map[participant_id] = player_name
                                             
                                             # Asignar color según equipo (100 = Azul, 200 = Rojo)
-                                            team_id = p.get('teamId')
-                                            if team_id == 100:
+                                            if p.team_id == 100:
                                                 team_colors[player_name] = 'rgb(30, 144, 255)'  # Azul
                                             else:
                                                 team_colors[player_name] = 'rgb(220, 20, 60)'  # Rojo
 
-                                    frames = timeline_data.get('info', {}).get('frames', [])
-                                    
-                                    if not frames:
+                                    if features.minutes == 0:
                                         st.warning("No hay datos de timeline disponibles para esta partida.")
                                     else:
-                                        for frame in frames:
-                                            participant_frames = frame.get('participantFrames', {})
-                                            for p_id, p_frame in participant_frames.items():
-                                                p_id_int = int(p_id)
-                                                if p_name := participant_map.get(p_id_int):
-                                                    if p_name not in gold_data:
-                                                        gold_data[p_name] = []
-                                                        damage_data[p_name] = []
-
-                                                    gold_data[p_name].append(p_frame.get('totalGold', 0))
-                                                    damage_stats = p_frame.get('damageStats', {})
-                                                    damage_data[p_name].append(damage_stats.get('totalDamageDoneToChampions', 0))
+                                        # Series ya extraídas (participantes x minutos): sin recorrer frames
+                                        gold_data = {
+                                            participant_map[p_id]: series
+                                            for p_id, series in features.series('gold').items()
+                                            if p_id in participant_map
+                                        }
+                                        damage_data = {
+                                            participant_map[p_id]: series
+                                            for p_id, series in features.series('damage').items()
+                                            if p_id in participant_map
+                                        }
 
                                         if gold_data:
                                             # Gráfico de Oro con colores por equipo
@@ -262,10 +259,7 @@ def show_match_view() -> None:
                                             st.warning("No se pudieron procesar los datos de timeline.")
 
                                     st.subheader("Puntuación de Visión")
-                                    vision_scores = {}
-                                    for p in match_data['info']['participants']:
-                                        player_name = p.get('riotIdGameName') or p.get('summonerName', 'Jugador')
-                                        vision_scores[player_name] = p.get('visionScore', 0)
+                                    vision_scores = {p.name or 'Jugador': p.vision for p in match.participants}
                                     
                                     vision_df = pd.DataFrame(
                                         list(vision_scores.items()), 
@@ -282,9 +276,8 @@ def _extracted_from_show_match_view_28(new_match_ids, repo, puuid):
     new_matches_data = []
     progress_bar = st.progress(0)
     status_text = st.empty()
-    for i, match_id in enumerate(new_match_ids):
+    for i, (match_id, details) in enumerate(data_collection.get_match_details_many(new_match_ids)):
         status_text.text(f"Descargando partida {i + 1}/{len(new_match_ids)}...")
-        details = data_collection.get_match_details(match_id)
         if isinstance(details, dict):
             new_matches_data.append(details)
         progress_bar.progress((i + 1) / len(new_match_ids))
@@ -292,4 +285,7 @@ def _extracted_from_show_match_view_28(new_match_ids, repo, puuid):
     status_text.empty()
     if new_matches_data:
         repo.store_matches(puuid, new_matches_data)
+        # El historial cambió: volver a la primera página
+        st.session_state.match_page = 0
+        st.session_state.match_cursor = None
         st.success(f"¡Se han añadido {len(new_matches_data)} nuevas partidas al historial!")
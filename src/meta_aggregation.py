@@ -0,0 +1,234 @@
+"""Agregación en paralelo de métricas de meta sobre todas las partidas guardadas.
+
+Recalcular el meta desde ``raw_json`` (por ejemplo, tras cambiar qué se extrae
+de cada partida) es CPU puro: decodificar y recorrer participantes. Este
+módulo divide la tabla ``matches`` en rangos de ``rowid`` y procesa cada rango
+en un proceso de un `ProcessPoolExecutor`. Cada proceso abre su propia conexión
+de sólo lectura (WAL permite leer mientras la app escribe), decodifica sólo los
+participantes con `json_codec.decode_match_summary` y devuelve contadores
+parciales por ``(champion_id, patch, role)``, que el proceso principal suma.
+
+Como las particiones no comparten estado, el tiempo escala con el número de
+núcleos hasta que la lectura de disco pasa a ser el cuello de botella.
+
+Uso::
+
+    python -m src.meta_aggregation --workers 8 --output data/processed/meta.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import os
+from pathlib import Path
+import sqlite3
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+try:
+    from . import json_codec, storage_codec
+    from .database import DEFAULT_DB_PATH
+    from .parsed_match import parse_match
+except ImportError:  # Ejecución directa como script
+    import json_codec
+    import storage_codec
+    from database import DEFAULT_DB_PATH
+    from parsed_match import parse_match
+
+
+# Contadores sumados por cada clave (en este orden).
+COUNTER_COLUMNS = ("games", "wins", "kills", "deaths", "assists", "gold", "damage", "vision", "duration")
+KEY_COLUMNS = ("champion_id", "patch", "role")
+
+# Particiones por proceso: más de una reparte mejor los rangos con partidas de
+# tamaño desigual.
+PARTITIONS_PER_WORKER = 4
+
+# Filas leídas de SQLite en cada consulta dentro de una partición.
+FETCH_SIZE = 500
+
+MetaKey = Tuple[int, Optional[str], Optional[str]]
+MetaCounters = Dict[MetaKey, List[int]]
+
+
+def _connect_read_only(db_path: Path | str) -> sqlite3.Connection:
+    uri = f"{Path(db_path).resolve().as_uri()}?mode=ro"
+    return sqlite3.connect(uri, uri=True)
+
+
+def plan_partitions(db_path: Path | str, partitions: int) -> List[Tuple[int, int]]:
+    """
+    Divide la tabla ``matches`` en rangos de ``rowid`` de tamaño similar.
+
+    Args:
+        db_path (Path | str): Base de datos de partidas.
+        partitions (int): Número máximo de rangos.
+
+    Returns:
+        list: Rangos ``(primero, último)`` inclusivos; vacía si no hay partidas.
+    """
+    conn = _connect_read_only(db_path)
+    try:
+        first, last = conn.execute("SELECT MIN(rowid), MAX(rowid) FROM matches;").fetchone()
+    finally:
+        conn.close()
+    if first is None:
+        return []
+
+    span = last - first + 1
+    partitions = max(1, min(partitions, span))
+    bounds = [first + span * index // partitions for index in range(partitions + 1)]
+    return [(start, end - 1) for start, end in zip(bounds, bounds[1:])]
+
+
+def aggregate_partition(db_path: Path | str, first_rowid: int, last_rowid: int) -> MetaCounters:
+    """
+    Cuenta las métricas de las partidas con ``rowid`` entre ``first_rowid`` y ``last_rowid``.
+
+    Args:
+        db_path (Path | str): Base de datos de partidas (se abre en sólo lectura).
+        first_rowid (int): Primer ``rowid`` del rango (inclusivo).
+        last_rowid (int): Último ``rowid`` del rango (inclusivo).
+
+    Returns:
+        dict: ``(champion_id, patch, role) -> [contadores de COUNTER_COLUMNS]``.
+        Las partidas ilegibles o sin ``info`` se omiten, igual que los
+        participantes sin PUUID (no se guardan en ``participants``).
+    """
+    counters: MetaCounters = {}
+    conn = _connect_read_only(db_path)
+    try:
+        dictionaries = {
+            dict_id: bytes(data)
+            for dict_id, data in conn.execute("SELECT dict_id, data FROM compression_dictionaries;")
+        }
+        cursor = conn.execute(
+            "SELECT match_id, raw_json FROM matches WHERE rowid BETWEEN ? AND ?;",
+            (first_rowid, last_rowid),
+        )
+        while rows := cursor.fetchmany(FETCH_SIZE):
+            for match_id, raw_json in rows:
+                try:
+                    text = storage_codec.decode_text(raw_json, dictionaries)
+                    match = parse_match(json_codec.decode_match_summary(text), match_id) if text else None
+                except (ValueError, KeyError):
+                    continue
+                if match is None:
+                    continue
+                for participant in match.participants:
+                    if not participant.puuid:
+                        continue  # Igual que en `participants` y sus rollups
+                    key = (participant.champion_id, match.patch, participant.team_position or None)
+                    totals = counters.get(key)
+                    if totals is None:
+                        totals = counters[key] = [0] * len(COUNTER_COLUMNS)
+                    totals[0] += 1
+                    totals[1] += participant.win
+                    totals[2] += participant.kills
+                    totals[3] += participant.deaths
+                    totals[4] += participant.assists
+                    totals[5] += participant.gold
+                    totals[6] += participant.damage
+                    totals[7] += participant.vision
+                    totals[8] += match.duration or 0
+    finally:
+        conn.close()
+    return counters
+
+
+def merge_counters(partials: Sequence[MetaCounters]) -> MetaCounters:
+    """Suma los contadores parciales de varias particiones."""
+
+    merged: MetaCounters = {}
+    for partial in partials:
+        for key, values in partial.items():
+            totals = merged.get(key)
+            if totals is None:
+                merged[key] = list(values)
+            else:
+                for index, value in enumerate(values):
+                    totals[index] += value
+    return merged
+
+
+def counters_to_frame(counters: MetaCounters) -> pd.DataFrame:
+    """Convierte los contadores en un DataFrame con ``win_rate`` y medias por partida."""
+
+    frame = pd.DataFrame(
+        [(*key, *values) for key, values in counters.items()],
+        columns=[*KEY_COLUMNS, *COUNTER_COLUMNS],
+    )
+    frame["win_rate"] = frame["wins"] / frame["games"]
+    frame["kda"] = (frame["kills"] + frame["assists"]) / frame["deaths"].clip(lower=1)
+    frame["gold_per_min"] = frame["gold"] / (frame["duration"] / 60).where(frame["duration"] > 0)
+    return frame.sort_values(["patch", "games"], ascending=[True, False], ignore_index=True)
+
+
+def aggregate_meta(
+    db_path: Path | str = DEFAULT_DB_PATH,
+    *,
+    workers: Optional[int] = None,
+    partitions: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Agrega el corpus de partidas por campeón, parche y rol usando varios procesos.
+
+    Args:
+        db_path (Path | str): Base de datos de partidas.
+        workers (int | None): Procesos a usar; por defecto, uno por núcleo. Con 1
+            se procesa en el propio proceso.
+        partitions (int | None): Rangos de ``rowid``; por defecto
+            ``workers * PARTITIONS_PER_WORKER``.
+
+    Returns:
+        pd.DataFrame: Columnas ``KEY_COLUMNS``, ``COUNTER_COLUMNS``, ``win_rate``,
+        ``kda`` y ``gold_per_min``.
+    """
+    workers = workers or os.cpu_count() or 1
+    ranges = plan_partitions(db_path, partitions or workers * PARTITIONS_PER_WORKER)
+    db_path = str(Path(db_path).resolve())
+
+    if workers == 1 or len(ranges) <= 1:
+        partials = [aggregate_partition(db_path, first, last) for first, last in ranges]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as executor:
+            partials = list(executor.map(
+                aggregate_partition,
+                [db_path] * len(ranges),
+                [first for first, _ in ranges],
+                [last for _, last in ranges],
+            ))
+    return counters_to_frame(merge_counters(partials))
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Punto de entrada de línea de comandos para recalcular el meta."""
+
+    parser = argparse.ArgumentParser(description="Agrega métricas de meta desde las partidas guardadas.")
+    parser.add_argument("--db", default=str(DEFAULT_DB_PATH), help="Ruta de la base SQLite.")
+    parser.add_argument("--workers", type=int, default=None, help="Procesos (por defecto, uno por núcleo).")
+    parser.add_argument("--partitions", type=int, default=None, help="Rangos de rowid a repartir.")
+    parser.add_argument("--output", help="Archivo CSV donde guardar el resultado.")
+    args = parser.parse_args(argv)
+
+    frame = aggregate_meta(args.db, workers=args.workers, partitions=args.partitions)
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        frame.to_csv(args.output, index=False)
+    print(f"{len(frame)} combinaciones campeón/parche/rol, {int(frame['games'].sum())} participaciones.")
+    return 0
+
+
+__all__ = [
+    "aggregate_meta",
+    "aggregate_partition",
+    "counters_to_frame",
+    "merge_counters",
+    "plan_partitions",
+]
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,399 @@
+"""Exportación columnar (Parquet/Arrow) de la base de partidas.
+
+Las partidas se leen de SQLite por lotes en orden de inserción (columna ``seq``
+de ``matches``), se aplanan en
+tres tablas tipadas y se escriben como datasets Parquet particionados al estilo
+Hive por parche y región::
+
+    data/processed/parquet/
+        participants/patch=14.2/region=LA1/part-<primer seq>-<último seq>-0.parquet
+        teams/...
+        bans/...
+        _watermark.json
+
+``_watermark.json`` guarda el último ``seq`` exportado, así que cada ejecución
+sólo añade las partidas nuevas. ``seq`` es una columna explícita: a diferencia
+del ``rowid`` implícito, no cambia con VACUUM. Los archivos de cada bloque se
+nombran por su rango de ``seq``, de modo que reintentar un bloque cuya marca de
+agua no llegó a guardarse sobrescribe sus archivos en lugar de duplicar filas.
+Requiere el paquete opcional ``pyarrow``.
+
+Uso: ``python -m src.parquet_export [--db ruta.db] [--out data/processed/parquet]``
+"""
+
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass, field
+import json
+import os
+from pathlib import Path
+import shutil
+from typing import Any, Dict, Optional, Sequence
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    from pyarrow import fs as pa_fs
+except ImportError:  # Dependencia opcional
+    pa = None
+
+try:
+    from .database import (
+        DEFAULT_DB_PATH,
+        MatchRepository,
+        _extract_timestamp_from_match,
+        connect_repository,
+    )
+    from .json_codec import loads as json_loads
+    from .parsed_match import extract_patch
+except ImportError:  # Ejecución directa como script
+    from database import (
+        DEFAULT_DB_PATH,
+        MatchRepository,
+        _extract_timestamp_from_match,
+        connect_repository,
+    )
+    from json_codec import loads as json_loads
+    from parsed_match import extract_patch
+
+
+DEFAULT_EXPORT_DIR = Path("data/processed/parquet")
+WATERMARK_FILE = "_watermark.json"
+TABLES = ("participants", "teams", "bans")
+PARTITION_COLUMNS = ("patch", "region")
+
+# Valor de partición para partidas sin parche o región conocidos.
+UNKNOWN_PARTITION = "unknown"
+
+# Filas acumuladas por tabla antes de escribir un archivo (evita miles de archivos pequeños).
+DEFAULT_ROWS_PER_FILE = 200_000
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise RuntimeError("La exportación a Parquet requiere instalar el paquete 'pyarrow'.")
+
+
+def table_schemas() -> Dict[str, "pa.Schema"]:
+    """Esquemas Arrow de las tablas exportadas (`patch` y `region` son columnas de partición)."""
+
+    _require_pyarrow()
+    common = [
+        ("patch", pa.string()),
+        ("region", pa.string()),
+        ("match_id", pa.string()),
+        ("game_start", pa.timestamp("s", tz="UTC")),
+        ("game_duration", pa.int32()),
+        ("queue_id", pa.int32()),
+    ]
+    return {
+        "participants": pa.schema(common + [
+            ("puuid", pa.string()),
+            ("champion_id", pa.int16()),
+            ("team_id", pa.int16()),
+            ("team_position", pa.string()),
+            ("win", pa.bool_()),
+            ("kills", pa.int16()),
+            ("deaths", pa.int16()),
+            ("assists", pa.int16()),
+            ("gold", pa.int32()),
+            ("damage", pa.int32()),
+            ("vision", pa.int16()),
+        ]),
+        "teams": pa.schema(common + [
+            ("team_id", pa.int16()),
+            ("win", pa.bool_()),
+            ("champion_kills", pa.int16()),
+            ("tower_kills", pa.int16()),
+            ("dragon_kills", pa.int16()),
+            ("baron_kills", pa.int16()),
+        ]),
+        "bans": pa.schema(common + [
+            ("team_id", pa.int16()),
+            ("pick_turn", pa.int8()),
+            ("champion_id", pa.int16()),
+        ]),
+    }
+
+
+@dataclass
+class ExportResult:
+    """Resumen de una exportación.
+
+    Attributes:
+        matches: Partidas exportadas en esta ejecución.
+        rows: Filas escritas por tabla.
+        skipped: Partidas omitidas por JSON inválido o sin ``info``.
+        last_seq: Marca de agua tras la exportación.
+    """
+
+    matches: int = 0
+    rows: Dict[str, int] = field(default_factory=lambda: {table: 0 for table in TABLES})
+    skipped: int = 0
+    last_seq: int = 0
+
+
+def _region_from_match(match_id: str, info: dict) -> str:
+    platform = info.get("platformId")
+    if isinstance(platform, str) and platform:
+        return platform.upper()
+    prefix, sep, _ = match_id.partition("_")
+    return prefix.upper() if sep else UNKNOWN_PARTITION
+
+
+def _objective_kills(objectives: Any, name: str) -> int:
+    objective = objectives.get(name) if isinstance(objectives, dict) else None
+    return objective.get("kills", 0) if isinstance(objective, dict) else 0
+
+
+def _flatten_match(match_id: str, match: dict, buffers: Dict[str, Dict[str, list]]) -> bool:
+    """Añade las filas de una partida a los buffers por columna. Devuelve False si no hay ``info``."""
+
+    info = match.get("info") if isinstance(match, dict) else None
+    if not isinstance(info, dict):
+        return False
+
+    common = {
+        "patch": extract_patch(info.get("gameVersion")) or UNKNOWN_PARTITION,
+        "region": _region_from_match(match_id, info),
+        "match_id": match_id,
+        "game_start": _extract_timestamp_from_match(match),
+        "game_duration": info.get("gameDuration"),
+        "queue_id": info.get("queueId"),
+    }
+
+    def append(table: str, values: Dict[str, Any]) -> None:
+        columns = buffers[table]
+        for name, value in common.items():
+            columns[name].append(value)
+        for name, value in values.items():
+            columns[name].append(value)
+
+    for participant in info.get("participants") or []:
+        if not isinstance(participant, dict):
+            continue
+        append("participants", {
+            "puuid": participant.get("puuid"),
+            "champion_id": participant.get("championId"),
+            "team_id": participant.get("teamId"),
+            "team_position": participant.get("teamPosition") or None,
+            "win": bool(participant.get("win")),
+            "kills": participant.get("kills", 0),
+            "deaths": participant.get("deaths", 0),
+            "assists": participant.get("assists", 0),
+            "gold": participant.get("goldEarned", 0),
+            "damage": participant.get("totalDamageDealtToChampions", 0),
+            "vision": participant.get("visionScore", 0),
+        })
+
+    for team in info.get("teams") or []:
+        if not isinstance(team, dict):
+            continue
+        objectives = team.get("objectives")
+        append("teams", {
+            "team_id": team.get("teamId"),
+            "win": bool(team.get("win")),
+            "champion_kills": _objective_kills(objectives, "champion"),
+            "tower_kills": _objective_kills(objectives, "tower"),
+            "dragon_kills": _objective_kills(objectives, "dragon"),
+            "baron_kills": _objective_kills(objectives, "baron"),
+        })
+        for ban in team.get("bans") or []:
+            # Riot usa -1 para los turnos de baneo sin campeón.
+            if isinstance(ban, dict) and ban.get("championId", -1) != -1:
+                append("bans", {
+                    "team_id": team.get("teamId"),
+                    "pick_turn": ban.get("pickTurn"),
+                    "champion_id": ban.get("championId"),
+                })
+    return True
+
+
+def _empty_buffers(schemas: Dict[str, "pa.Schema"]) -> Dict[str, Dict[str, list]]:
+    return {table: {name: [] for name in schema.names} for table, schema in schemas.items()}
+
+
+def _partitioning() -> "ds.Partitioning":
+    return ds.partitioning(
+        pa.schema([(name, pa.string()) for name in PARTITION_COLUMNS]), flavor="hive"
+    )
+
+
+def read_watermark(export_dir: Path | str = DEFAULT_EXPORT_DIR) -> int:
+    """Devuelve el último ``seq`` exportado (0 si no hay exportaciones previas)."""
+
+    try:
+        with open(Path(export_dir) / WATERMARK_FILE, "r", encoding="utf-8") as handle:
+            watermark = json.load(handle)
+        # Exportaciones anteriores guardaban el rowid; la migración de `seq` copia
+        # el rowid de las partidas existentes, así que el valor sigue siendo válido.
+        return int(watermark.get("last_seq", watermark.get("last_rowid", 0)))
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def _write_watermark(export_dir: Path, last_seq: int) -> None:
+    path = export_dir / WATERMARK_FILE
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        json.dump({"last_seq": last_seq}, handle)
+    os.replace(tmp_path, path)
+
+
+def export_matches(
+    repo: MatchRepository,
+    export_dir: Path | str = DEFAULT_EXPORT_DIR,
+    *,
+    batch_size: int = 500,
+    rows_per_file: int = DEFAULT_ROWS_PER_FILE,
+    full: bool = False,
+) -> ExportResult:
+    """Exporta a Parquet las partidas guardadas después de la última marca de agua.
+
+    Args:
+        repo: Repositorio de origen.
+        export_dir: Directorio raíz de los datasets.
+        batch_size: Partidas leídas de SQLite por consulta.
+        rows_per_file: Filas de participantes acumuladas antes de escribir archivos.
+        full: Borra la exportación existente y la regenera desde cero.
+
+    Returns:
+        ExportResult con el número de partidas y filas escritas.
+
+    Notes:
+        La marca de agua se actualiza después de cada escritura, así que una
+        exportación interrumpida se reanuda desde el último bloque completo. Con
+        los mismos ``batch_size`` y ``rows_per_file`` el bloque reintentado tiene
+        el mismo rango de ``seq`` y sobrescribe los archivos que llegó a escribir.
+    """
+
+    _require_pyarrow()
+    export_dir = Path(export_dir)
+    if full:
+        for table in TABLES:
+            shutil.rmtree(export_dir / table, ignore_errors=True)
+        (export_dir / WATERMARK_FILE).unlink(missing_ok=True)
+    export_dir.mkdir(parents=True, exist_ok=True)
+
+    schemas = table_schemas()
+    partitioning = _partitioning()
+    parquet_options = ds.ParquetFileFormat().make_write_options(compression="zstd")
+    result = ExportResult(last_seq=read_watermark(export_dir))
+    buffers = _empty_buffers(schemas)
+    pending_matches = 0
+    first_seq: Optional[int] = None
+
+    def flush(last_seq: int) -> None:
+        nonlocal buffers, pending_matches, first_seq
+        for table, schema in schemas.items():
+            columns = buffers[table]
+            if not columns["match_id"]:
+                continue
+            ds.write_dataset(
+                pa.Table.from_pydict(columns, schema=schema),
+                export_dir / table,
+                format="parquet",
+                partitioning=partitioning,
+                basename_template=f"part-{first_seq:012d}-{last_seq:012d}-{{i}}.parquet",
+                existing_data_behavior="overwrite_or_ignore",
+                file_options=parquet_options,
+            )
+            result.rows[table] += len(columns["match_id"])
+        _write_watermark(export_dir, last_seq)
+        result.matches += pending_matches
+        result.last_seq = last_seq
+        buffers = _empty_buffers(schemas)
+        pending_matches = 0
+        first_seq = None
+
+    last_seq = result.last_seq
+    for batch in repo.iter_match_payloads(after_seq=result.last_seq, batch_size=batch_size):
+        for seq, match_id, raw_json in batch:
+            if first_seq is None:
+                first_seq = seq
+            last_seq = seq
+            try:
+                match = json_loads(raw_json) if raw_json else None
+            except ValueError:
+                match = None
+            if match is not None and _flatten_match(match_id, match, buffers):
+                pending_matches += 1
+            else:
+                result.skipped += 1
+        if len(buffers["participants"]["match_id"]) >= rows_per_file:
+            flush(last_seq)
+
+    if last_seq != result.last_seq:
+        flush(last_seq)
+    return result
+
+
+def read_table(
+    table: str,
+    export_dir: Path | str = DEFAULT_EXPORT_DIR,
+    *,
+    columns: Optional[Sequence[str]] = None,
+    filter: Optional["ds.Expression"] = None,
+) -> "pa.Table":
+    """Lee una tabla exportada con lecturas mapeadas en memoria.
+
+    Args:
+        table: ``"participants"``, ``"teams"`` o ``"bans"``.
+        export_dir: Directorio raíz de los datasets.
+        columns: Columnas a leer (todas por defecto).
+        filter: Expresión de ``pyarrow.dataset``; los filtros por ``patch`` o
+            ``region`` descartan particiones sin abrir sus archivos.
+
+    Returns:
+        pa.Table con las columnas pedidas (``to_pandas()`` para un DataFrame).
+    """
+
+    _require_pyarrow()
+    if table not in TABLES:
+        raise ValueError(f"Tabla desconocida: {table!r}")
+    path = Path(export_dir) / table
+    if not path.exists():
+        empty = table_schemas()[table].empty_table()
+        return empty.select(list(columns)) if columns else empty
+    dataset = ds.dataset(
+        path,
+        format="parquet",
+        partitioning=_partitioning(),
+        filesystem=pa_fs.LocalFileSystem(use_mmap=True),
+    )
+    return dataset.to_table(columns=list(columns) if columns else None, filter=filter)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Punto de entrada de línea de comandos para exportar la base a Parquet."""
+
+    parser = argparse.ArgumentParser(description="Exporta la base de partidas a Parquet.")
+    parser.add_argument("--db", default=str(DEFAULT_DB_PATH), help="Ruta de la base SQLite.")
+    parser.add_argument("--out", default=str(DEFAULT_EXPORT_DIR), help="Directorio de salida.")
+    parser.add_argument("--batch-size", type=int, default=500, help="Partidas por consulta a SQLite.")
+    parser.add_argument("--full", action="store_true", help="Regenera la exportación desde cero.")
+    args = parser.parse_args(argv)
+
+    with connect_repository(args.db) as repo:
+        result = export_matches(repo, args.out, batch_size=args.batch_size, full=args.full)
+    print(
+        f"Exportadas {result.matches} partidas ({result.rows['participants']} participantes, "
+        f"{result.rows['teams']} equipos, {result.rows['bans']} baneos); "
+        f"omitidas {result.skipped}. Marca de agua: {result.last_seq}."
+    )
+    return 0
+
+
+__all__ = [
+    "DEFAULT_EXPORT_DIR",
+    "ExportResult",
+    "export_matches",
+    "read_table",
+    "read_watermark",
+    "table_schemas",
+]
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,191 @@
+"""Vista indexada de una partida de Match-V5.
+
+Las partidas llegan como diccionarios anidados y cada consumidor (resumen del
+jugador, vista de partidas, base de datos) las recorría por su cuenta: un
+``next(...)`` para encontrar al jugador, otro bucle para los baneos de su equipo
+y varios más para agrupar por equipo o por ``participantId``. `parse_match`
+recorre los participantes una sola vez y deja listos los índices y las
+métricas derivadas que usan todos ellos.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+
+@dataclass(frozen=True, slots=True)
+class ParticipantStats:
+    """Datos de un participante con las métricas derivadas ya calculadas.
+
+    Attributes:
+        puuid: PUUID del participante (``""`` si la API no lo incluye).
+        participant_id: ``participantId`` (1-10), usado en las líneas de tiempo.
+        team_id: Equipo (100 = azul, 200 = rojo).
+        champion_id: ID del campeón jugado.
+        team_position: Rol asignado (``""`` si no hay rol, por ejemplo en ARAM).
+        win: Si su equipo ganó.
+        kills: Asesinatos.
+        deaths: Muertes.
+        assists: Asistencias.
+        gold: Oro total obtenido.
+        damage: Daño total a campeones.
+        vision: Puntuación de visión.
+        name: ``riotIdGameName`` o, en partidas antiguas, ``summonerName``.
+        kda_ratio: ``(kills + assists) / max(deaths, 1)``.
+        gold_per_min: Oro por minuto de partida.
+        raw: Diccionario original del participante.
+    """
+
+    puuid: str
+    participant_id: Optional[int]
+    team_id: Optional[int]
+    champion_id: int
+    team_position: str
+    win: bool
+    kills: int
+    deaths: int
+    assists: int
+    gold: int
+    damage: int
+    vision: int
+    name: str
+    kda_ratio: float
+    gold_per_min: float
+    raw: Dict[str, Any] = field(repr=False)
+
+    @property
+    def kda(self) -> str:
+        return f"{self.kills}/{self.deaths}/{self.assists}"
+
+
+@dataclass(frozen=True, slots=True)
+class ParsedMatch:
+    """Partida con sus participantes indexados.
+
+    Attributes:
+        match_id: ID de la partida (``metadata.matchId``).
+        duration: Duración en segundos (``info.gameDuration``).
+        patch: Parche ``major.minor`` de ``info.gameVersion``.
+        participants: Participantes en el orden de la API.
+        by_puuid: ``puuid -> participante``.
+        by_participant_id: ``participantId -> participante``.
+        teams: ``teamId -> participantes`` en el orden de la API.
+        bans: ``teamId -> championId`` de cada turno de baneo (``-1`` = sin baneo).
+        info: Diccionario ``info`` original.
+    """
+
+    match_id: Optional[str]
+    duration: Optional[int]
+    patch: Optional[str]
+    participants: Tuple[ParticipantStats, ...]
+    by_puuid: Dict[str, ParticipantStats]
+    by_participant_id: Dict[int, ParticipantStats]
+    teams: Dict[Optional[int], Tuple[ParticipantStats, ...]]
+    bans: Dict[Optional[int], Tuple[int, ...]]
+    info: Dict[str, Any] = field(repr=False)
+
+    @property
+    def duration_minutes(self) -> float:
+        return (self.duration or 0) / 60
+
+    def player(self, puuid: str) -> Optional[ParticipantStats]:
+        """Devuelve el participante con ese PUUID, o ``None`` si no jugó la partida."""
+
+        return self.by_puuid.get(puuid)
+
+
+def extract_patch(game_version: Any) -> Optional[str]:
+    """Convierte ``gameVersion`` (``"14.2.555.1234"``) en el parche ``"14.2"``."""
+
+    if not isinstance(game_version, str) or not game_version:
+        return None
+    parts = game_version.split(".")
+    return ".".join(parts[:2]) if len(parts) >= 2 else game_version
+
+
+def parse_match(match: Any, match_id: Optional[str] = None) -> Optional[ParsedMatch]:
+    """
+    Indexa una partida de Match-V5 en una sola pasada por sus participantes.
+
+    Args:
+        match (Any): Partida tal como la devuelve la API (o ``raw_json`` decodificado).
+        match_id (str | None): ID a usar si la partida no trae ``metadata.matchId``.
+
+    Returns:
+        ParsedMatch | None: ``None`` si la partida no tiene ``info``.
+    """
+    info = match.get("info") if isinstance(match, dict) else None
+    if not isinstance(info, dict):
+        return None
+
+    metadata = match.get("metadata")
+    if isinstance(metadata, dict) and metadata.get("matchId"):
+        match_id = metadata["matchId"]
+    duration = info.get("gameDuration")
+    minutes = (duration or 0) / 60
+
+    participants = []
+    by_puuid: Dict[str, ParticipantStats] = {}
+    by_participant_id: Dict[int, ParticipantStats] = {}
+    teams: Dict[Optional[int], list] = {}
+    for raw in info.get("participants") or []:
+        if not isinstance(raw, dict):
+            continue
+        # `or 0`: la API a veces envía las métricas con un ``null`` explícito.
+        kills = raw.get("kills") or 0
+        deaths = raw.get("deaths") or 0
+        assists = raw.get("assists") or 0
+        gold = raw.get("goldEarned") or 0
+        participant = ParticipantStats(
+            puuid=raw.get("puuid") or "",
+            participant_id=raw.get("participantId"),
+            team_id=raw.get("teamId"),
+            champion_id=int(raw.get("championId") or 0),
+            team_position=raw.get("teamPosition") or "",
+            win=bool(raw.get("win")),
+            kills=kills,
+            deaths=deaths,
+            assists=assists,
+            gold=gold,
+            damage=raw.get("totalDamageDealtToChampions") or 0,
+            vision=raw.get("visionScore") or 0,
+            name=raw.get("riotIdGameName") or raw.get("summonerName") or "",
+            kda_ratio=(kills + assists) / max(deaths, 1),
+            gold_per_min=gold / minutes if minutes > 0 else 0.0,
+            raw=raw,
+        )
+        participants.append(participant)
+        if participant.puuid:
+            by_puuid[participant.puuid] = participant
+        if participant.participant_id is not None:
+            by_participant_id[participant.participant_id] = participant
+        teams.setdefault(participant.team_id, []).append(participant)
+
+    bans = {
+        team.get("teamId"): tuple(
+            ban.get("championId", -1) for ban in team.get("bans") or [] if isinstance(ban, dict)
+        )
+        for team in info.get("teams") or []
+        if isinstance(team, dict)
+    }
+
+    return ParsedMatch(
+        match_id=match_id,
+        duration=duration,
+        patch=extract_patch(info.get("gameVersion")),
+        participants=tuple(participants),
+        by_puuid=by_puuid,
+        by_participant_id=by_participant_id,
+        teams={team_id: tuple(members) for team_id, members in teams.items()},
+        bans=bans,
+        info=info,
+    )
+
+
+__all__ = [
+    "ParsedMatch",
+    "ParticipantStats",
+    "extract_patch",
+    "parse_match",
+]
@@ -0,0 +1,306 @@
+"""Limitador de peticiones compartido para Riot API.
+
+Riot aplica dos niveles de límites que se informan en cada respuesta:
+
+* ``X-App-Rate-Limit``: límites de la API key por host de routing
+  (``americas``, ``la1``...).
+* ``X-Method-Rate-Limit``: límites de cada endpoint dentro de ese host.
+
+Ambas cabeceras usan el formato ``"20:1,100:120"`` (20 peticiones por segundo y
+100 cada 120 segundos). El limitador mantiene un token bucket por ventana y sólo
+deja salir una petición cuando hay tokens en todas las ventanas del host y del
+método, de forma que nunca se supera el límite anunciado. Mientras no se conocen
+los límites de un host o método se envía una única petición de sondeo para
+aprenderlos. Un 429 con ``Retry-After`` bloquea el ámbito afectado hasta que
+expire la espera.
+
+El limitador es seguro entre hilos y ofrece `RateLimiter.acquire` para código
+síncrono y `RateLimiter.acquire_async` para código asyncio.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
+import threading
+import time
+from typing import Callable, Deque, Dict, List, Mapping, Optional, Tuple
+
+
+# Espera usada mientras hay una petición de sondeo en curso.
+PROBE_POLL_SECONDS = 0.02
+
+# Margen añadido a cada ventana para cubrir la latencia entre el envío y la
+# recepción en el servidor (las ventanas de Riot empiezan a contar en el servidor).
+DEFAULT_WINDOW_PADDING_SECONDS = 0.1
+
+# Espera por defecto tras un 429 sin cabecera Retry-After.
+DEFAULT_RETRY_AFTER_SECONDS = 1.0
+
+
+def parse_rate_limit_header(value: Optional[str]) -> List[Tuple[int, int]]:
+    """Convierte una cabecera de límites de Riot en pares ``(peticiones, segundos)``.
+
+    Args:
+        value: Valor de la cabecera, por ejemplo ``"20:1,100:120"``.
+
+    Returns:
+        Lista de pares ``(límite, ventana_en_segundos)``. Las entradas mal formadas
+        se ignoran.
+    """
+
+    if not value:
+        return []
+
+    limits: List[Tuple[int, int]] = []
+    for chunk in value.split(","):
+        count, _, seconds = chunk.strip().partition(":")
+        try:
+            limits.append((int(count), int(seconds)))
+        except ValueError:
+            continue
+    return limits
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Interpreta la cabecera ``Retry-After`` (en segundos)."""
+
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+class TokenBucket:
+    """Bucket de ``limit`` tokens que se devuelven ``window`` segundos después de usarse.
+
+    Guardar el instante de cada consumo en lugar de rellenar a ritmo constante hace
+    que el bucket nunca permita más de ``limit`` peticiones en cualquier intervalo
+    de ``window`` segundos, que es la condición que Riot verifica.
+    """
+
+    def __init__(self, limit: int, window: float) -> None:
+        self.limit = limit
+        self.window = window
+        self._consumed: Deque[float] = deque()
+
+    def _prune(self, now: float) -> None:
+        while self._consumed and self._consumed[0] + self.window <= now:
+            self._consumed.popleft()
+
+    def wait_time(self, now: float) -> float:
+        """Segundos que faltan para disponer de un token (0 si hay uno libre)."""
+
+        self._prune(now)
+        if len(self._consumed) < self.limit:
+            return 0.0
+        return self._consumed[0] + self.window - now
+
+    def consume(self, now: float) -> None:
+        """Registra el uso de un token en el instante indicado."""
+
+        self._consumed.append(now)
+
+    def sync_count(self, count: int, now: float) -> None:
+        """Ajusta el bucket si el servidor informa de más consumos que los locales."""
+
+        self._prune(now)
+        while len(self._consumed) < min(count, self.limit):
+            self._consumed.append(now)
+
+    @property
+    def in_window(self) -> int:
+        """Número de tokens consumidos dentro de la ventana actual."""
+
+        return len(self._consumed)
+
+
+@dataclass
+class _LimitScope:
+    """Estado de límites de un host (límites de app) o de un método."""
+
+    buckets: Dict[Tuple[int, int], TokenBucket] = field(default_factory=dict)
+    learned: bool = False
+    probe_in_flight: bool = False
+    blocked_until: float = 0.0
+
+    def wait_time(self, now: float) -> Optional[float]:
+        """Devuelve la espera necesaria o ``None`` si esta petición puede ser sondeo."""
+
+        if self.blocked_until > now:
+            return self.blocked_until - now
+        if not self.learned:
+            return PROBE_POLL_SECONDS if self.probe_in_flight else None
+        return max((bucket.wait_time(now) for bucket in self.buckets.values()), default=0.0)
+
+    def consume(self, now: float) -> None:
+        if not self.learned:
+            self.probe_in_flight = True
+        for bucket in self.buckets.values():
+            bucket.consume(now)
+
+    def update_limits(
+        self,
+        limits: List[Tuple[int, int]],
+        counts: List[Tuple[int, int]],
+        padding: float,
+        now: float,
+    ) -> None:
+        current = dict(self.buckets)
+        self.buckets = {}
+        for limit, seconds in limits:
+            bucket = current.get((limit, seconds)) or TokenBucket(limit, seconds + padding)
+            self.buckets[(limit, seconds)] = bucket
+        count_by_window = {seconds: count for count, seconds in counts}
+        for (limit, seconds), bucket in self.buckets.items():
+            if seconds in count_by_window:
+                bucket.sync_count(count_by_window[seconds], now)
+        self.learned = True
+        self.probe_in_flight = False
+
+
+class RateLimiter:
+    """Planificador de peticiones que respeta los límites de app y de método de Riot.
+
+    Args:
+        window_padding: Segundos extra que se suman a cada ventana como margen.
+        clock: Función de reloj monotónico (inyectable en tests).
+    """
+
+    def __init__(
+        self,
+        window_padding: float = DEFAULT_WINDOW_PADDING_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._window_padding = window_padding
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._app_scopes: Dict[str, _LimitScope] = {}
+        self._method_scopes: Dict[Tuple[str, str], _LimitScope] = {}
+
+    def _scopes(self, host: str, method: str) -> Tuple[_LimitScope, _LimitScope]:
+        app_scope = self._app_scopes.setdefault(host, _LimitScope())
+        method_scope = self._method_scopes.setdefault((host, method), _LimitScope())
+        return app_scope, method_scope
+
+    def try_acquire(self, host: str, method: str) -> float:
+        """Intenta reservar un hueco para una petición sin bloquear.
+
+        Args:
+            host: Host de routing (``americas``, ``la1``...).
+            method: Identificador del endpoint (por ejemplo ``"match-v5.match"``).
+
+        Returns:
+            0 si la petición puede enviarse ya (el hueco queda reservado) o los
+            segundos que conviene esperar antes de reintentar.
+        """
+
+        with self._lock:
+            now = self._clock()
+            scopes = self._scopes(host, method)
+            waits = [scope.wait_time(now) for scope in scopes]
+            pending = [wait for wait in waits if wait is not None and wait > 0]
+            if pending:
+                return max(pending)
+            for scope in scopes:
+                scope.consume(now)
+            return 0.0
+
+    def acquire(self, host: str, method: str, timeout: Optional[float] = None) -> None:
+        """Bloquea el hilo actual hasta poder enviar una petición.
+
+        Raises:
+            TimeoutError: Si no se consigue hueco antes de ``timeout`` segundos.
+        """
+
+        deadline = None if timeout is None else self._clock() + timeout
+        while True:
+            wait = self.try_acquire(host, method)
+            if wait <= 0:
+                return
+            if deadline is not None and self._clock() + wait > deadline:
+                raise TimeoutError(f"Sin capacidad de peticiones para {host}/{method}")
+            time.sleep(wait)
+
+    async def acquire_async(self, host: str, method: str, timeout: Optional[float] = None) -> None:
+        """Equivalente de `acquire` para corrutinas; cede el event loop mientras espera."""
+
+        deadline = None if timeout is None else self._clock() + timeout
+        while True:
+            wait = self.try_acquire(host, method)
+            if wait <= 0:
+                return
+            if deadline is not None and self._clock() + wait > deadline:
+                raise TimeoutError(f"Sin capacidad de peticiones para {host}/{method}")
+            await asyncio.sleep(wait)
+
+    def update_from_headers(
+        self,
+        host: str,
+        method: str,
+        status_code: int,
+        headers: Mapping[str, str],
+    ) -> None:
+        """Actualiza los buckets a partir de las cabeceras de una respuesta.
+
+        Args:
+            host: Host de routing al que se hizo la petición.
+            method: Identificador del endpoint.
+            status_code: Código HTTP de la respuesta.
+            headers: Cabeceras de la respuesta (se admiten claves en cualquier caso).
+        """
+
+        normalized = {key.lower(): value for key, value in headers.items()}
+        with self._lock:
+            now = self._clock()
+            app_scope, method_scope = self._scopes(host, method)
+            for scope, prefix in ((app_scope, "x-app-rate-limit"), (method_scope, "x-method-rate-limit")):
+                if prefix in normalized or status_code < 400:
+                    # Una respuesta correcta sin cabeceras indica que el host no limita.
+                    scope.update_limits(
+                        parse_rate_limit_header(normalized.get(prefix)),
+                        parse_rate_limit_header(normalized.get(f"{prefix}-count")),
+                        self._window_padding,
+                        now,
+                    )
+                else:
+                    scope.probe_in_flight = False
+
+            if status_code == 429:
+                retry_after = parse_retry_after(normalized.get("retry-after"))
+                if retry_after is None:
+                    retry_after = DEFAULT_RETRY_AFTER_SECONDS
+                # Los 429 de tipo "application" afectan a todo el host; el resto sólo al método.
+                limit_type = normalized.get("x-rate-limit-type", "").lower()
+                scope = app_scope if limit_type == "application" else method_scope
+                scope.blocked_until = max(scope.blocked_until, now + retry_after)
+
+    def release(self, host: str, method: str) -> None:
+        """Libera el sondeo en curso cuando la petición falló sin respuesta."""
+
+        with self._lock:
+            for scope in self._scopes(host, method):
+                scope.probe_in_flight = False
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        """Devuelve el consumo actual por host, útil para depuración."""
+
+        with self._lock:
+            now = self._clock()
+            usage: Dict[str, Dict[str, int]] = {}
+            for host, scope in self._app_scopes.items():
+                for (limit, seconds), bucket in scope.buckets.items():
+                    bucket.wait_time(now)
+                    usage.setdefault(host, {})[f"{limit}:{seconds}"] = bucket.in_window
+            return usage
+
+
+__all__ = [
+    "RateLimiter",
+    "TokenBucket",
+    "parse_rate_limit_header",
+    "parse_retry_after",
+]
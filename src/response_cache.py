@@ -0,0 +1,182 @@
+"""Caché persistente de respuestas inmutables de la API de Riot.
+
+Una partida terminada y su línea de tiempo no cambian nunca, así que basta con
+descargarlas una vez. `ResponseCache` guarda el JSON de cada respuesta,
+comprimido con zlib, en una base SQLite propia (separada de la base de
+partidas, que sólo conserva el año en curso y se puede borrar sin perder la
+caché). La clave es ``(tipo, región, match_id)``, que identifica de forma
+unívoca el contenido.
+
+El tamaño total está acotado: al superar ``max_bytes`` se eliminan las
+entradas usadas hace más tiempo (LRU) hasta quedar en ``EVICTION_RATIO`` del
+límite. La caché es segura entre hilos para poder usarse desde
+`data_collection.get_match_details_many`.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Optional
+
+try:
+    from . import json_codec
+except ImportError:  # Ejecución directa con `streamlit run src/dashboard.py`
+    import json_codec
+
+
+DEFAULT_CACHE_PATH = Path("data/cache/responses.db")
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Tras una limpieza el tamaño queda en esta fracción del límite, para no
+# desalojar en cada escritura.
+EVICTION_RATIO = 0.9
+
+ZLIB_LEVEL = 6
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """Contadores de la caché.
+
+    Attributes:
+        hits: Consultas resueltas desde la caché en este proceso.
+        misses: Consultas que tuvieron que ir a la red en este proceso.
+        evictions: Entradas desalojadas por el límite de tamaño en este proceso.
+        entries: Entradas guardadas.
+        size_bytes: Tamaño comprimido de las entradas guardadas.
+    """
+
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    size_bytes: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class ResponseCache:
+    """Caché LRU en SQLite de respuestas JSON.
+
+    Args:
+        path: Archivo SQLite de la caché (se crea si no existe).
+        max_bytes: Tamaño máximo de los cuerpos comprimidos.
+    """
+
+    def __init__(self, path: Path | str = DEFAULT_CACHE_PATH, *, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL;")
+        self._conn.execute("PRAGMA synchronous=NORMAL;")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                kind TEXT NOT NULL,
+                region TEXT NOT NULL,
+                key TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (kind, region, key)
+            ) WITHOUT ROWID;
+
+            CREATE INDEX IF NOT EXISTS idx_responses_last_access
+                ON responses (last_access);
+            """
+        )
+        self._size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses;").fetchone()[0]
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, kind: str, region: str, key: str) -> Optional[Any]:
+        """Devuelve la respuesta guardada o ``None`` si no está en la caché."""
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body FROM responses WHERE kind = ? AND region = ? AND key = ?;",
+                (kind, region, key),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE responses SET last_access = ? WHERE kind = ? AND region = ? AND key = ?;",
+                    (time.time(), kind, region, key),
+                )
+            self.hits += 1
+        return json_codec.loads(zlib.decompress(row[0]))
+
+    def put(self, kind: str, region: str, key: str, payload: Any) -> None:
+        """Guarda una respuesta y desaloja las más antiguas si se supera el límite."""
+
+        body = zlib.compress(json_codec.dumps(payload).encode("utf-8"), ZLIB_LEVEL)
+        with self._lock, self._conn:
+            previous = self._conn.execute(
+                "SELECT size FROM responses WHERE kind = ? AND region = ? AND key = ?;",
+                (kind, region, key),
+            ).fetchone()
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO responses (kind, region, key, body, size, last_access)
+                VALUES (?, ?, ?, ?, ?, ?);
+                """,
+                (kind, region, key, body, len(body), time.time()),
+            )
+            self._size += len(body) - (previous[0] if previous else 0)
+            if self._size > self.max_bytes:
+                self._evict(int(self.max_bytes * EVICTION_RATIO))
+
+    def _evict(self, target_bytes: int) -> None:
+        """Elimina entradas por orden de último acceso hasta bajar de ``target_bytes``."""
+
+        victims = []
+        size = self._size
+        for kind, region, key, entry_size in self._conn.execute(
+            "SELECT kind, region, key, size FROM responses ORDER BY last_access;"
+        ):
+            if size <= target_bytes:
+                break
+            victims.append((kind, region, key))
+            size -= entry_size
+        self._conn.executemany(
+            "DELETE FROM responses WHERE kind = ? AND region = ? AND key = ?;", victims
+        )
+        self._size = size
+        self.evictions += len(victims)
+
+    def stats(self) -> CacheStats:
+        """Devuelve los contadores de aciertos y el tamaño actual."""
+
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses;").fetchone()[0]
+            return CacheStats(self.hits, self.misses, self.evictions, entries, self._size)
+
+    def clear(self) -> None:
+        """Vacía la caché."""
+
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses;")
+            self._size = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+__all__ = [
+    "CacheStats",
+    "ResponseCache",
+]
@@ -0,0 +1,268 @@
+"""Cliente HTTP compartido para Riot API y Data Dragon.
+
+`RiotClient` mantiene una `requests.Session` por host con un pool de conexiones
+keep-alive, de modo que cientos de descargas de partidas reutilizan las mismas
+conexiones TCP+TLS en lugar de abrir una nueva por petición. Además:
+
+* Acepta respuestas comprimidas (gzip/deflate).
+* Reintenta los errores 5xx y de conexión con backoff exponencial con jitter.
+* Pasa las peticiones a Riot por el `RateLimiter` y reintenta los 429.
+* Registra la latencia de cada petición por endpoint.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass, field
+import random
+import threading
+import time
+from typing import Any, Callable, Deque, Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    from .rate_limiter import RateLimiter
+except ImportError:  # Ejecución directa con `streamlit run src/dashboard.py`
+    from rate_limiter import RateLimiter
+
+
+DEFAULT_TIMEOUT_SECONDS = 10
+DEFAULT_POOL_CONNECTIONS = 4
+DEFAULT_POOL_MAXSIZE = 16
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_MAX_RATE_LIMIT_RETRIES = 3
+DEFAULT_BACKOFF_BASE_SECONDS = 0.5
+DEFAULT_BACKOFF_MAX_SECONDS = 8.0
+
+# Número de muestras recientes que se guardan por endpoint para calcular percentiles.
+LATENCY_SAMPLE_SIZE = 512
+
+
+@dataclass
+class EndpointMetrics:
+    """Latencias acumuladas de un endpoint.
+
+    Las actualizaciones llegan desde los hilos de `get_match_details_many`, así que
+    todas pasan por un lock propio de cada endpoint.
+
+    Attributes:
+        requests: Número de peticiones completadas (incluye reintentos).
+        errors: Peticiones que terminaron en error de conexión o 5xx.
+        retries: Reintentos realizados por 5xx, errores de conexión o 429.
+        total_seconds: Suma de las latencias.
+        max_seconds: Latencia máxima observada.
+    """
+
+    requests: int = 0
+    errors: int = 0
+    retries: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    samples: Deque[float] = field(default_factory=lambda: deque(maxlen=LATENCY_SAMPLE_SIZE))
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record(self, elapsed: float, *, error: bool = False) -> None:
+        with self._lock:
+            self.requests += 1
+            self.errors += 1 if error else 0
+            self.total_seconds += elapsed
+            self.max_seconds = max(self.max_seconds, elapsed)
+            self.samples.append(elapsed)
+
+    def record_retry(self) -> None:
+        with self._lock:
+            self.retries += 1
+
+    def summary(self) -> Dict[str, float]:
+        """Resume las métricas en un diccionario serializable."""
+
+        with self._lock:
+            ordered = sorted(self.samples)
+            completed, errors, retries = self.requests, self.errors, self.retries
+            total_seconds, max_seconds = self.total_seconds, self.max_seconds
+
+        def percentile(fraction: float) -> float:
+            if not ordered:
+                return 0.0
+            return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+        return {
+            "requests": completed,
+            "errors": errors,
+            "retries": retries,
+            "avg_ms": (total_seconds / completed * 1000) if completed else 0.0,
+            "p50_ms": percentile(0.5) * 1000,
+            "p95_ms": percentile(0.95) * 1000,
+            "max_ms": max_seconds * 1000,
+        }
+
+
+class RiotClient:
+    """Cliente con sesiones persistentes por host, reintentos y métricas.
+
+    Args:
+        api_key: API key de Riot enviada en ``X-Riot-Token``.
+        rate_limiter: Limitador compartido; se crea uno nuevo si no se indica.
+        pool_connections: Número de pools que guarda cada sesión.
+        pool_maxsize: Conexiones keep-alive por host (debe cubrir la concurrencia usada).
+        max_retries: Reintentos ante 5xx o errores de conexión.
+        max_rate_limit_retries: Reintentos ante 429.
+        backoff_base: Espera base en segundos para el backoff exponencial.
+        backoff_max: Espera máxima entre reintentos.
+        timeout: Timeout por petición en segundos.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        *,
+        rate_limiter: Optional[RateLimiter] = None,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        max_rate_limit_retries: int = DEFAULT_MAX_RATE_LIMIT_RETRIES,
+        backoff_base: float = DEFAULT_BACKOFF_BASE_SECONDS,
+        backoff_max: float = DEFAULT_BACKOFF_MAX_SECONDS,
+        timeout: float = DEFAULT_TIMEOUT_SECONDS,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.api_key = api_key
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.max_retries = max_retries
+        self.max_rate_limit_retries = max_rate_limit_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self._sleep = sleep
+        self._sessions: Dict[str, requests.Session] = {}
+        self._metrics: Dict[str, EndpointMetrics] = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "RiotClient":
+        return self
+
+    def __exit__(self, exc_type, exc, exc_tb) -> None:
+        self.close()
+
+    def _session_for(self, url: str) -> requests.Session:
+        """Devuelve (creándola si hace falta) la sesión asociada al host de la URL."""
+
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        with self._lock:
+            session = self._sessions.get(origin)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=self.pool_connections,
+                    pool_maxsize=self.pool_maxsize,
+                    max_retries=0,
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update({"Accept-Encoding": "gzip, deflate", "Accept": "application/json"})
+                if self.api_key:
+                    session.headers["X-Riot-Token"] = self.api_key
+                self._sessions[origin] = session
+            return session
+
+    def _endpoint_metrics(self, method: str) -> EndpointMetrics:
+        with self._lock:
+            return self._metrics.setdefault(method, EndpointMetrics())
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """Backoff exponencial con jitter completo."""
+
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def get(
+        self,
+        url: str,
+        *,
+        host: Optional[str] = None,
+        method: str = "default",
+        params: Optional[Dict[str, Any]] = None,
+    ) -> requests.Response:
+        """
+        Realiza una petición GET reutilizando la sesión del host.
+
+        Args:
+            url (str): URL completa del recurso
+            host (str | None): Host de routing de Riot para el limitador; ``None`` para
+                recursos sin límites (Data Dragon)
+            method (str): Identificador del endpoint para límites y métricas
+            params (Dict[str, Any] | None): Parámetros de query
+
+        Returns:
+            requests.Response: Última respuesta recibida tras aplicar los reintentos
+
+        Raises:
+            requests.RequestException: Si los errores de conexión persisten tras los reintentos.
+        """
+        session = self._session_for(url)
+        metrics = self._endpoint_metrics(method)
+        server_errors = 0
+        rate_limited = 0
+
+        while True:
+            if host is not None:
+                self.rate_limiter.acquire(host, method)
+
+            started = time.perf_counter()
+            try:
+                response = session.get(url, params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                metrics.record(time.perf_counter() - started, error=True)
+                if host is not None:
+                    self.rate_limiter.release(host, method)
+                if server_errors >= self.max_retries:
+                    raise
+                self._sleep(self._backoff_delay(server_errors))
+                server_errors += 1
+                metrics.record_retry()
+                continue
+            except BaseException:
+                # Cualquier otro fallo (respuesta corrupta, redirecciones, Ctrl+C) no se
+                # reintenta, pero debe liberar el sondeo: si no, el host quedaría bloqueado.
+                metrics.record(time.perf_counter() - started, error=True)
+                if host is not None:
+                    self.rate_limiter.release(host, method)
+                raise
+
+            metrics.record(time.perf_counter() - started, error=response.status_code >= 500)
+            if host is not None:
+                self.rate_limiter.update_from_headers(host, method, response.status_code, response.headers)
+
+            if response.status_code == 429 and rate_limited < self.max_rate_limit_retries:
+                # El limitador ya bloqueó el ámbito según Retry-After.
+                rate_limited += 1
+                metrics.record_retry()
+                continue
+            if response.status_code >= 500 and server_errors < self.max_retries:
+                self._sleep(self._backoff_delay(server_errors))
+                server_errors += 1
+                metrics.record_retry()
+                continue
+            return response
+
+    def get_metrics(self) -> Dict[str, Dict[str, float]]:
+        """Devuelve un resumen de latencias por endpoint."""
+
+        with self._lock:
+            return {method: metrics.summary() for method, metrics in self._metrics.items()}
+
+    def close(self) -> None:
+        """Cierra todas las sesiones y sus conexiones."""
+
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+__all__ = ["EndpointMetrics", "RiotClient"]
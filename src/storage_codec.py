@@ -0,0 +1,183 @@
+"""Codificación comprimida de JSON para la base de partidas.
+
+Los valores comprimidos se guardan como BLOB con una cabecera de 9 bytes::
+
+    b"LMC1" | codec (1 byte) | dict_id (4 bytes, big endian) | payload
+
+``dict_id`` es 0 cuando no se usó diccionario. Cualquier valor que no sea
+``bytes`` con esa cabecera se considera JSON plano (TEXT), así que las filas
+antiguas siguen leyéndose sin migración.
+
+Codecs disponibles:
+
+* ``zlib``: siempre disponible (librería estándar). Admite diccionario
+  predefinido (``zdict``) de hasta 32 KB.
+* ``zstd``: requiere el paquete opcional ``zstandard``; usa diccionarios
+  entrenados con ``zstandard.train_dictionary``.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+import re
+import struct
+import zlib
+from typing import Mapping, Optional, Sequence
+
+try:
+    import zstandard
+except ImportError:  # Dependencia opcional
+    zstandard = None
+
+
+MAGIC = b"LMC1"
+HEADER = struct.Struct(">4sBI")
+
+CODEC_IDS = {"zlib": 1, "zstd": 2}
+CODEC_NAMES = {codec_id: name for name, codec_id in CODEC_IDS.items()}
+
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 3
+
+# zlib sólo aprovecha los últimos 32 KB del diccionario (tamaño de ventana).
+MAX_ZLIB_DICTIONARY_BYTES = 32 * 1024
+DEFAULT_DICTIONARY_BYTES = 32 * 1024
+
+_JSON_FRAGMENT = re.compile(rb'"[A-Za-z0-9_]+":(?:"[A-Z_]{2,}"|true|false|0|-1)?')
+
+
+def available_codecs() -> Sequence[str]:
+    """Codecs que se pueden usar en este entorno."""
+
+    return ("zlib", "zstd") if zstandard is not None else ("zlib",)
+
+
+def _require_codec(codec: str) -> int:
+    if codec not in CODEC_IDS:
+        raise ValueError(f"Codec de compresión desconocido: {codec!r}")
+    if codec == "zstd" and zstandard is None:
+        raise RuntimeError("El codec 'zstd' requiere instalar el paquete 'zstandard'.")
+    return CODEC_IDS[codec]
+
+
+def is_compressed(value: object) -> bool:
+    """Indica si un valor leído de SQLite está en formato comprimido."""
+
+    return isinstance(value, (bytes, bytearray, memoryview)) and bytes(value[:4]) == MAGIC
+
+
+def compress_text(
+    text: str,
+    codec: str,
+    *,
+    dictionary: Optional[bytes] = None,
+    dictionary_id: int = 0,
+) -> bytes:
+    """Comprime un texto JSON con el codec indicado.
+
+    Args:
+        text: JSON serializado.
+        codec: ``"zlib"`` o ``"zstd"``.
+        dictionary: Diccionario compartido opcional.
+        dictionary_id: Identificador con el que se guardó el diccionario.
+
+    Returns:
+        BLOB con cabecera listo para guardar en SQLite.
+    """
+
+    codec_id = _require_codec(codec)
+    raw = text.encode("utf-8")
+    if dictionary is None:
+        dictionary_id = 0
+
+    if codec == "zlib":
+        if dictionary:
+            compressor = zlib.compressobj(ZLIB_LEVEL, zdict=dictionary[-MAX_ZLIB_DICTIONARY_BYTES:])
+        else:
+            compressor = zlib.compressobj(ZLIB_LEVEL)
+        payload = compressor.compress(raw) + compressor.flush()
+    else:
+        zstd_dict = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+        payload = zstandard.ZstdCompressor(level=ZSTD_LEVEL, dict_data=zstd_dict).compress(raw)
+
+    return HEADER.pack(MAGIC, codec_id, dictionary_id) + payload
+
+
+def decode_text(value: object, dictionaries: Optional[Mapping[int, bytes]] = None) -> Optional[str]:
+    """Devuelve el JSON en texto a partir de un valor plano o comprimido.
+
+    Args:
+        value: Valor leído de la columna (``str``, ``bytes`` o ``None``).
+        dictionaries: Diccionarios disponibles indexados por ``dict_id``.
+
+    Returns:
+        El texto JSON o ``None`` si el valor era nulo.
+
+    Raises:
+        KeyError: Si el valor usa un diccionario que no está disponible.
+    """
+
+    if value is None or isinstance(value, str):
+        return value
+    value = bytes(value)
+    if not is_compressed(value):
+        return value.decode("utf-8")
+
+    _, codec_id, dictionary_id = HEADER.unpack_from(value)
+    payload = value[HEADER.size:]
+    dictionary = dictionaries[dictionary_id] if dictionary_id else None
+    codec = CODEC_NAMES.get(codec_id)
+
+    if codec == "zlib":
+        if dictionary:
+            decompressor = zlib.decompressobj(zdict=dictionary[-MAX_ZLIB_DICTIONARY_BYTES:])
+        else:
+            decompressor = zlib.decompressobj()
+        raw = decompressor.decompress(payload) + decompressor.flush()
+    elif codec == "zstd":
+        _require_codec("zstd")
+        zstd_dict = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+        raw = zstandard.ZstdDecompressor(dict_data=zstd_dict).decompress(payload)
+    else:
+        raise ValueError(f"Codec de compresión desconocido: {codec_id}")
+    return raw.decode("utf-8")
+
+
+def train_dictionary(
+    samples: Sequence[bytes], codec: str, *, size: int = DEFAULT_DICTIONARY_BYTES
+) -> bytes:
+    """Entrena un diccionario compartido a partir de payloads de ejemplo.
+
+    Para ``zstd`` se usa el entrenador de la librería. Para ``zlib`` se construye
+    un diccionario con los fragmentos ``"clave":valor`` más frecuentes, colocando
+    los más comunes al final (zlib favorece las referencias cercanas).
+    """
+
+    _require_codec(codec)
+    if not samples:
+        raise ValueError("Se necesita al menos una muestra para entrenar el diccionario.")
+
+    if codec == "zstd":
+        return zstandard.train_dictionary(size, list(samples)).as_bytes()
+
+    fragment_counts: Counter = Counter()
+    for sample in samples:
+        fragment_counts.update(_JSON_FRAGMENT.findall(sample))
+
+    selected = []
+    total = 0
+    for fragment, _ in fragment_counts.most_common():
+        if total + len(fragment) > min(size, MAX_ZLIB_DICTIONARY_BYTES):
+            break
+        selected.append(fragment)
+        total += len(fragment)
+    return b"".join(reversed(selected))
+
+
+__all__ = [
+    "available_codecs",
+    "compress_text",
+    "decode_text",
+    "is_compressed",
+    "train_dictionary",
+]
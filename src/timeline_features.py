@@ -0,0 +1,138 @@
+"""Extracción de series por minuto de las líneas de tiempo de Match-V5.
+
+Una línea de tiempo ocupa cientos de KB de JSON, pero las gráficas y análisis
+sólo necesitan unas pocas series por jugador. Este módulo convierte los frames
+una sola vez en un array ``(participantes, minutos, métricas)`` de ``int32`` y
+lo serializa en unos pocos KB::
+
+    b"LTF1" | versión | participantes | minutos | métricas | ids (uint8) | payload
+
+El payload son las diferencias entre minutos consecutivos (las series son casi
+siempre acumuladas) comprimidas con zlib.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import struct
+import zlib
+from typing import Any, Dict, Sequence
+
+import numpy as np
+
+
+MAGIC = b"LTF1"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sBBHB")
+
+# Orden de las métricas en el último eje del array.
+METRICS = ("gold", "xp", "cs", "damage", "position_x", "position_y")
+
+ZLIB_LEVEL = 6
+
+
+@dataclass(frozen=True)
+class TimelineFeatures:
+    """Series por minuto de una partida.
+
+    Attributes:
+        participant_ids: ``participantId`` de cada fila del array (``uint8``).
+        values: Array ``(participantes, minutos, len(METRICS))`` de ``int32``.
+    """
+
+    participant_ids: np.ndarray
+    values: np.ndarray
+
+    @property
+    def minutes(self) -> int:
+        return self.values.shape[1]
+
+    def metric(self, name: str) -> np.ndarray:
+        """Devuelve la serie ``(participantes, minutos)`` de una métrica de ``METRICS``."""
+
+        return self.values[:, :, METRICS.index(name)]
+
+    def series(self, name: str) -> Dict[int, np.ndarray]:
+        """Devuelve ``participantId -> serie`` para una métrica."""
+
+        data = self.metric(name)
+        return {int(pid): data[row] for row, pid in enumerate(self.participant_ids)}
+
+    def to_bytes(self) -> bytes:
+        """Serializa las series en formato binario compacto."""
+
+        participants, minutes, metrics = self.values.shape
+        deltas = np.diff(self.values, axis=1, prepend=0).astype("<i4", copy=False)
+        payload = zlib.compress(deltas.tobytes(), ZLIB_LEVEL)
+        header = HEADER.pack(MAGIC, FORMAT_VERSION, participants, minutes, metrics)
+        return header + self.participant_ids.astype(np.uint8).tobytes() + payload
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "TimelineFeatures":
+        """Reconstruye las series desde ``to_bytes``.
+
+        Raises:
+            ValueError: Si los datos no tienen el formato o la versión esperados.
+        """
+
+        data = bytes(data)
+        if len(data) < HEADER.size:
+            raise ValueError("Datos de timeline truncados.")
+        magic, version, participants, minutes, metrics = HEADER.unpack_from(data)
+        if magic != MAGIC or version != FORMAT_VERSION or metrics != len(METRICS):
+            raise ValueError("Formato de series de timeline no soportado.")
+
+        offset = HEADER.size + participants
+        participant_ids = np.frombuffer(data[HEADER.size:offset], dtype=np.uint8)
+        deltas = np.frombuffer(zlib.decompress(data[offset:]), dtype="<i4")
+        values = np.cumsum(deltas.reshape(participants, minutes, metrics), axis=1, dtype=np.int32)
+        return cls(participant_ids=participant_ids, values=values)
+
+
+def _frame_values(frame: Dict[str, Any]) -> Sequence[int]:
+    position = frame.get("position") or {}
+    damage = frame.get("damageStats") or {}
+    # `or 0`: como en `parsed_match`, la API puede enviar ``null`` explícitos.
+    return (
+        frame.get("totalGold") or 0,
+        frame.get("xp") or 0,
+        (frame.get("minionsKilled") or 0) + (frame.get("jungleMinionsKilled") or 0),
+        damage.get("totalDamageDoneToChampions") or 0,
+        position.get("x") or 0,
+        position.get("y") or 0,
+    )
+
+
+def extract_timeline_features(timeline: dict) -> TimelineFeatures:
+    """Convierte los frames de una línea de tiempo en series por minuto.
+
+    Args:
+        timeline: Respuesta de ``match-v5`` timeline.
+
+    Returns:
+        TimelineFeatures con una fila por participante y una columna por frame.
+        Un participante ausente en un frame repite su último valor conocido.
+    """
+
+    info = timeline.get("info") if isinstance(timeline, dict) else None
+    frames = (info or {}).get("frames") or []
+    participant_ids = sorted({
+        int(pid) for frame in frames for pid in (frame.get("participantFrames") or {})
+    })
+    row_of = {pid: row for row, pid in enumerate(participant_ids)}
+
+    values = np.zeros((len(participant_ids), len(frames), len(METRICS)), dtype=np.int32)
+    for minute, frame in enumerate(frames):
+        if minute:
+            values[:, minute] = values[:, minute - 1]
+        for pid, participant_frame in (frame.get("participantFrames") or {}).items():
+            values[row_of[int(pid)], minute] = _frame_values(participant_frame)
+
+    return TimelineFeatures(np.array(participant_ids, dtype=np.uint8), values)
+
+
+__all__ = [
+    "METRICS",
+    "TimelineFeatures",
+    "extract_timeline_features",
+]
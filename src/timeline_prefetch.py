@@ -0,0 +1,214 @@
+"""Descarga en segundo plano de las líneas de tiempo de partidas nuevas.
+
+`MatchRepository.store_matches` encola en la tabla ``timeline_queue`` cada
+partida nueva. `TimelinePrefetcher` vacía esa cola desde un hilo propio usando
+`data_collection.get_match_timeline`, que comparte el `RiotClient` (y por lo
+tanto el presupuesto del rate limiter) con el resto de la aplicación. Como la
+cola vive en SQLite, el trabajo pendiente sobrevive a reinicios.
+
+El dashboard sólo tiene que llamar a `ensure_prefetcher` en cada rerun y
+consultar `status()` para mostrar el progreso.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+try:
+    from . import data_collection
+    from .database import DEFAULT_DB_PATH, MatchRepository, connect_repository
+except ImportError:  # Ejecución directa con `streamlit run src/dashboard.py`
+    import data_collection
+    from database import DEFAULT_DB_PATH, MatchRepository, connect_repository
+
+
+# Partidas reclamadas de la cola en cada vuelta.
+DEFAULT_BATCH_SIZE = 5
+
+# Espera entre consultas a la cola cuando está vacía.
+DEFAULT_POLL_INTERVAL_SECONDS = 2.0
+
+DEFAULT_MAX_ATTEMPTS = 3
+
+
+@dataclass(frozen=True)
+class PrefetchStatus:
+    """Estado del prefetch para mostrar en la interfaz.
+
+    Attributes:
+        running: Si el hilo de descarga está activo.
+        pending: Trabajos por descargar (incluye los que están en curso).
+        done: Líneas de tiempo descargadas desde la cola.
+        failed: Trabajos que agotaron sus reintentos.
+        last_error: Último error registrado por el hilo, si lo hubo.
+    """
+
+    running: bool
+    pending: int
+    done: int
+    failed: int
+    last_error: Optional[str] = None
+
+
+class TimelinePrefetcher:
+    """Vacía la cola ``timeline_queue`` en un hilo en segundo plano.
+
+    Args:
+        db_path: Base de datos con la cola.
+        fetch_timeline: Función que descarga una línea de tiempo (devuelve ``dict`` o
+            el texto del error).
+        batch_size: Trabajos reclamados por vuelta.
+        poll_interval: Segundos de espera cuando la cola está vacía.
+        request_interval: Pausa mínima entre descargas, para dejar presupuesto de
+            rate limit a las peticiones interactivas.
+        max_attempts: Intentos por partida antes de marcarla como 'failed'.
+    """
+
+    def __init__(
+        self,
+        db_path: Path | str = DEFAULT_DB_PATH,
+        *,
+        fetch_timeline: Callable[[str], Any] = data_collection.get_match_timeline,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        poll_interval: float = DEFAULT_POLL_INTERVAL_SECONDS,
+        request_interval: float = 0.0,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    ) -> None:
+        self.db_path = Path(db_path)
+        self._fetch_timeline = fetch_timeline
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.request_interval = request_interval
+        self.max_attempts = max_attempts
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.last_error: Optional[str] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Arranca el hilo (no hace nada si ya está activo)."""
+
+        with self._lock:
+            if self.running:
+                return
+            with connect_repository(self.db_path) as repo:
+                # Trabajos que quedaron a medias en una ejecución anterior; los
+                # reclamados hace poco pueden ser de otro proceso activo.
+                repo.reset_stale_timeline_jobs()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="timeline-prefetch", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Pide al hilo que termine y espera hasta ``timeout`` segundos."""
+
+        self._stop.set()
+        self._wake.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def wake(self) -> None:
+        """Despierta al hilo si está esperando (por ejemplo, tras encolar partidas)."""
+
+        self._wake.set()
+
+    def run_once(self, repo: Optional[MatchRepository] = None) -> int:
+        """Procesa un lote de la cola de forma síncrona.
+
+        Returns:
+            Número de trabajos procesados (con éxito o no).
+        """
+
+        if repo is None:
+            with connect_repository(self.db_path) as repo:
+                return self.run_once(repo)
+
+        match_ids = repo.claim_timeline_jobs(self.batch_size)
+        for index, match_id in enumerate(match_ids):
+            if self._stop.is_set():
+                # Lo no procesado de este lote vuelve a la cola para la próxima ejecución.
+                repo.release_timeline_jobs(match_ids[index:])
+                return index
+            try:
+                if index and self.request_interval:
+                    time.sleep(self.request_interval)
+                try:
+                    timeline = self._fetch_timeline(match_id)
+                except Exception as exc:  # Errores de red: se reintenta más tarde
+                    timeline = f"{type(exc).__name__}: {exc}"
+
+                if isinstance(timeline, dict) and "info" in timeline:
+                    repo.store_match_timeline(match_id, timeline)
+                else:
+                    self.last_error = str(timeline)
+                    repo.finish_timeline_job(match_id, error=str(timeline), max_attempts=self.max_attempts)
+            except BaseException:
+                # Si falla la escritura (base bloqueada, disco lleno...) el trabajo
+                # actual y los siguientes no pueden quedar 'in_progress' hasta que
+                # venza el lease: vuelven a la cola antes de propagar el error.
+                repo.release_timeline_jobs(match_ids[index:])
+                raise
+        return len(match_ids)
+
+    def _run(self) -> None:
+        with connect_repository(self.db_path) as repo:
+            while not self._stop.is_set():
+                try:
+                    processed = self.run_once(repo)
+                except Exception as exc:  # El hilo no debe morir por un error puntual
+                    self.last_error = f"{type(exc).__name__}: {exc}"
+                    processed = 0
+                if not processed:
+                    self._wake.wait(self.poll_interval)
+                    self._wake.clear()
+
+    def status(self) -> PrefetchStatus:
+        """Devuelve el estado actual de la cola y del hilo."""
+
+        with connect_repository(self.db_path) as repo:
+            counts: Dict[str, int] = repo.get_timeline_queue_status()
+        return PrefetchStatus(
+            running=self.running,
+            pending=counts["pending"] + counts["in_progress"],
+            done=counts["done"],
+            failed=counts["failed"],
+            last_error=self.last_error,
+        )
+
+
+_PREFETCHERS: Dict[Path, TimelinePrefetcher] = {}
+_PREFETCHERS_LOCK = threading.Lock()
+
+
+def ensure_prefetcher(db_path: Path | str = DEFAULT_DB_PATH, **kwargs: Any) -> TimelinePrefetcher:
+    """Devuelve el prefetcher compartido de una base, arrancándolo si hace falta.
+
+    Streamlit vuelve a ejecutar el script en cada interacción; esta función
+    garantiza un único hilo por base de datos y proceso.
+    """
+
+    key = Path(db_path).resolve()
+    with _PREFETCHERS_LOCK:
+        prefetcher = _PREFETCHERS.get(key)
+        if prefetcher is None:
+            prefetcher = TimelinePrefetcher(db_path, **kwargs)
+            _PREFETCHERS[key] = prefetcher
+    prefetcher.start()
+    return prefetcher
+
+
+__all__ = [
+    "PrefetchStatus",
+    "TimelinePrefetcher",
+    "ensure_prefetcher",
+]
@@ -16,8 +16,9 @@ def grafico_winrate_por_parche(df: pd.DataFrame, top_n: int = 10):
         plotly.graph_objects.Figure
     """
     # Seleccionar top_n por games_played total
-    totals = df.groupby('champion')['games_played'].sum().nlargest(top_n).index
-    subset = df[df['champion'].isin(totals)]
+    totals = df.groupby('champion', observed=True)['games_played'].sum().nlargest(top_n).index
+    # Con `patch` categórica ordenada (ver `clean_match_dataframe`) '13.10' va después de '13.9'
+    subset = df[df['champion'].isin(totals)].sort_values('patch')
     fig = px.line(subset, x='patch', y='win_rate', color='champion', markers=True,
                   title=f'Winrate por parche (Top {top_n} por partidas)')
     fig.update_layout(template='simple_white')
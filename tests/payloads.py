@@ -0,0 +1,118 @@
+"""Generadores de partidas y timelines sintéticos con la forma de Match-V5.
+
+Los usan los tests y también los benchmarks (`benchmarks/`), que los importan
+desde aquí para medir con los mismos datos que se validan.
+"""
+
+from __future__ import annotations
+
+import random
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+POSITIONS = ["TOP", "JUNGLE", "MIDDLE", "BOTTOM", "UTILITY"]
+CHAMPION_IDS = list(range(1, 170))
+
+
+def build_match(match_id: str, *, seed: int = 0, patch: str = "14.2") -> Dict[str, Any]:
+    """Genera una partida con 10 participantes y los campos más habituales de Match-V5."""
+
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    year_start = datetime(now.year, 1, 1, tzinfo=timezone.utc).timestamp() * 1000
+    # Partidas del año en curso, que son las que guarda `MatchRepository.store_matches`.
+    start = int(max(year_start, now.timestamp() * 1000 - rng.randint(0, 30) * 86_400_000))
+    duration = rng.randint(900, 2700)
+    participants: List[Dict[str, Any]] = []
+    for index in range(10):
+        team_id = 100 if index < 5 else 200
+        participant = {
+            "puuid": f"puuid-{rng.randint(0, 50_000):06d}-{'x' * 60}",
+            "participantId": index + 1,
+            "championId": rng.choice(CHAMPION_IDS),
+            "championName": f"Champion{rng.randint(0, 170)}",
+            "teamId": team_id,
+            "teamPosition": POSITIONS[index % 5],
+            "individualPosition": POSITIONS[index % 5],
+            "win": (team_id == 100) == (seed % 2 == 0),
+            "kills": rng.randint(0, 20),
+            "deaths": rng.randint(0, 15),
+            "assists": rng.randint(0, 25),
+            "goldEarned": rng.randint(5_000, 20_000),
+            "totalDamageDealtToChampions": rng.randint(3_000, 60_000),
+            "visionScore": rng.randint(5, 90),
+            "totalMinionsKilled": rng.randint(0, 300),
+            "riotIdGameName": f"Player{rng.randint(0, 99_999)}",
+            "riotIdTagline": "LAN",
+            "summoner1Id": 4,
+            "summoner2Id": rng.choice([7, 12, 14]),
+            "challenges": {f"challenge{n}": rng.random() * 100 for n in range(40)},
+            "perks": {
+                "statPerks": {"defense": 5002, "flex": 5008, "offense": 5005},
+                "styles": [{"style": 8000, "selections": [{"perk": 8010 + n, "var1": rng.randint(0, 500)} for n in range(4)]}],
+            },
+        }
+        participant.update({f"item{n}": rng.randint(1000, 7000) for n in range(7)})
+        participant.update({f"stat{n}": rng.randint(0, 10_000) for n in range(60)})
+        participants.append(participant)
+
+    return {
+        "metadata": {"matchId": match_id, "dataVersion": "2", "participants": [p["puuid"] for p in participants]},
+        "info": {
+            "gameId": rng.randint(1, 10**10),
+            "gameStartTimestamp": start,
+            "gameCreation": start,
+            "gameDuration": duration,
+            "gameVersion": f"{patch}.567.1234",
+            "platformId": "LA1",
+            "queueId": 420,
+            "participants": participants,
+            "teams": [
+                {
+                    "teamId": team_id,
+                    "win": participants[0 if team_id == 100 else 5]["win"],
+                    "bans": [{"championId": rng.choice(CHAMPION_IDS), "pickTurn": turn} for turn in range(1, 6)],
+                    "objectives": {name: {"first": rng.random() < 0.5, "kills": rng.randint(0, 5)} for name in ("baron", "dragon", "tower", "inhibitor", "riftHerald", "champion")},
+                }
+                for team_id in (100, 200)
+            ],
+        },
+    }
+
+
+def build_timeline(match_id: str, *, seed: int = 0, minutes: int = 30) -> Dict[str, Any]:
+    """Genera una línea de tiempo con un frame por minuto y eventos sintéticos."""
+
+    rng = random.Random(seed)
+    frames = []
+    for minute in range(minutes + 1):
+        participant_frames = {
+            str(pid): {
+                "participantId": pid,
+                "totalGold": 500 + minute * rng.randint(250, 450),
+                "currentGold": rng.randint(0, 1500),
+                "xp": minute * rng.randint(300, 500),
+                "level": min(18, 1 + minute // 2),
+                "minionsKilled": minute * rng.randint(4, 9),
+                "jungleMinionsKilled": rng.randint(0, 100),
+                "position": {"x": rng.randint(0, 15_000), "y": rng.randint(0, 15_000)},
+                "damageStats": {
+                    "totalDamageDoneToChampions": minute * rng.randint(100, 1500),
+                    "magicDamageDone": rng.randint(0, 50_000),
+                    "physicalDamageDone": rng.randint(0, 50_000),
+                    "trueDamageDone": rng.randint(0, 5_000),
+                    "totalDamageTaken": rng.randint(0, 40_000),
+                },
+                "championStats": {f"stat{n}": rng.randint(0, 500) for n in range(20)},
+            }
+            for pid in range(1, 11)
+        }
+        events = [
+            {"type": rng.choice(["ITEM_PURCHASED", "SKILL_LEVEL_UP", "WARD_PLACED", "CHAMPION_KILL"]),
+             "timestamp": minute * 60_000 + rng.randint(0, 59_999),
+             "participantId": rng.randint(1, 10),
+             "itemId": rng.randint(1000, 7000)}
+            for _ in range(rng.randint(10, 40))
+        ]
+        frames.append({"timestamp": minute * 60_000, "participantFrames": participant_frames, "events": events})
+    return {"metadata": {"matchId": match_id}, "info": {"frameInterval": 60_000, "frames": frames}}
@@ -1,5 +1,12 @@
+import numpy as np
 import pandas as pd
-from src.analysis import calcular_winrate
+from src.analysis import (
+    WinrateAccumulator,
+    calcular_metricas_meta,
+    calcular_winrate,
+    summarize_player_matches,
+    wilson_interval,
+)
 
 
 def test_calcular_winrate_basic():
@@ -12,3 +19,113 @@ def test_calcular_winrate_basic():
     aatrox = wr[(wr['champion']=='Aatrox') & (wr['patch']=='13.1')]
     assert float(aatrox['win_rate']) == 0.5
 
+
+
+def test_calcular_metricas_meta_pick_ban_and_presence():
+    participants = pd.DataFrame({
+        'match_id': ['M1', 'M1', 'M2', 'M2', 'M3', 'M3'],
+        'champion': ['Aatrox', 'Ahri', 'Aatrox', 'Zed', 'Ahri', 'Zed'],
+        'patch': ['13.1', '13.1', '13.1', '13.1', '13.2', '13.2'],
+        'result': [1, 0, 0, 1, 1, 0],
+    })
+    bans = pd.DataFrame({
+        'match_id': ['M1', 'M2', 'M3'],
+        'champion': ['Zed', 'Yasuo', 'Aatrox'],
+        'patch': ['13.1', '13.1', '13.2'],
+    })
+
+    meta = calcular_metricas_meta(participants, bans, group_cols=('patch',))
+    meta = meta.astype({'champion': str, 'patch': str}).set_index(['champion', 'patch'])
+
+    aatrox = meta.loc[('Aatrox', '13.1')]
+    assert aatrox['games'] == 2 and aatrox['wins'] == 1
+    assert aatrox['win_rate'] == 0.5
+    assert aatrox['pick_rate'] == 1.0
+    assert aatrox['win_rate_low'] < 0.5 < aatrox['win_rate_high']
+
+    zed = meta.loc[('Zed', '13.1')]
+    assert zed['bans'] == 1 and zed['ban_rate'] == 0.5
+    assert zed['presence'] == 1.0
+
+    # Campeones sólo baneados aparecen con 0 partidas.
+    yasuo = meta.loc[('Yasuo', '13.1')]
+    assert yasuo['games'] == 0 and yasuo['pick_rate'] == 0.0
+    assert yasuo['ban_rate'] == 0.5
+    assert meta.loc[('Aatrox', '13.2'), 'ban_rate'] == 1.0
+
+
+def test_calcular_metricas_meta_by_role_uses_patch_level_bans():
+    participants = pd.DataFrame({
+        'match_id': ['M1', 'M1', 'M2', 'M2'],
+        'champion': ['Aatrox', 'Ahri', 'Aatrox', 'Ahri'],
+        'patch': ['13.1'] * 4,
+        'role': ['TOP', 'MIDDLE', 'MIDDLE', 'TOP'],
+        'result': [1, 0, 1, 0],
+    })
+    bans = pd.DataFrame({'match_id': ['M1'], 'champion': ['Ahri'], 'patch': ['13.1']})
+
+    meta = calcular_metricas_meta(participants, bans, group_cols=('patch', 'role'))
+    ahri = meta[meta['champion'] == 'Ahri'].set_index('role')
+
+    assert len(meta) == 4
+    assert list(ahri['ban_rate']) == [0.5, 0.5]
+    assert ahri.loc['TOP', 'pick_rate'] == 0.5
+    assert ahri.loc['TOP', 'total_matches'] == 2
+
+
+def test_wilson_interval_handles_small_samples():
+    low, high = wilson_interval(np.array([0, 10]), np.array([0, 10]))
+    assert np.isnan(low[0]) and np.isnan(high[0])
+    assert 0.6 < low[1] < 1.0 and high[1] == 1.0
+
+
+def test_summarize_player_matches_from_stored_payloads():
+    def match(champion_id, win, position, ban, **extra):
+        return {
+            'info': {
+                'gameDuration': 1800,
+                'participants': [
+                    {'puuid': 'me', 'championId': champion_id, 'teamId': 100, 'win': win,
+                     'teamPosition': position, 'kills': 4, 'deaths': 2, 'assists': 6, 'goldEarned': 9000, **extra},
+                    {'puuid': 'other', 'championId': 1, 'teamId': 200, 'win': not win},
+                ],
+                'teams': [{'teamId': 100, 'bans': [{'championId': ban}]}, {'teamId': 200, 'bans': []}],
+            }
+        }
+
+    overall, by_role, by_champion = summarize_player_matches(
+        'me',
+        [
+            match(266, True, 'TOP', 103),
+            match(266, False, 'TOP', -1),
+            match(103, True, 'MIDDLE', 62),
+            # `null` explícitos de la API: se usa el oro por minuto de la partida.
+            match(103, False, 'JUNGLE', -1, challenges=None),
+            match(103, False, 'JUNGLE', -1, challenges={'goldPerMinute': None}, kills=None),
+            'error',
+        ],
+        {266: 'Aatrox', 103: 'Ahri'},
+    )
+
+    assert overall['total_games'] == 5 and overall['wins'] == 2
+    assert overall['bans'] == ['Ahri', 'ID:62']
+    assert overall['total_game_duration'] == 150
+    assert by_role['TOP']['games'] == 2 and by_role['TOP']['total_gold_15min'] == 9000
+    assert by_role['JUNGLE']['total_gold_15min'] == 9000 and by_role['JUNGLE']['total_kills'] == 4
+    assert by_champion['Aatrox']['picks'] == 2 and by_champion['Aatrox']['wins'] == 1
+
+
+def test_winrate_accumulator_matches_calcular_winrate():
+    df = pd.DataFrame({
+        'champion': ['Aatrox', 'Aatrox', 'Ahri', 'Ahri', 'Zed', 'Aatrox'],
+        'patch': ['13.1', '13.1', '13.1', '13.2', '13.2', '13.2'],
+        'result': [1, 0, 1, 1, 0, 1],
+    })
+    acc = WinrateAccumulator()
+    for start in range(0, len(df), 4):
+        acc.update(df.iloc[start:start + 4].astype({'champion': 'category', 'patch': 'category'}))
+
+    result = acc.result().astype({'champion': str, 'patch': str}).sort_values(['champion', 'patch'])
+    expected = calcular_winrate(df).sort_values(['champion', 'patch'])
+    assert result['games_played'].tolist() == expected['games_played'].tolist()
+    assert result['win_rate'].tolist() == expected['win_rate'].tolist()
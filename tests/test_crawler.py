@@ -0,0 +1,129 @@
+import threading
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from src import crawler, data_collection
+from src.database import connect_repository
+
+
+# Cada jugador tiene dos partidas; en cada una juega con los dos jugadores siguientes.
+GRAPH_SIZE = 12
+
+
+def _match(match_id: str, owner: int) -> dict:
+    timestamp = datetime.now(timezone.utc).timestamp() * 1000
+    players = [f"p{(owner + offset) % GRAPH_SIZE}" for offset in range(3)] + ["BOT"]
+    return {
+        "metadata": {"matchId": match_id},
+        "info": {
+            "gameStartTimestamp": timestamp,
+            "gameVersion": "14.2.555.1",
+            "participants": [
+                {"puuid": puuid, "championId": index + 1, "teamId": 100, "win": True}
+                for index, puuid in enumerate(players)
+            ],
+        },
+    }
+
+
+class _FakeApi:
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.listed = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._lock = threading.Lock()
+
+    def get_match_ids(self, puuid, count=20, start=0, **filters):
+        assert filters["queue"] == crawler.RANKED_SOLO_QUEUE
+        with self._lock:
+            self.listed.append(puuid)
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        time.sleep(0.01)
+        with self._lock:
+            self.in_flight -= 1
+            if puuid in self.failing:
+                self.failing.discard(puuid)
+                return "503"
+        return [f"{puuid}_m{i}" for i in range(2)][start:start + count]
+
+    def get_match_details_many(self, match_ids, max_concurrency=8):
+        for match_id in match_ids:
+            owner = int(match_id.split("_")[0][1:])
+            yield match_id, _match(match_id, owner)
+
+
+@pytest.fixture
+def fake_api(monkeypatch):
+    api = _FakeApi(failing={"p1"})
+    for name in ("get_match_ids", "get_match_details_many"):
+        monkeypatch.setattr(data_collection, name, getattr(api, name))
+    return api
+
+
+def test_crawl_expands_breadth_first_and_retries_failures(tmp_path, fake_api):
+    repo = connect_repository(tmp_path / "lol_matches.db")
+
+    summary = crawler.crawl(repo, ["p0"], max_depth=2, batch_size=2, log=lambda _: None)
+
+    # p0 descubre p1 y p2 (profundidad 1); éstos, p3 y p4 (profundidad 2).
+    assert fake_api.listed[0] == "p0" and set(fake_api.listed[1:3]) == {"p1", "p2"}
+    assert set(fake_api.listed) == {"p0", "p1", "p2", "p3", "p4"}
+    assert summary.failed_players == ["p1"]
+    # p5 y p6 quedan en la frontera (profundidad 3) para una ejecución con más profundidad.
+    assert repo.get_crawl_status() == {"pending": 2, "in_progress": 0, "done": 5, "failed": 0}
+    assert repo.get_timeline_queue_status()["pending"] == 0
+    # El jugador 'BOT' nunca entra en la frontera.
+    assert summary.discovered == 6
+    assert summary.stored == 10
+    assert summary.patch_sizes == {"14.2": 10}
+
+
+def test_crawl_stops_at_limits_and_resumes(tmp_path, fake_api):
+    repo = connect_repository(tmp_path / "lol_matches.db")
+    fake_api.failing.clear()
+
+    summary = crawler.crawl(repo, ["p0"], max_players=2, max_depth=None, log=lambda _: None)
+    assert summary.players == 2
+
+    summary = crawler.crawl(repo, [], max_depth=None, patch_target=8, batch_size=1, log=lambda _: None)
+    assert crawler.latest_patch_size(summary.patch_sizes) == ("14.2", 8)
+    assert summary.players == 2
+
+
+def test_crawl_lists_player_histories_in_parallel(tmp_path, fake_api):
+    repo = connect_repository(tmp_path / "lol_matches.db")
+    fake_api.failing.clear()
+    repo.add_crawl_seeds([f"p{index}" for index in range(6)])
+
+    summary = crawler.crawl(repo, [], max_depth=0, batch_size=6, concurrency=4, log=lambda _: None)
+
+    assert summary.players == 6 and summary.listed == 12
+    assert 1 < fake_api.peak_in_flight <= 4
+
+
+def test_latest_patch_size_orders_patches_numerically():
+    assert crawler.latest_patch_size({"14.9": 3, "14.10": 1}) == ("14.10", 1)
+    assert crawler.latest_patch_size({}) == (None, 0)
+
+
+def test_crawl_leaves_players_claimed_by_another_crawler(tmp_path, fake_api, monkeypatch):
+    repo = connect_repository(tmp_path / "lol_matches.db")
+    fake_api.failing.clear()
+    repo.add_crawl_seeds(["p0", "p5"])
+    # Otro crawler activo acaba de reclamar p0.
+    assert repo.claim_crawl_players(1) == [("p0", 0)]
+
+    def interrupted(*args, **kwargs):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(crawler, "crawl_batch", interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        crawler.crawl(repo, [], max_depth=0, log=lambda _: None)
+
+    # p0 sigue siendo del otro crawler; p5, reclamado por la ejecución interrumpida, vuelve a la frontera.
+    assert repo.get_crawl_status()["in_progress"] == 1
+    assert repo.claim_crawl_players(10) == [("p5", 0)]
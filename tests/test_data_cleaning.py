@@ -1,5 +1,5 @@
 import pandas as pd
-from src.data_cleaning import clean_match_dataframe
+from src.data_cleaning import TIER_ORDER, clean_match_dataframe, iter_match_csv, memory_report
 
 
 def test_clean_match_dataframe_minimal():
@@ -14,3 +14,47 @@ def test_clean_match_dataframe_minimal():
     # Aseguramos que no queden filas sin champion o patch
     assert cleaned['champion'].notna().all()
     assert cleaned['patch'].notna().all()
+
+
+def test_iter_match_csv_reads_typed_chunks(tmp_path):
+    csv_path = tmp_path / 'matches.csv'
+    csv_path.write_text(
+        'champion,patch,player_tier,result\n'
+        'Aatrox,13.10,GOLD,1\n'
+        'Ahri,13.1,SILVER,0\n'
+        ',13.1,GOLD,1\n'
+        'Zed,14.2,GOLD,0\n'
+        'Zed,,GOLD,1\n'
+    )
+
+    chunks = list(iter_match_csv(csv_path, chunksize=2))
+
+    assert len(chunks) == 3
+    assert all(isinstance(chunk['champion'].dtype, pd.CategoricalDtype) for chunk in chunks)
+    assert chunks[0]['result'].dtype == 'int8'
+    assert list(chunks[0]['patch']) == ['13.10', '13.1']
+    assert sum(len(chunk) for chunk in chunks) == 3
+
+
+def test_clean_match_dataframe_compact_dtypes():
+    df = pd.DataFrame({
+        'champion': ['Aatrox', 'Ahri', 'Zed', None] * 50,
+        'patch': ['13.10', '13.2', '14.1', '13.2'] * 50,
+        'player_tier': ['GOLD', 'LCK', 'IRON', 'GOLD'] * 50,
+        'result': [1, 0, 1, 0] * 50,
+    })
+
+    cleaned = clean_match_dataframe(df, champion_vocabulary=['Ahri', 'Aatrox', 'Zed', 'Yasuo'])
+
+    assert len(df.columns) == 4 and len(cleaned) == 150
+    assert list(cleaned['champion'].cat.categories) == ['Ahri', 'Aatrox', 'Zed', 'Yasuo']
+    assert list(cleaned['patch'].cat.categories) == ['13.2', '13.10', '14.1']
+    assert cleaned['patch'].max() == '14.1'
+    assert cleaned['patch_major'].tolist()[:3] == [13, 13, 14]
+    assert cleaned['patch_minor'].tolist()[:3] == [10, 2, 1]
+    assert list(cleaned['player_tier'].cat.categories) == [*TIER_ORDER, 'LCK']
+    assert cleaned['result'].dtype == 'int8'
+
+    report = memory_report(df, cleaned)
+    assert report['bytes_saved'] > 0
+    assert report['bytes_before'] - report['bytes_after'] == report['bytes_saved']
@@ -0,0 +1,144 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src import data_collection
+from src.response_cache import ResponseCache
+from src.riot_client import RiotClient
+
+
+RESPONSE_DELAY_SECONDS = 0.2
+
+
+class _MatchStubHandler(BaseHTTPRequestHandler):
+    """Simula el endpoint Match-V5 devolviendo una partida mínima por ID."""
+
+    requests = []
+    in_flight = 0
+    peak_in_flight = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.requests.append(self.path)
+            cls.in_flight += 1
+            cls.peak_in_flight = max(cls.peak_in_flight, cls.in_flight)
+        try:
+            time.sleep(RESPONSE_DELAY_SECONDS)
+            self._respond()
+        finally:
+            with cls.lock:
+                cls.in_flight -= 1
+
+    def _respond(self):
+        match_id = self.path.rstrip("/").split("/")[-1]
+        if match_id.startswith("missing"):
+            self.send_response(404)
+            self.end_headers()
+            self.wfile.write(b'{"status": {"status_code": 404}}')
+            return
+
+        body = json.dumps({"metadata": {"matchId": match_id}, "info": {"participants": []}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _MatchStubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    monkeypatch.setattr(data_collection, "REGIONAL_BASE_URL", base_url)
+    monkeypatch.setattr(data_collection, "_client", RiotClient())
+    # Los tests no deben leer ni escribir la caché de respuestas del proyecto.
+    monkeypatch.setattr(data_collection, "_response_cache", None)
+    monkeypatch.setattr(data_collection, "_response_cache_enabled", False)
+    _MatchStubHandler.requests = []
+    _MatchStubHandler.in_flight = _MatchStubHandler.peak_in_flight = 0
+    yield base_url
+    server.shutdown()
+    server.server_close()
+
+
+def test_get_match_details_many_fetches_concurrently(stub_server):
+    match_ids = [f"LA1_{i}" for i in range(8)]
+
+    results = dict(data_collection.get_match_details_many(match_ids, max_concurrency=8))
+
+    assert sorted(results) == sorted(match_ids)
+    assert all(results[m_id]["metadata"]["matchId"] == m_id for m_id in match_ids)
+    # El servidor atiende varias peticiones a la vez (en serie el pico sería 1).
+    assert _MatchStubHandler.peak_in_flight > 1
+
+
+def test_get_match_details_many_reports_errors_per_match(stub_server):
+    results = dict(data_collection.get_match_details_many(["LA1_1", "missing_1"], max_concurrency=2))
+
+    assert isinstance(results["LA1_1"], dict)
+    assert isinstance(results["missing_1"], str)
+
+
+def test_match_details_are_served_from_response_cache(stub_server, tmp_path):
+    data_collection.set_response_cache(ResponseCache(tmp_path / "responses.db"))
+
+    first = data_collection.get_match_details("LA1_1")
+    second = data_collection.get_match_details("LA1_1")
+    missing = [data_collection.get_match_details("missing_1") for _ in range(2)]
+
+    assert first == second
+    assert all(isinstance(result, str) for result in missing)
+    # Los errores no se guardan: la partida inexistente se pide las dos veces.
+    assert len(_MatchStubHandler.requests) == 3
+    stats = data_collection.get_response_cache().stats()
+    assert (stats.hits, stats.misses, stats.entries) == (1, 3, 1)
+
+
+def test_iter_match_ids_pages_with_filters_and_stops_at_known(monkeypatch):
+    history = [f"LA1_{i}" for i in range(250, 0, -1)]
+    calls = []
+
+    def fake_get_match_ids(puuid, count=20, start=0, **filters):
+        calls.append((start, count, filters))
+        return history[start:start + count]
+
+    monkeypatch.setattr(data_collection, "get_match_ids", fake_get_match_ids)
+
+    all_ids = list(data_collection.iter_match_ids("p", start_time=10, queue=420))
+    assert all_ids == history
+    assert [call[:2] for call in calls] == [(0, 100), (100, 100), (200, 100)]
+    assert calls[0][2] == {"start_time": 10, "end_time": None, "queue": 420, "match_type": None}
+
+    calls.clear()
+    stored = set(history[30:])
+    new_ids = list(data_collection.iter_match_ids("p", is_known=stored.intersection))
+    assert new_ids == history[:30]
+    assert len(calls) == 2  # Se detiene tras una página completa de partidas conocidas
+
+    # Una descarga fallida deja un hueco entre partidas guardadas que se recupera.
+    calls.clear()
+    stored = set(history[130:]) - {history[180]}
+    new_ids = list(data_collection.iter_match_ids("p", is_known=stored.intersection))
+    assert new_ids == history[:130] + [history[180]]
+    assert len(calls) == 3
+
+    calls.clear()
+    assert list(data_collection.iter_match_ids("p", max_ids=5)) == history[:5]
+    assert calls[0][:2] == (0, 5)
+
+
+def test_iter_match_ids_raises_on_api_error(monkeypatch):
+    monkeypatch.setattr(data_collection, "get_match_ids", lambda *args, **kwargs: "429 Too Many Requests")
+
+    with pytest.raises(data_collection.RiotAPIError):
+        list(data_collection.iter_match_ids("p"))
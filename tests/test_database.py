@@ -1,6 +1,11 @@
+import json
+import sqlite3
+import threading
 from datetime import datetime, timezone
 
-from src.database import MatchRepository, connect_repository
+import src.database as database_module
+from src.database import MatchRepository, _initialize_database, connect_repository, get_connection_manager
+from tests.payloads import build_timeline
 
 
 def _create_repository(tmp_path) -> MatchRepository:
@@ -61,3 +66,357 @@ def test_store_matches_accepts_strings_with_default_year(tmp_path):
     assert repo.get_stored_match_ids("puuid-2", year=current_year) == [
         "match-as-string"
     ]
+
+
+def _build_full_match(match_id: str, participants: list, *, version: str = "14.2.567.1234") -> dict:
+    timestamp = datetime.now(timezone.utc).timestamp() * 1000
+    return {
+        "metadata": {"matchId": match_id},
+        "info": {
+            "gameStartTimestamp": timestamp,
+            "gameDuration": 1800,
+            "gameVersion": version,
+            "participants": participants,
+        },
+    }
+
+
+def _participant(puuid: str, champion_id: int, *, win: bool, position: str = "TOP") -> dict:
+    return {
+        "puuid": puuid,
+        "championId": champion_id,
+        "teamId": 100 if win else 200,
+        "teamPosition": position,
+        "win": win,
+        "kills": 5,
+        "deaths": 2,
+        "assists": 7,
+        "goldEarned": 12000,
+        "totalDamageDealtToChampions": 20000,
+        "visionScore": 30,
+    }
+
+
+def test_store_matches_populates_participants(tmp_path):
+    repo = _create_repository(tmp_path)
+    repo.register_player("puuid-1", "Player", "LAS")
+
+    repo.store_matches("puuid-1", [
+        _build_full_match("m1", [_participant("puuid-1", 266, win=True), _participant("other", 62, win=False)]),
+        _build_full_match("m2", [_participant("puuid-1", 266, win=False), _participant("other", 62, win=True)]),
+        _build_full_match("m3", [_participant("puuid-1", 103, win=True, position="MIDDLE")]),
+    ])
+
+    champion_stats = {stats.key: stats for stats in repo.get_player_champion_stats("puuid-1")}
+    assert champion_stats[266].games == 2
+    assert champion_stats[266].win_rate == 0.5
+    assert champion_stats[266].kills == 10
+    assert champion_stats[103].duration == 1800
+
+    role_stats = {stats.key: stats.games for stats in repo.get_player_role_stats("puuid-1")}
+    assert role_stats == {"TOP": 2, "MIDDLE": 1}
+
+    patch_stats = repo.get_champion_patch_stats(62)
+    assert [(stats.key, stats.games, stats.wins) for stats in patch_stats] == [("14.2", 2, 1)]
+
+
+def test_backfill_participants_for_existing_rows(tmp_path):
+    repo = _create_repository(tmp_path)
+    repo.register_player("puuid-1", "Player", "LAS")
+    repo.store_matches("puuid-1", [_build_full_match("m1", [_participant("puuid-1", 266, win=True)])])
+
+    # Simula una base creada antes de existir la tabla participants.
+    conn = repo._get_connection()
+    conn.execute("DELETE FROM participants;")
+    conn.commit()
+    assert repo.get_player_champion_stats("puuid-1") == []
+
+    assert repo.backfill_participants() == 1
+    assert repo.backfill_participants() == 0
+    assert repo.get_player_champion_stats("puuid-1")[0].key == 266
+
+
+def test_rollups_stay_consistent_and_can_be_rebuilt(tmp_path):
+    repo = _create_repository(tmp_path)
+    repo.register_player("puuid-1", "Player", "LAS")
+    repo.store_matches("puuid-1", [
+        _build_full_match("m1", [_participant("puuid-1", 266, win=True, position="")]),
+        _build_full_match("m2", [_participant("puuid-1", 266, win=False), _participant("other", 266, win=True)]),
+    ])
+    repo.store_matches("puuid-1", [
+        _build_full_match("m2", [_participant("puuid-1", 266, win=False)]),
+        _build_full_match("m3", [_participant("puuid-1", 62, win=True)], version="14.3.1.1"),
+    ])
+
+    assert set(repo.check_rollups().values()) == {0}
+    role_stats = {stats.key: stats.games for stats in repo.get_player_role_stats("puuid-1")}
+    assert role_stats == {"TOP": 2, None: 1}
+    assert [(s.key, s.games, s.wins) for s in repo.get_champion_patch_stats(266)] == [("14.2", 3, 2)]
+
+    conn = repo._get_connection()
+    conn.execute("DELETE FROM participants WHERE match_id = 'm3';")
+    conn.commit()
+    assert set(repo.check_rollups().values()) == {0}
+    assert repo.get_champion_patch_stats(62) == []
+
+    conn.execute("UPDATE player_champion_stats SET wins = wins + 1;")
+    conn.commit()
+    assert repo.check_rollups()["player_champion_stats"] > 0
+
+    repo.rebuild_rollups()
+    assert set(repo.check_rollups().values()) == {0}
+    assert repo.get_player_champion_stats("puuid-1")[0].wins == 1
+
+
+def test_rollups_are_built_for_existing_databases(tmp_path):
+    repo = _create_repository(tmp_path)
+    repo.register_player("puuid-1", "Player", "LAS")
+    repo.store_matches("puuid-1", [_build_full_match("m1", [_participant("puuid-1", 266, win=True)])])
+    conn = repo._get_connection()
+    conn.executescript(
+        "DROP TABLE player_champion_stats; DROP TABLE player_role_stats; DROP TABLE champion_patch_stats;"
+    )
+    repo.close()
+
+    _initialize_database(tmp_path / "lol_matches.db").close()
+    reopened = MatchRepository(_initialize_database(tmp_path / "lol_matches.db"))
+    assert reopened.get_player_champion_stats("puuid-1")[0].games == 1
+    assert set(reopened.check_rollups().values()) == {0}
+
+
+def test_single_connection_repository_rejects_other_threads(tmp_path):
+    repo = MatchRepository(_initialize_database(tmp_path / "lol_matches.db"))
+    repo.register_player("puuid-1", "Player", "LAS")
+    errors = []
+
+    def use_from_thread():
+        for operation in (lambda: repo.get_match_count("puuid-1"), lambda: repo.register_player("puuid-2")):
+            try:
+                operation()
+            except RuntimeError as exc:
+                errors.append(str(exc))
+
+    thread = threading.Thread(target=use_from_thread)
+    thread.start()
+    thread.join(timeout=5)
+
+    assert len(errors) == 2
+    assert repo.get_match_count("puuid-1") == 0
+    repo.close()
+
+
+def test_store_matches_accepts_null_participant_stats(tmp_path):
+    repo = _create_repository(tmp_path)
+    repo.register_player("puuid-1", "Player", "LAS")
+    participant = _participant("puuid-1", 266, win=True)
+    participant.update(kills=None, totalDamageDealtToChampions=None)
+
+    assert repo.store_matches("puuid-1", [_build_full_match("m1", [participant])]) == ["m1"]
+    stats = repo.get_player_champion_stats("puuid-1")
+    assert (stats[0].games, stats[0].kills, stats[0].damage, stats[0].assists) == (1, 0, 0, 7)
+    repo.close()
+
+
+def test_players_table_is_migrated_and_riot_ids_move_between_accounts(tmp_path):
+    legacy = sqlite3.connect(tmp_path / "lol_matches.db")
+    legacy.execute(
+        "CREATE TABLE players (puuid TEXT PRIMARY KEY, game_name TEXT, tag_line TEXT, last_searched TEXT);"
+    )
+    legacy.execute("INSERT INTO players VALUES ('old', 'Player', 'LAS', NULL);")
+    legacy.commit()
+    legacy.close()
+
+    repo = _create_repository(tmp_path)
+    assert repo.find_player_by_riot_id("player", "las") == ("old", None)
+
+    repo.save_account("new", "Player", "LAS")
+    assert repo.find_player_by_riot_id("PLAYER", "LAS")[0] == "new"
+    assert repo.get_player("old") == ("old", None, None)
+
+
+def test_matches_table_is_migrated_with_an_insertion_sequence(tmp_path):
+    legacy = sqlite3.connect(tmp_path / "lol_matches.db")
+    legacy.executescript(
+        """
+        CREATE TABLE players (puuid TEXT PRIMARY KEY, game_name TEXT, tag_line TEXT, last_searched TEXT);
+        CREATE TABLE matches (
+            match_id TEXT PRIMARY KEY, puuid TEXT NOT NULL, game_year INTEGER NOT NULL,
+            game_timestamp INTEGER, raw_json TEXT, created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        );
+        INSERT INTO players (puuid) VALUES ('puuid-1');
+        INSERT INTO matches (match_id, puuid, game_year) VALUES ('old-1', 'puuid-1', 2024), ('old-2', 'puuid-1', 2024);
+        """
+    )
+    legacy.commit()
+    legacy.close()
+
+    repo = _create_repository(tmp_path)
+    participants = [_participant("puuid-1", 266, win=True)]
+    repo.store_matches("puuid-1", [_build_full_match(f"m{i}", participants) for i in range(2)])
+    rows = repo._get_connection().execute("SELECT match_id, seq FROM matches ORDER BY seq;").fetchall()
+    assert rows == [("old-1", 1), ("old-2", 2), ("m0", 3), ("m1", 4)]
+    repo.close()
+
+
+def test_get_matches_by_ids_returns_stored_payloads_in_order(tmp_path):
+    repo = _create_repository(tmp_path)
+    repo.register_player("puuid-1", "Player", "LAS")
+    repo.register_player("puuid-2", "Other", "LAS")
+    repo.store_matches("puuid-1", [_build_full_match(f"m{i}", []) for i in range(3)])
+    repo.store_matches("puuid-2", [_build_full_match("x1", [])])
+
+    records = repo.get_matches_by_ids(["x1", "missing", "m2", "m0", "m2"])
+
+    assert [record.match_id for record in records] == ["x1", "m2", "m0"]
+    assert json.loads(records[1].raw_json)["metadata"]["matchId"] == "m2"
+
+
+def test_timeline_features_are_stored_and_backfilled(tmp_path):
+    repo = _create_repository(tmp_path)
+    repo.register_player("puuid-1", "Player", "LAS")
+    repo.store_matches("puuid-1", [_build_full_match("m1", []), _build_full_match("m2", [])])
+    repo.store_match_timeline("m1", build_timeline("m1", minutes=5))
+    repo.store_match_timeline("m2", build_timeline("m2", minutes=8))
+
+    features = repo.get_timeline_features("m1")
+    assert features.values.shape[:2] == (10, 6)
+    assert repo.get_timeline_features("missing") is None
+
+    # Simula líneas de tiempo guardadas antes de existir la tabla de series.
+    conn = repo._get_connection()
+    conn.execute("DELETE FROM match_timeline_features;")
+    conn.commit()
+    assert repo.backfill_timeline_features() == 2
+    assert repo.backfill_timeline_features() == 0
+
+    conn.execute("DELETE FROM match_timeline_features WHERE match_id = 'm2';")
+    conn.commit()
+    assert repo.get_timeline_features("m2").minutes == 9
+    assert conn.execute("SELECT COUNT(*) FROM match_timeline_features;").fetchone()[0] == 2
+
+
+def test_compressed_storage_is_transparent_and_migratable(tmp_path):
+    db_file = tmp_path / "lol_matches.db"
+    plain_repo = connect_repository(db_file, compression=None)
+    plain_repo.register_player("puuid-1", "Player", "LAS")
+    plain_repo.store_matches("puuid-1", [_build_full_match("m1", [_participant("puuid-1", 266, win=True)])])
+    plain_repo.store_match_timeline("m1", {"info": {"frames": [{"timestamp": 0}]}})
+    plain_repo.close()
+
+    repo = connect_repository(db_file, compression="zlib")
+    repo.train_compression_dictionary()
+    assert repo.migrate_storage() == (1, 1)
+    assert repo.migrate_storage() == (0, 0)
+
+    raw_value = repo._get_connection().execute("SELECT raw_json FROM matches").fetchone()[0]
+    assert isinstance(raw_value, bytes)
+
+    repo.store_matches("puuid-1", [_build_full_match("m2", [_participant("puuid-1", 62, win=False)])])
+    stored = {record.match_id: json.loads(record.raw_json) for record in repo.get_stored_matches("puuid-1")}
+    assert stored["m1"]["info"]["participants"][0]["championId"] == 266
+    assert stored["m2"]["info"]["participants"][0]["championId"] == 62
+    assert repo.get_match_timeline("m1") == {"info": {"frames": [{"timestamp": 0}]}}
+    repo.close()
+
+
+def test_store_matches_bulk_path_deduplicates_and_supports_fallback(tmp_path, monkeypatch):
+    repo = _create_repository(tmp_path)
+    repo.register_player("puuid-1", "Player", "LAS")
+    current_year = datetime.now(timezone.utc).year
+    batch = [_build_match(f"bulk-{i}", year=current_year) for i in range(2_000)]
+
+    inserted = repo.store_matches("puuid-1", batch + batch[:10])
+    assert inserted == [f"bulk-{i}" for i in range(2_000)]
+
+    monkeypatch.setattr(database_module, "_SUPPORTS_RETURNING", False)
+    inserted = repo.store_matches("puuid-1", [_build_match("bulk-0", year=current_year), "bulk-new"])
+    assert inserted == ["bulk-new"]
+    assert repo.get_match_count("puuid-1") == 2_001
+
+
+def test_connection_manager_is_shared_and_uses_wal(tmp_path):
+    db_file = tmp_path / "lol_matches.db"
+    manager = get_connection_manager(db_file)
+    assert get_connection_manager(db_file) is manager
+    assert manager.reader().execute("PRAGMA journal_mode;").fetchone()[0] == "wal"
+
+    writer_repo = connect_repository(db_file)
+    writer_repo.register_player("puuid-1", "Player", "LAS")
+    current_year = datetime.now(timezone.utc).year
+
+    counts = []
+
+    def read_in_thread():
+        with connect_repository(db_file) as reader_repo:
+            counts.append(reader_repo.get_match_count("puuid-1"))
+
+    with writer_repo._write() as conn:
+        conn.execute(
+            "INSERT INTO matches (match_id, puuid, game_year) VALUES ('pending', 'puuid-1', ?);",
+            (current_year,),
+        )
+        # Un lector en otro hilo no queda bloqueado por la escritura en curso.
+        thread = threading.Thread(target=read_in_thread)
+        thread.start()
+        thread.join(timeout=5)
+
+    assert counts == [0]
+    assert writer_repo.get_match_count("puuid-1") == 1
+
+    # Los lectores de hilos terminados se cierran al abrir uno nuevo.
+    for _ in range(20):
+        thread = threading.Thread(target=read_in_thread)
+        thread.start()
+        thread.join(timeout=5)
+    assert counts == [0] + [1] * 20
+    assert manager.reader_count <= 2
+
+    # Cerrar un repositorio no cierra el gestor compartido.
+    writer_repo.close()
+    assert not manager.closed
+    manager.close()
+    assert manager.reader_count == 0
+
+
+def test_keyset_pagination_matches_offset_order(tmp_path):
+    repo = _create_repository(tmp_path)
+    repo.register_player("puuid-1", "Player", "LAS")
+    current_year = datetime.now(timezone.utc).year
+
+    matches = []
+    for i in range(17):
+        match = _build_match(f"m{i:02d}", year=current_year)
+        # Varias partidas comparten timestamp para probar el desempate por match_id.
+        match["info"]["gameStartTimestamp"] += (i // 3) * 60_000
+        matches.append(match)
+    repo.store_matches("puuid-1", matches)
+    repo.store_matches("puuid-1", ["no-ts-a", "no-ts-b"], default_year=current_year)
+
+    expected = [record.match_id for record in repo.get_stored_matches("puuid-1")]
+    assert expected[-2:] == ["no-ts-b", "no-ts-a"]
+
+    pages = []
+    page = repo.get_stored_matches_page("puuid-1", page_size=5)
+    assert page.prev_cursor is None
+    while True:
+        pages.append([record.match_id for record in page.records])
+        if page.next_cursor is None:
+            break
+        page = repo.get_stored_matches_page("puuid-1", cursor=page.next_cursor, page_size=5)
+    assert [m_id for chunk in pages for m_id in chunk] == expected
+    assert [len(chunk) for chunk in pages] == [5, 5, 5, 4]
+
+    # Volver hacia atrás reproduce las mismas páginas.
+    back_pages = []
+    while page.prev_cursor is not None:
+        page = repo.get_stored_matches_page("puuid-1", cursor=page.prev_cursor, page_size=5)
+        back_pages.append([record.match_id for record in page.records])
+    assert back_pages == list(reversed(pages[:-1]))
+    assert page.prev_cursor is None
+
+    plan = repo._get_connection().execute(
+        "EXPLAIN QUERY PLAN SELECT match_id FROM matches WHERE puuid = ? AND game_timestamp IS NOT NULL "
+        "AND (game_timestamp, match_id) < (?, ?) ORDER BY game_timestamp DESC, match_id DESC LIMIT 5;",
+        ("puuid-1", 0, ""),
+    ).fetchall()
+    assert any("idx_matches_puuid_timestamp_id" in row[-1] for row in plan)
@@ -0,0 +1,81 @@
+from src.ddragon_cache import DataDragonCache
+
+
+CHAMPION_JSON = {
+    "data": {
+        "Aatrox": {"key": "266", "name": "Aatrox"},
+        "MonkeyKing": {"key": "62", "name": "Wukong"},
+    }
+}
+
+
+class _FakeFetcher:
+    def __init__(self) -> None:
+        self.urls = []
+
+    def __call__(self, url):
+        self.urls.append(url)
+        if url.endswith("versions.json"):
+            return ["14.2.1", "14.1.1"]
+        return CHAMPION_JSON
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_champion_index_is_downloaded_once(tmp_path):
+    fetcher = _FakeFetcher()
+    cache = DataDragonCache(fetcher, tmp_path)
+
+    index = cache.champion_index()
+    assert index.version == "14.2.1"
+    assert index.names[62] == "Wukong"
+    assert index.keys[62] == "MonkeyKing"
+
+    for _ in range(100):
+        url = cache.icon_url(62)
+    assert url == "https://ddragon.leagueoflegends.com/cdn/14.2.1/img/champion/MonkeyKing.png"
+    assert len(fetcher.urls) == 2
+    assert (tmp_path / "14.2.1" / "es_MX" / "champion.json").exists()
+
+
+def test_disk_cache_survives_restart_without_network(tmp_path):
+    clock = _FakeClock()
+    DataDragonCache(_FakeFetcher(), tmp_path, clock=clock).champion_index()
+
+    fetcher = _FakeFetcher()
+    restarted = DataDragonCache(fetcher, tmp_path, clock=clock)
+    assert restarted.champion_index().names[266] == "Aatrox"
+    assert fetcher.urls == []
+
+
+def test_versions_are_refreshed_after_ttl(tmp_path):
+    clock = _FakeClock()
+    fetcher = _FakeFetcher()
+    cache = DataDragonCache(fetcher, tmp_path, versions_ttl=60, clock=clock)
+
+    cache.latest_version()
+    clock.now += 30
+    cache.latest_version()
+    assert len(fetcher.urls) == 1
+
+    clock.now += 60
+    cache.latest_version()
+    assert len(fetcher.urls) == 2
+
+
+def test_stale_versions_are_used_when_network_fails(tmp_path):
+    clock = _FakeClock()
+    DataDragonCache(_FakeFetcher(), tmp_path, versions_ttl=60, clock=clock).latest_version()
+
+    def failing_fetch(url):
+        raise ConnectionError(url)
+
+    clock.now += 3_600
+    cache = DataDragonCache(failing_fetch, tmp_path, versions_ttl=60, clock=clock)
+    assert cache.latest_version() == "14.2.1"
@@ -0,0 +1,114 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from src import data_collection, ingest
+from src.database import connect_repository
+
+
+def _match(match_id: str) -> dict:
+    timestamp = datetime.now(timezone.utc).timestamp() * 1000
+    return {"metadata": {"matchId": match_id}, "info": {"gameStartTimestamp": timestamp, "participants": []}}
+
+
+class _FakeApi:
+    """Historial de 250 partidas por jugador; las IDs con 'bad' fallan la primera vez."""
+
+    def __init__(self, history=250, failing=()):
+        self.history = history
+        self.new_matches = 0
+        self.failing = set(failing)
+        self.pages = []
+        self.detail_calls = []
+
+    def get_puuid_by_riot_id(self, game_name, tag_line):
+        if game_name == "Nadie":
+            return {"error": 404, "message": "not found"}
+        return {"puuid": f"puuid-{game_name}"}
+
+    def get_match_ids(self, puuid, count=20, start=0, **filters):
+        assert filters["start_time"] == data_collection.year_start_timestamp()
+        self.pages.append((puuid, start, count))
+        ids = [f"{puuid}_new{i}" for i in range(self.new_matches)] + [f"{puuid}_{i}" for i in range(self.history)]
+        return ids[start:start + count]
+
+    def get_match_details_many(self, match_ids, max_concurrency=8):
+        for match_id in match_ids:
+            self.detail_calls.append(match_id)
+            if match_id in self.failing:
+                self.failing.discard(match_id)
+                yield match_id, "503"
+            else:
+                yield match_id, _match(match_id)
+
+
+@pytest.fixture
+def fake_api(monkeypatch):
+    api = _FakeApi(failing={"puuid-Ana_150"})
+    for name in ("get_puuid_by_riot_id", "get_match_ids", "get_match_details_many"):
+        monkeypatch.setattr(data_collection, name, getattr(api, name))
+    return api
+
+
+def test_ingest_pages_history_and_resumes_after_errors(tmp_path, fake_api):
+    repo = connect_repository(tmp_path / "lol_matches.db")
+    logs = []
+
+    summary = ingest.ingest_players(repo, ["Ana#LAN", "Nadie#LAN", "raw-puuid"], log=logs.append)
+
+    assert summary.failed_players == ["Ana#LAN", "Nadie#LAN"]
+    assert repo.get_player("puuid-Ana")[1:] == ("Ana", "LAN")
+    assert repo.get_match_count("puuid-Ana") == 199  # La página con error no avanza el checkpoint
+    assert repo.get_ingest_checkpoint("puuid-Ana") == (100, False)
+    assert repo.get_match_count("raw-puuid") == 250
+    assert repo.get_ingest_checkpoint("raw-puuid") == (250, True)
+    assert repo.get_timeline_queue_status()["pending"] == 0  # La ingesta masiva no encola líneas de tiempo
+    assert len(logs) == 3
+
+    fake_api.pages.clear()
+    fake_api.detail_calls.clear()
+    summary = ingest.ingest_players(repo, ["Ana#LAN", "raw-puuid"], log=logs.append)
+
+    assert summary.failed_players == [] and summary.skipped_players == 1
+    # El jugador completo se detiene tras una página completa de partidas conocidas.
+    assert fake_api.pages == [("puuid-Ana", 100, 100), ("puuid-Ana", 200, 100), ("raw-puuid", 0, 100)]
+    # Sólo se descarga la partida que falló y la última página.
+    assert len(fake_api.detail_calls) == 51
+    assert repo.get_match_count("puuid-Ana") == 250
+
+
+def test_failed_incremental_sync_relists_history_to_fill_gaps(tmp_path, fake_api):
+    repo = connect_repository(tmp_path / "lol_matches.db")
+    ingest.ingest_players(repo, ["raw-puuid"], log=lambda _: None)
+    assert repo.get_ingest_checkpoint("raw-puuid") == (250, True)
+
+    # 120 partidas nuevas; falla una de las más antiguas, por debajo de 110 ya guardadas.
+    fake_api.new_matches = 120
+    fake_api.failing = {"raw-puuid_new110"}
+    summary = ingest.ingest_players(repo, ["raw-puuid"], log=lambda _: None)
+    assert summary.failed_players == ["raw-puuid"]
+    assert repo.get_match_count("raw-puuid") == 369
+    assert repo.get_ingest_checkpoint("raw-puuid") == (0, False)
+
+    fake_api.detail_calls.clear()
+    summary = ingest.ingest_players(repo, ["raw-puuid"], log=lambda _: None)
+    assert summary.failed_players == []
+    assert fake_api.detail_calls == ["raw-puuid_new110"]
+    assert repo.get_match_count("raw-puuid") == 370
+    assert repo.get_ingest_checkpoint("raw-puuid") == (370, True)
+
+
+def test_max_matches_limits_listing_without_completing(tmp_path, fake_api):
+    repo = connect_repository(tmp_path / "lol_matches.db")
+
+    ingest.ingest_players(repo, ["raw-puuid"], max_matches=120, log=lambda _: None)
+
+    assert fake_api.pages == [("raw-puuid", 0, 100), ("raw-puuid", 100, 20)]
+    assert repo.get_ingest_checkpoint("raw-puuid") == (120, False)
+
+
+def test_read_players_merges_file_and_arguments(tmp_path):
+    players_file = tmp_path / "players.txt"
+    players_file.write_text("# semillas\nAna#LAN\n\nraw-puuid\n")
+
+    assert ingest.read_players(["Ana#LAN", "Bea#LAS"], players_file) == ["Ana#LAN", "Bea#LAS", "raw-puuid"]
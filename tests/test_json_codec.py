@@ -0,0 +1,79 @@
+import pytest
+
+from src import json_codec
+from src.parsed_match import parse_match
+
+
+def _match() -> dict:
+    return {
+        "metadata": {"matchId": "LA1_1", "participants": ["p0"]},
+        "info": {
+            "gameDuration": 1500,
+            "gameVersion": "14.2.555.1",
+            "gameStartTimestamp": 1_700_000_000_000,
+            "participants": [
+                {
+                    "puuid": "p0",
+                    "participantId": 1,
+                    "teamId": 100,
+                    "championId": 266,
+                    "teamPosition": "TOP",
+                    "win": True,
+                    "kills": 5,
+                    "deaths": 1,
+                    "assists": 7,
+                    "goldEarned": 12_000,
+                    "riotIdGameName": "Jugador ñ",
+                    "challenges": {"goldPerMinute": 480.5},
+                    "perks": {"styles": []},
+                }
+            ],
+            "teams": [{"teamId": 100, "bans": []}],
+        },
+    }
+
+
+@pytest.mark.parametrize("backend", json_codec.available_serializers())
+def test_backends_roundtrip_compact_utf8(backend):
+    serializer = json_codec.get_serializer(backend)
+    text = serializer.dumps(_match())
+
+    assert "ñ" in text and ", " not in text
+    assert serializer.loads(text) == _match()
+    assert serializer.loads(text.encode("utf-8")) == _match()
+    with pytest.raises(ValueError):
+        serializer.loads("{not json")
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        json_codec.get_serializer("yaml")
+
+
+@pytest.mark.parametrize("typed", [True, False])
+def test_match_summary_keeps_participant_fields(monkeypatch, typed):
+    if not typed:
+        monkeypatch.setattr(json_codec, "msgspec", None)
+    elif json_codec.msgspec is None:
+        pytest.skip("msgspec no está instalado")
+
+    summary = json_codec.decode_match_summary(json_codec.dumps(_match()))
+
+    participant = summary["info"]["participants"][0]
+    assert summary["metadata"] == {"matchId": "LA1_1"}
+    assert set(participant) == set(json_codec.PARTICIPANT_FIELDS)
+    assert participant["riotIdGameName"] == "Jugador ñ" and participant["visionScore"] == 0
+
+    full, partial = parse_match(_match()), parse_match(summary)
+    assert partial.player("p0").kda_ratio == full.player("p0").kda_ratio
+    assert partial.patch == full.patch and partial.duration == full.duration
+
+
+def test_match_summary_falls_back_on_unexpected_types():
+    match = _match()
+    match["info"]["gameStartTimestamp"] = 1.5e12
+    match["info"]["participants"][0]["kills"] = "5"
+
+    summary = json_codec.decode_match_summary(json_codec.dumps(match))
+    assert summary["info"]["participants"][0]["kills"] == "5"
+    assert json_codec.decode_match_summary('{"metadata": {}}') is None
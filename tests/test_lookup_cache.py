@@ -0,0 +1,63 @@
+from src.database import connect_repository
+from src.lookup_cache import LookupCache
+
+
+class _FakeApi:
+    def __init__(self):
+        self.account_calls = 0
+        self.mastery_calls = 0
+        self.points = 100
+
+    def get_puuid_by_riot_id(self, game_name, tag_line):
+        self.account_calls += 1
+        if game_name == "Nadie":
+            return {"error": 404, "message": "not found"}
+        return {"puuid": f"puuid-{game_name}", "gameName": game_name, "tagLine": tag_line}
+
+    def get_champion_mastery(self, puuid):
+        self.mastery_calls += 1
+        return [{"championId": 266, "championLevel": 7, "championPoints": self.points}]
+
+
+def _cache(tmp_path, api, **kwargs):
+    return LookupCache(
+        tmp_path / "lol_matches.db",
+        fetch_account=api.get_puuid_by_riot_id,
+        fetch_mastery=api.get_champion_mastery,
+        **kwargs,
+    )
+
+
+def test_fresh_lookups_do_not_touch_the_api(tmp_path):
+    api = _FakeApi()
+    cache = _cache(tmp_path, api)
+
+    for _ in range(3):
+        assert cache.resolve_riot_id("Ana", "LAN")["puuid"] == "puuid-Ana"
+        assert cache.get_champion_mastery("puuid-Ana")[0]["championPoints"] == 100
+    assert (api.account_calls, api.mastery_calls) == (1, 1)
+
+    # Las respuestas con error no se guardan.
+    assert "error" in cache.resolve_riot_id("Nadie", "LAN")
+    assert "error" in cache.resolve_riot_id("Nadie", "LAN")
+    assert api.account_calls == 3
+
+    # Otra instancia (por ejemplo, tras reiniciar la app) reutiliza la base.
+    assert _cache(tmp_path, api).resolve_riot_id("ana", "lan")["puuid"] == "puuid-Ana"
+    assert api.account_calls == 3
+
+
+def test_stale_values_are_served_while_revalidating(tmp_path):
+    api = _FakeApi()
+    cache = _cache(tmp_path, api, account_ttl=0, mastery_ttl=0)
+    cache.resolve_riot_id("Ana", "LAN")
+    cache.get_champion_mastery("puuid-Ana")
+
+    api.points = 250
+    assert cache.get_champion_mastery("puuid-Ana")[0]["championPoints"] == 100
+    assert cache.resolve_riot_id("Ana", "LAN")["puuid"] == "puuid-Ana"
+    cache.wait(timeout=5)
+
+    assert (api.account_calls, api.mastery_calls) == (2, 2)
+    with connect_repository(tmp_path / "lol_matches.db") as repo:
+        assert repo.get_mastery("puuid-Ana")[0][0]["championPoints"] == 250
@@ -0,0 +1,86 @@
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from src import meta_aggregation
+from src.database import connect_repository
+
+
+ROLES = ("TOP", "JUNGLE", "MIDDLE", "BOTTOM", "UTILITY")
+
+
+def _match(index: int) -> dict:
+    timestamp = datetime.now(timezone.utc).timestamp() * 1000
+    return {
+        "metadata": {"matchId": f"LA1_{index}"},
+        "info": {
+            "gameStartTimestamp": timestamp,
+            "gameDuration": 1200 + index,
+            "gameVersion": f"14.{1 + index % 2}.555.1",
+            "participants": [
+                {
+                    "puuid": f"p{slot}" if slot < 9 else "",
+                    "championId": 1 + (index + slot) % 4,
+                    "teamPosition": ROLES[slot % 5] if index % 3 else "",
+                    "win": slot < 5,
+                    "kills": slot,
+                    "deaths": 1,
+                    "assists": index % 5,
+                    "goldEarned": 10000 + slot,
+                    "totalDamageDealtToChampions": 20000,
+                    "visionScore": 15,
+                }
+                for slot in range(10)
+            ],
+        },
+    }
+
+
+def _store(db_file, count=30, compression=None):
+    repo = connect_repository(db_file, compression=compression)
+    repo.register_player("p0", "Player", "LAS")
+    if compression is not None:
+        repo.store_matches("p0", [_match(index) for index in range(5)])
+        repo.train_compression_dictionary()
+        repo.store_matches("p0", [_match(index) for index in range(5, count)])
+    else:
+        repo.store_matches("p0", [_match(index) for index in range(count)])
+    return repo
+
+
+def test_parallel_aggregation_matches_serial_and_rollups(tmp_path):
+    db_file = tmp_path / "lol_matches.db"
+    repo = _store(db_file)
+
+    serial = meta_aggregation.aggregate_meta(db_file, workers=1)
+    parallel = meta_aggregation.aggregate_meta(db_file, workers=2, partitions=7)
+    pd.testing.assert_frame_equal(serial, parallel)
+
+    assert len(meta_aggregation.plan_partitions(db_file, 7)) == 7
+    assert serial["games"].sum() == 30 * 9  # El participante sin PUUID no cuenta
+    assert set(serial["role"].dropna()) == set(ROLES) and serial["role"].isna().any()
+
+    # Sin rol los totales por campeón y parche coinciden con el rollup mantenido por triggers.
+    by_patch = serial.groupby(["champion_id", "patch"])[list(meta_aggregation.COUNTER_COLUMNS)].sum()
+    for champion_id in range(1, 5):
+        for stats in repo.get_champion_patch_stats(champion_id):
+            row = by_patch.loc[(champion_id, stats.key)]
+            assert (row["games"], row["wins"], row["kills"], row["duration"]) == (
+                stats.games, stats.wins, stats.kills, stats.duration
+            )
+    repo.close()
+
+
+def test_aggregation_reads_compressed_storage_and_empty_tables(tmp_path):
+    plain_file = tmp_path / "plain.db"
+    _store(plain_file, count=10).close()
+    plain = meta_aggregation.aggregate_meta(plain_file, workers=1)
+    compressed_file = tmp_path / "zlib.db"
+    _store(compressed_file, count=10, compression="zlib").close()
+    compressed = meta_aggregation.aggregate_meta(compressed_file, workers=1, partitions=3)
+    pd.testing.assert_frame_equal(plain, compressed)
+    assert plain["win_rate"].between(0, 1).all() and (plain["gold_per_min"] > 0).all()
+
+    connect_repository(tmp_path / "empty.db").close()
+    assert meta_aggregation.plan_partitions(tmp_path / "empty.db", 4) == []
+    assert meta_aggregation.aggregate_meta(tmp_path / "empty.db", workers=2).empty
@@ -0,0 +1,106 @@
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+import pyarrow.dataset as ds
+
+from src import parquet_export
+from src.database import connect_repository
+from src.parquet_export import export_matches, read_table, read_watermark
+from tests.payloads import build_match
+
+
+def test_export_is_partitioned_and_incremental(tmp_path):
+    repo = connect_repository(tmp_path / "lol_matches.db")
+    repo.register_player("puuid-1")
+    repo.store_matches("puuid-1", [
+        build_match(f"LA1_{i}", seed=i, patch="14.1" if i % 2 else "14.2") for i in range(6)
+    ])
+    out = tmp_path / "parquet"
+
+    first = export_matches(repo, out, batch_size=4)
+    assert first.matches == 6
+    assert first.rows["participants"] == 60
+    assert read_watermark(out) == first.last_seq
+    assert (out / "participants" / "patch=14.1" / "region=LA1").is_dir()
+
+    assert export_matches(repo, out).matches == 0
+
+    repo.store_matches("puuid-1", [build_match("LA1_99", seed=99, patch="14.3")])
+    assert export_matches(repo, out).matches == 1
+
+    participants = read_table("participants", out)
+    assert participants.num_rows == 70
+    assert participants.schema.field("champion_id").type == pa.int16()
+
+    latest = read_table("participants", out, columns=["match_id", "win"], filter=ds.field("patch") == "14.3")
+    assert set(latest.column("match_id").to_pylist()) == {"LA1_99"}
+
+    bans = read_table("bans", out).to_pandas()
+    assert (bans["champion_id"] != -1).all()
+    assert read_table("teams", out).num_rows == 14
+
+
+def test_full_export_rebuilds_and_skips_invalid_rows(tmp_path):
+    repo = connect_repository(tmp_path / "lol_matches.db")
+    repo.register_player("puuid-1")
+    repo.store_matches("puuid-1", [build_match("LA1_1", seed=1)])
+    repo.store_matches("puuid-1", [json.dumps({"metadata": {"matchId": "LA1_2"}})], default_year=datetime.now(timezone.utc).year)
+    out = tmp_path / "parquet"
+
+    export_matches(repo, out)
+    result = export_matches(repo, out, full=True)
+
+    assert result.matches == 1 and result.skipped == 1
+    assert read_table("participants", out).num_rows == 10
+
+
+def test_watermark_survives_vacuum(tmp_path):
+    repo = connect_repository(tmp_path / "lol_matches.db")
+    repo.register_player("puuid-1")
+    repo.store_matches("puuid-1", [build_match(f"LA1_{i}", seed=i) for i in range(4)])
+    out = tmp_path / "parquet"
+    assert export_matches(repo, out).last_seq == 4
+
+    # Borrar partidas antiguas y compactar renumera el rowid implícito, no `seq`.
+    with repo._write() as conn:
+        conn.execute("PRAGMA foreign_keys = OFF;")
+        conn.execute("DELETE FROM matches WHERE match_id IN ('LA1_0', 'LA1_1');")
+    repo._get_connection().execute("VACUUM;")
+    repo.store_matches("puuid-1", [build_match("LA1_9", seed=9)])
+
+    result = export_matches(repo, out)
+    assert (result.matches, result.last_seq) == (1, 5)
+    assert read_table("participants", out).num_rows == 50
+
+
+def test_retried_flush_overwrites_its_files(tmp_path, monkeypatch):
+    repo = connect_repository(tmp_path / "lol_matches.db")
+    repo.register_player("puuid-1")
+    repo.store_matches("puuid-1", [build_match(f"LA1_{i}", seed=i) for i in range(6)])
+    out = tmp_path / "parquet"
+    write_watermark = parquet_export._write_watermark
+
+    def crash_on_second_flush(export_dir, last_seq):
+        if last_seq > 2:
+            raise OSError("disco lleno")
+        write_watermark(export_dir, last_seq)
+
+    # El segundo bloque llega a escribir sus archivos, pero no su marca de agua.
+    monkeypatch.setattr(parquet_export, "_write_watermark", crash_on_second_flush)
+    with pytest.raises(OSError):
+        export_matches(repo, out, batch_size=2, rows_per_file=20)
+    assert read_watermark(out) == 2
+    assert read_table("participants", out).num_rows == 40
+
+    monkeypatch.setattr(parquet_export, "_write_watermark", write_watermark)
+    assert export_matches(repo, out, batch_size=2, rows_per_file=20).matches == 4
+    assert read_table("participants", out).num_rows == 60
+    files = sorted(path.name for path in (out / "participants").rglob("*.parquet"))
+    assert files == [
+        "part-000000000001-000000000002-0.parquet",
+        "part-000000000003-000000000004-0.parquet",
+        "part-000000000005-000000000006-0.parquet",
+    ]
@@ -0,0 +1,64 @@
+from src.parsed_match import extract_patch, parse_match
+
+
+def _match() -> dict:
+    participants = [
+        {
+            "puuid": f"p{index}",
+            "participantId": index + 1,
+            "teamId": 100 if index < 5 else 200,
+            "championId": 10 + index,
+            "teamPosition": "TOP" if index in (0, 5) else "",
+            "win": index < 5,
+            "kills": index,
+            "deaths": 0 if index == 0 else 2,
+            "assists": 4,
+            "goldEarned": 12000,
+            "riotIdGameName": f"Player {index}" if index else "",
+            "summonerName": "Legacy",
+        }
+        for index in range(10)
+    ]
+    return {
+        "metadata": {"matchId": "LA1_1"},
+        "info": {
+            "gameDuration": 1200,
+            "gameVersion": "14.2.555.1",
+            "participants": participants,
+            "teams": [
+                {"teamId": 100, "bans": [{"championId": -1, "pickTurn": 1}, {"championId": 266, "pickTurn": 2}]},
+                {"teamId": 200, "bans": []},
+            ],
+        },
+    }
+
+
+def test_parse_match_builds_indexes_and_derived_metrics():
+    match = parse_match(_match())
+
+    assert match.match_id == "LA1_1" and match.patch == "14.2" and match.duration_minutes == 20
+    assert [p.puuid for p in match.teams[200]] == ["p5", "p6", "p7", "p8", "p9"]
+    assert match.by_participant_id[3] is match.player("p2")
+    assert match.bans == {100: (-1, 266), 200: ()}
+
+    top = match.player("p0")
+    assert (top.kda, top.kda_ratio, top.gold_per_min) == ("0/0/4", 4.0, 600.0)
+    assert top.name == "Legacy" and top.team_position == "TOP"
+    assert match.player("p1").name == "Player 1" and match.player("p1").team_position == ""
+    assert match.player("missing") is None
+
+
+def test_parse_match_rejects_payloads_without_info():
+    assert parse_match({"metadata": {"matchId": "LA1_1"}}) is None
+    assert parse_match("not a match") is None
+    assert parse_match({"info": {}}, "LA1_2").participants == ()
+    assert extract_patch("14.10") == "14.10" and extract_patch(None) is None
+
+
+def test_parse_match_treats_null_stats_as_zero():
+    raw = _match()
+    raw["info"]["participants"][1].update(kills=None, deaths=None, assists=None, goldEarned=None, visionScore=None)
+
+    player = parse_match(raw).player("p1")
+
+    assert (player.kda, player.kda_ratio, player.gold_per_min, player.vision) == ("0/0/0", 0.0, 0.0, 0)
@@ -0,0 +1,153 @@
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src import data_collection
+from src.rate_limiter import RateLimiter, parse_rate_limit_header
+from src.riot_client import RiotClient
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_parse_rate_limit_header():
+    assert parse_rate_limit_header("20:1,100:120") == [(20, 1), (100, 120)]
+    assert parse_rate_limit_header("bad,5:10") == [(5, 10)]
+    assert parse_rate_limit_header(None) == []
+
+
+def test_limiter_blocks_once_window_is_full():
+    clock = _FakeClock()
+    limiter = RateLimiter(window_padding=0.0, clock=clock)
+
+    # Sondeo inicial para aprender los límites.
+    assert limiter.try_acquire("americas", "match") == 0
+    assert limiter.try_acquire("americas", "match") > 0
+    limiter.update_from_headers(
+        "americas", "match", 200,
+        {"X-App-Rate-Limit": "3:1", "X-App-Rate-Limit-Count": "1:1", "X-Method-Rate-Limit": "100:10"},
+    )
+
+    assert limiter.try_acquire("americas", "match") == 0
+    assert limiter.try_acquire("americas", "match") == 0
+    assert limiter.try_acquire("americas", "match") == pytest.approx(1.0)
+
+    # Otro host tiene sus propios buckets.
+    assert limiter.try_acquire("la1", "mastery") == 0
+
+    clock.now = 1.0
+    assert limiter.try_acquire("americas", "match") == 0
+
+
+def test_retry_after_blocks_only_affected_scope():
+    clock = _FakeClock()
+    limiter = RateLimiter(window_padding=0.0, clock=clock)
+    headers = {"X-App-Rate-Limit": "100:1", "X-Method-Rate-Limit": "100:1"}
+    limiter.try_acquire("americas", "match")
+    limiter.update_from_headers("americas", "match", 200, headers)
+    limiter.try_acquire("americas", "timeline")
+    limiter.update_from_headers("americas", "timeline", 200, headers)
+
+    limiter.try_acquire("americas", "match")
+    limiter.update_from_headers(
+        "americas", "match", 429, {**headers, "Retry-After": "5", "X-Rate-Limit-Type": "method"}
+    )
+
+    assert limiter.try_acquire("americas", "match") == pytest.approx(5.0)
+    assert limiter.try_acquire("americas", "timeline") == 0
+
+
+def test_acquire_async_waits_for_capacity():
+    limiter = RateLimiter(window_padding=0.0)
+    limiter.try_acquire("americas", "match")
+    limiter.update_from_headers("americas", "match", 200, {"X-App-Rate-Limit": "1:1", "X-App-Rate-Limit-Count": "1:1"})
+
+    async def run() -> float:
+        started = time.monotonic()
+        await limiter.acquire_async("americas", "match")
+        return time.monotonic() - started
+
+    assert asyncio.run(run()) >= 0.9
+
+
+class _LimitedServer(ThreadingHTTPServer):
+    """Servidor que aplica un límite de 5 peticiones por segundo y responde 429 si se excede."""
+
+    limit = 5
+    window = 1.0
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.lock = threading.Lock()
+        self.received = deque()
+        self.rejected = 0
+        self.served = 0
+
+
+class _LimitedHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            now = time.monotonic()
+            while server.received and server.received[0] + server.window <= now:
+                server.received.popleft()
+            over_limit = len(server.received) >= server.limit
+            if over_limit:
+                server.rejected += 1
+            else:
+                server.received.append(now)
+                server.served += 1
+            count = len(server.received)
+
+        rate_headers = {
+            "X-App-Rate-Limit": f"{server.limit}:1",
+            "X-App-Rate-Limit-Count": f"{count}:1",
+            "X-Method-Rate-Limit": "1000:10",
+        }
+        if over_limit:
+            self.send_response(429)
+            self.send_header("Retry-After", "1")
+            self.send_header("X-Rate-Limit-Type", "application")
+            body = b"{}"
+        else:
+            self.send_response(200)
+            match_id = self.path.rstrip("/").split("/")[-1]
+            body = json.dumps({"metadata": {"matchId": match_id}, "info": {}}).encode()
+        for key, value in rate_headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_concurrent_fetch_never_trips_server_limit(monkeypatch):
+    server = _LimitedServer(("127.0.0.1", 0), _LimitedHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(data_collection, "REGIONAL_BASE_URL", f"http://127.0.0.1:{server.server_address[1]}")
+    monkeypatch.setattr(data_collection, "_client", RiotClient())
+    monkeypatch.setattr(data_collection, "_response_cache_enabled", False)
+
+    try:
+        match_ids = [f"LA1_{i}" for i in range(12)]
+        results = dict(data_collection.get_match_details_many(match_ids, max_concurrency=8))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert all(isinstance(results[m_id], dict) for m_id in match_ids)
+    assert server.rejected == 0
+    assert server.served == len(match_ids)
@@ -0,0 +1,38 @@
+from src.response_cache import ResponseCache
+
+
+def _payload(match_id: str) -> dict:
+    return {"metadata": {"matchId": match_id}, "info": {"blob": match_id * 200}}
+
+
+def test_cache_roundtrip_survives_reopen(tmp_path):
+    cache = ResponseCache(tmp_path / "responses.db")
+    cache.put("match", "americas", "LA1_1", _payload("LA1_1"))
+    cache.close()
+
+    cache = ResponseCache(tmp_path / "responses.db")
+    assert cache.get("match", "americas", "LA1_1") == _payload("LA1_1")
+    assert cache.get("match", "europe", "LA1_1") is None
+    assert cache.get("timeline", "americas", "LA1_1") is None
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (1, 2, 1)
+    assert stats.size_bytes > 0
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = ResponseCache(tmp_path / "responses.db")
+    cache.put("match", "americas", "probe", _payload("probe"))
+    entry_size = cache.stats().size_bytes
+    cache.clear()
+    cache.max_bytes = entry_size * 3
+
+    for index in range(3):
+        cache.put("match", "americas", f"LA1_{index}", _payload(f"LA1_{index}"))
+    cache.get("match", "americas", "LA1_0")  # LA1_0 pasa a ser la más reciente
+    cache.put("match", "americas", "LA1_3", _payload("LA1_3"))
+
+    assert cache.get("match", "americas", "LA1_0") is not None
+    assert cache.get("match", "americas", "LA1_1") is None
+    assert cache.get("match", "americas", "LA1_3") is not None
+    stats = cache.stats()
+    assert stats.size_bytes <= cache.max_bytes and stats.evictions >= 1
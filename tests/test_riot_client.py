@@ -0,0 +1,130 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from src.riot_client import EndpointMetrics, RiotClient
+
+
+class _FlakyServer(ThreadingHTTPServer):
+    """Servidor HTTP/1.1 que falla con 503 las primeras peticiones."""
+
+    def __init__(self, *args, failures: int = 2, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.remaining_failures = failures
+        self.client_ports = set()
+        self.lock = threading.Lock()
+
+
+class _FlakyHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.client_ports.add(self.client_address[1])
+            fail = server.remaining_failures > 0
+            server.remaining_failures -= 1 if fail else 0
+
+        body = b'{"ok": false}' if fail else b'{"ok": true}'
+        self.send_response(503 if fail else 200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def flaky_server():
+    server = _FlakyServer(("127.0.0.1", 0), _FlakyHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_client_retries_server_errors_with_backoff(flaky_server):
+    delays = []
+    client = RiotClient("key", sleep=delays.append, backoff_base=0.1)
+    url = f"http://127.0.0.1:{flaky_server.server_address[1]}/lol/match/v5/matches/LA1_1"
+
+    response = client.get(url, host="americas", method="match-v5.match")
+
+    assert response.status_code == 200
+    assert response.json() == {"ok": True}
+    assert len(delays) == 2
+    assert all(0 <= delay <= 0.2 for delay in delays)
+
+    metrics = client.get_metrics()["match-v5.match"]
+    assert metrics["requests"] == 3
+    assert metrics["errors"] == 2
+    assert metrics["retries"] == 2
+    client.close()
+
+
+def test_client_reuses_keep_alive_connection(flaky_server):
+    flaky_server.remaining_failures = 0
+    url = f"http://127.0.0.1:{flaky_server.server_address[1]}/lol/match/v5/matches/LA1_1"
+
+    with RiotClient("key") as client:
+        for _ in range(5):
+            assert client.get(url, method="match-v5.match").status_code == 200
+
+    # Todas las peticiones viajan por la misma conexión TCP.
+    assert len(flaky_server.client_ports) == 1
+
+
+def test_endpoint_metrics_are_consistent_across_threads():
+    metrics = EndpointMetrics()
+    summaries = []
+
+    def worker():
+        for _ in range(2_000):
+            metrics.record(0.001)
+            metrics.record_retry()
+            summaries.append(metrics.summary())
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    summary = metrics.summary()
+    assert (summary["requests"], summary["retries"]) == (8_000, 8_000)
+    assert len(summaries) == 8_000
+
+
+def test_unexpected_request_errors_release_the_rate_limit_probe(flaky_server):
+    flaky_server.remaining_failures = 0
+    url = f"http://127.0.0.1:{flaky_server.server_address[1]}/lol/match/v5/matches/LA1_1"
+    client = RiotClient("key")
+    session = client._session_for(url)
+    real_get = session.get
+    calls = []
+
+    def broken_first_get(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == 1:
+            raise requests.exceptions.ChunkedEncodingError("respuesta truncada")
+        return real_get(*args, **kwargs)
+
+    session.get = broken_first_get
+    with pytest.raises(requests.exceptions.ChunkedEncodingError):
+        client.get(url, host="americas", method="match-v5.match")
+
+    # Sin liberar el sondeo, esta petición esperaría indefinidamente.
+    responses = []
+    thread = threading.Thread(
+        target=lambda: responses.append(client.get(url, host="americas", method="match-v5.match")), daemon=True
+    )
+    thread.start()
+    thread.join(timeout=5)
+    assert [response.status_code for response in responses] == [200]
+    assert client.get_metrics()["match-v5.match"]["errors"] == 1
+    client.close()
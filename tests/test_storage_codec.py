@@ -0,0 +1,28 @@
+import json
+
+import pytest
+
+from src import storage_codec
+
+
+PAYLOAD = json.dumps({"info": {"participants": [{"puuid": f"p{i}", "teamPosition": "TOP", "win": True} for i in range(10)]}})
+
+
+def test_zlib_roundtrip_with_and_without_dictionary():
+    plain = storage_codec.compress_text(PAYLOAD, "zlib")
+    assert storage_codec.is_compressed(plain)
+    assert storage_codec.decode_text(plain) == PAYLOAD
+
+    dictionary = storage_codec.train_dictionary([PAYLOAD.encode()], "zlib")
+    with_dict = storage_codec.compress_text(PAYLOAD, "zlib", dictionary=dictionary, dictionary_id=7)
+    assert len(with_dict) < len(plain)
+    assert storage_codec.decode_text(with_dict, {7: dictionary}) == PAYLOAD
+
+    with pytest.raises(KeyError):
+        storage_codec.decode_text(with_dict, {})
+
+
+def test_plain_values_pass_through():
+    assert storage_codec.decode_text(PAYLOAD) == PAYLOAD
+    assert storage_codec.decode_text(None) is None
+    assert not storage_codec.is_compressed(PAYLOAD)
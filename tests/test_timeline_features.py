@@ -0,0 +1,47 @@
+import json
+
+import numpy as np
+
+from src.timeline_features import METRICS, TimelineFeatures, extract_timeline_features
+from tests.payloads import build_timeline
+
+
+def test_features_roundtrip_is_exact_and_compact():
+    timeline = build_timeline("LA1_1", seed=3, minutes=30)
+    features = extract_timeline_features(timeline)
+
+    assert features.values.shape == (10, 31, len(METRICS))
+    frame = timeline["info"]["frames"][12]["participantFrames"]["4"]
+    assert features.series("gold")[4][12] == frame["totalGold"]
+    assert features.metric("cs")[3, 12] == frame["minionsKilled"] + frame["jungleMinionsKilled"]
+    assert features.metric("position_y")[3, 12] == frame["position"]["y"]
+
+    data = features.to_bytes()
+    restored = TimelineFeatures.from_bytes(data)
+    assert np.array_equal(restored.values, features.values)
+    assert list(restored.participant_ids) == list(range(1, 11))
+    assert len(data) * 20 < len(json.dumps(timeline))
+
+
+def test_missing_participant_frames_repeat_last_value():
+    timeline = {"info": {"frames": [
+        {"participantFrames": {"1": {"totalGold": 500}, "2": {"totalGold": 500}}},
+        {"participantFrames": {"1": {"totalGold": 900}}},
+    ]}}
+
+    features = extract_timeline_features(timeline)
+
+    assert features.metric("gold").tolist() == [[500, 900], [500, 500]]
+    assert extract_timeline_features({}).minutes == 0
+
+
+def test_null_frame_fields_count_as_zero():
+    timeline = {"info": {"frames": [
+        {"participantFrames": {"1": {"totalGold": None, "xp": 300, "minionsKilled": None,
+                                     "jungleMinionsKilled": 4, "damageStats": None, "position": {"x": None, "y": 7}}}},
+    ]}}
+
+    features = extract_timeline_features(timeline)
+
+    assert features.values[0, 0].tolist() == [0, 300, 4, 0, 0, 7]
+    assert np.array_equal(TimelineFeatures.from_bytes(features.to_bytes()).values, features.values)
@@ -0,0 +1,133 @@
+import sqlite3
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from src.database import connect_repository
+from src.timeline_prefetch import TimelinePrefetcher
+from tests.payloads import build_timeline
+
+
+def _match(match_id: str) -> dict:
+    timestamp = datetime.now(timezone.utc).timestamp() * 1000
+    return {"metadata": {"matchId": match_id}, "info": {"gameStartTimestamp": timestamp}}
+
+
+class _FakeTimelines:
+    def __init__(self, failing=()) -> None:
+        self.failing = set(failing)
+        self.calls = []
+
+    def __call__(self, match_id):
+        self.calls.append(match_id)
+        if match_id in self.failing:
+            return '{"status": {"status_code": 503}}'
+        return build_timeline(match_id, minutes=3)
+
+
+def _repository_with_matches(tmp_path, match_ids):
+    db_path = tmp_path / "lol_matches.db"
+    repo = connect_repository(db_path)
+    repo.register_player("puuid-1")
+    repo.store_matches("puuid-1", [_match(match_id) for match_id in match_ids])
+    return db_path, repo
+
+
+def test_new_matches_are_queued_and_prefetched(tmp_path):
+    db_path, repo = _repository_with_matches(tmp_path, ["m1", "m2", "m3"])
+    assert repo.get_timeline_queue_status()["pending"] == 3
+
+    fetcher = _FakeTimelines(failing={"m3"})
+    prefetcher = TimelinePrefetcher(db_path, fetch_timeline=fetcher, batch_size=10, max_attempts=2)
+
+    assert prefetcher.run_once() == 3
+    assert repo.get_timeline_features("m1").minutes == 4
+    status = prefetcher.status()
+    assert (status.pending, status.done, status.failed) == (1, 2, 0)
+    assert "503" in status.last_error
+
+    prefetcher.run_once()
+    assert prefetcher.status().failed == 1
+    assert prefetcher.run_once() == 0
+    assert fetcher.calls.count("m3") == 2
+
+    # Una partida ya guardada no se vuelve a encolar.
+    assert repo.enqueue_timelines(["m1"]) == 0
+    assert repo.enqueue_timelines() == 0
+
+
+def test_background_worker_drains_queue_and_resumes_after_restart(tmp_path):
+    db_path, repo = _repository_with_matches(tmp_path, ["m1", "m2"])
+    # Simula una ejecución anterior interrumpida con un trabajo a medias.
+    assert repo.claim_timeline_jobs(1) == ["m1"]
+    # Recién reclamado podría ser de otro proceso activo: no se recupera.
+    assert repo.reset_stale_timeline_jobs() == 0
+    with repo._write() as conn:
+        conn.execute("UPDATE timeline_queue SET updated_at = datetime('now', '-1 hour');")
+
+    fetcher = _FakeTimelines()
+    prefetcher = TimelinePrefetcher(db_path, fetch_timeline=fetcher, poll_interval=0.05)
+    prefetcher.start()
+    try:
+        deadline = time.monotonic() + 5
+        while prefetcher.status().done < 2 and time.monotonic() < deadline:
+            time.sleep(0.02)
+
+        repo.store_matches("puuid-1", [_match("m4")])
+        prefetcher.wake()
+        while prefetcher.status().done < 3 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert prefetcher.running
+    finally:
+        prefetcher.stop(timeout=5)
+
+    assert not prefetcher.running
+    assert sorted(fetcher.calls) == ["m1", "m2", "m4"]
+    assert prefetcher.status().pending == 0
+
+
+def test_stopped_batch_releases_only_its_own_jobs(tmp_path):
+    db_path, repo = _repository_with_matches(tmp_path, ["m1", "m2", "m3", "m4"])
+    # Trabajo reclamado por otro proceso que sigue activo.
+    assert repo.claim_timeline_jobs(1) == ["m1"]
+
+    prefetcher = TimelinePrefetcher(db_path, batch_size=10)
+
+    def fetch_and_stop(match_id):
+        prefetcher._stop.set()
+        return build_timeline(match_id, minutes=3)
+
+    prefetcher._fetch_timeline = fetch_and_stop
+    assert prefetcher.run_once(repo) == 1
+    assert repo.get_timeline_queue_status() == {"pending": 2, "in_progress": 1, "done": 1, "failed": 0}
+    assert repo.claim_timeline_jobs(10) == ["m3", "m4"]
+
+
+def test_failed_write_releases_the_rest_of_the_batch(tmp_path):
+    db_path, repo = _repository_with_matches(tmp_path, ["m1", "m2", "m3"])
+    prefetcher = TimelinePrefetcher(db_path, fetch_timeline=_FakeTimelines(), batch_size=10)
+    store = repo.store_match_timeline
+
+    def store_then_fail(match_id, timeline):
+        if match_id == "m2":
+            raise sqlite3.OperationalError("database is locked")
+        store(match_id, timeline)
+
+    repo.store_match_timeline = store_then_fail
+    with pytest.raises(sqlite3.OperationalError):
+        prefetcher.run_once(repo)
+    assert repo.get_timeline_queue_status() == {"pending": 2, "in_progress": 0, "done": 1, "failed": 0}
+
+    repo.store_match_timeline = store
+    assert prefetcher.run_once(repo) == 2
+    assert repo.get_timeline_queue_status()["done"] == 3
+
+
+def test_bulk_store_can_skip_timeline_queue(tmp_path):
+    repo = connect_repository(tmp_path / "lol_matches.db")
+    repo.register_player("puuid-1")
+
+    assert repo.store_matches("puuid-1", [_match("m1")], enqueue_timelines=False) == ["m1"]
+    assert repo.get_timeline_queue_status()["pending"] == 0
+    assert repo.enqueue_timelines() == 1